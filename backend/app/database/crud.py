@@ -1,43 +1,78 @@
 from __future__ import annotations
 
+import hashlib
 import json
-from typing import List
+from datetime import datetime
+from typing import Dict, List
 from typing import Optional
 
-from sqlalchemy import desc, select
+from sqlalchemy import desc, insert, or_, select, update
 from sqlalchemy.orm import Session
 
 from app.schemas import StudentInput
 
-from .models import AppSettings, CsvStudent, PredictionRecord, Student, Teacher
+from .models import AppSettings, CsvStudent, CsvUpload, Job, PredictionRecord, Student, Teacher
 
 
-def create_prediction_record(
-    db: Session,
+def _prediction_record_values(
     *,
     student: StudentInput,
     prediction: str,
     confidence: float,
     model_used: str,
     student_id: Optional[int] = None,
-) -> PredictionRecord:
+    model_type: Optional[str] = None,
+    contributions: Optional[Dict[str, float]] = None,
+    model_version: Optional[str] = None,
+    csv_student_id: Optional[int] = None,
+) -> dict:
     semesters = student.semesters
     percentages = [((s.internal_marks + s.university_marks) / 600.0) * 100.0 for s in semesters]
     avg_pct = float(sum(percentages) / max(1, len(percentages)))
     last_pct = float(percentages[-1]) if percentages else 0.0
     avg_att = float(sum(s.attendance for s in semesters) / max(1, len(semesters)))
 
+    return {
+        "student_id": student_id,
+        "csv_student_id": csv_student_id,
+        "name": student.name,
+        "department": student.department,
+        "semesters_json": json.dumps([s.model_dump() for s in semesters]),
+        "avg_percentage": avg_pct,
+        "last_percentage": last_pct,
+        "avg_attendance": avg_att,
+        "prediction": prediction,
+        "confidence": confidence,
+        "model_used": model_used,
+        "model_type": model_type,
+        "model_version": model_version,
+        "contributions_json": json.dumps(contributions) if contributions else None,
+    }
+
+
+def create_prediction_record(
+    db: Session,
+    *,
+    student: StudentInput,
+    prediction: str,
+    confidence: float,
+    model_used: str,
+    student_id: Optional[int] = None,
+    model_type: Optional[str] = None,
+    contributions: Optional[Dict[str, float]] = None,
+    model_version: Optional[str] = None,
+) -> PredictionRecord:
     record = PredictionRecord(
-        student_id=student_id,
-        name=student.name,
-        department=student.department,
-        semesters_json=json.dumps([s.model_dump() for s in semesters]),
-        avg_percentage=avg_pct,
-        last_percentage=last_pct,
-        avg_attendance=avg_att,
-        prediction=prediction,
-        confidence=confidence,
-        model_used=model_used,
+        **_prediction_record_values(
+            student=student,
+            prediction=prediction,
+            confidence=confidence,
+            model_used=model_used,
+            student_id=student_id,
+            model_type=model_type,
+            contributions=contributions,
+            model_version=model_version,
+        )
     )
     db.add(record)
     db.commit()
@@ -45,6 +80,56 @@ def create_prediction_record(
     return record
 
 
+def create_prediction_records_batch(
+    db: Session,
+    *,
+    entries: List[dict],
+    student_id: Optional[int] = None,
+    commit: bool = True,
+) -> List[int]:
+    """Insert one record per entry in a single transaction and return their ids.
+
+    Each entry holds the keyword arguments of ``create_prediction_record``
+    (``student``, ``prediction``, ``confidence``, ``model_used`` and
+    optionally ``model_type`` / ``contributions`` / ``model_version`` /
+    ``csv_student_id``).
+    With ``commit=False`` the caller owns the transaction.
+    """
+    if not entries:
+        return []
+    values = [_prediction_record_values(student_id=student_id, **e) for e in entries]
+    stmt = insert(PredictionRecord).returning(PredictionRecord.id, sort_by_parameter_order=True)
+    ids = list(db.scalars(stmt, values).all())
+    if commit:
+        db.commit()
+    return ids
+
+
+def find_predictions_for_csv_students(
+    db: Session,
+    *,
+    csv_student_ids: List[int],
+    chunk_size: int = 500,
+) -> Dict[int, List[tuple]]:
+    """``(record id, model_type, model_version)`` of each CSV row's stored predictions, newest first."""
+    found: Dict[int, List[tuple]] = {}
+    unique = list(dict.fromkeys(csv_student_ids))
+    for i in range(0, len(unique), chunk_size):
+        stmt = (
+            select(
+                PredictionRecord.csv_student_id,
+                PredictionRecord.id,
+                PredictionRecord.model_type,
+                PredictionRecord.model_version,
+            )
+            .where(PredictionRecord.csv_student_id.in_(unique[i : i + chunk_size]))
+            .order_by(desc(PredictionRecord.id))
+        )
+        for csv_student_id, record_id, model_type, model_version in db.execute(stmt):
+            found.setdefault(csv_student_id, []).append((record_id, model_type, model_version))
+    return found
+
+
 def list_prediction_records(db: Session, *, limit: int = 50) -> List[PredictionRecord]:
     stmt = select(PredictionRecord).order_by(desc(PredictionRecord.created_at)).limit(limit)
     return list(db.scalars(stmt).all())
@@ -85,28 +170,246 @@ def set_prediction_photo(
     return record
 
 
+def set_prediction_contributions(
+    db: Session,
+    *,
+    record_id: int,
+    contributions: Dict[str, float],
+) -> Optional[PredictionRecord]:
+    record = db.get(PredictionRecord, record_id)
+    if record is None:
+        return None
+    record.contributions_json = json.dumps(contributions)
+    db.add(record)
+    db.commit()
+    db.refresh(record)
+    return record
+
+
+def csv_row_hash(row: dict) -> str:
+    """Digest of a parsed CSV row's name, department and semesters."""
+    key = "\x1f".join((row["name"], row["department"], row["semesters_json"]))
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def _csv_student_values(*, teacher_id: int, upload_batch: str, rows: List[dict]) -> List[dict]:
+    return [
+        {
+            "teacher_id": teacher_id,
+            "upload_batch": upload_batch,
+            "name": row["name"],
+            "department": row["department"],
+            "semesters_json": row["semesters_json"],
+            "row_hash": csv_row_hash(row),
+        }
+        for row in rows
+    ]
+
+
+def find_csv_students_by_hash(
+    db: Session,
+    *,
+    teacher_id: int,
+    hashes: List[str],
+    exclude_batch: Optional[str] = None,
+    chunk_size: int = 500,
+) -> Dict[str, dict]:
+    """The teacher's stored rows with one of *hashes*, keyed by row hash.
+
+    Each value holds ``id``, ``upload_batch`` and ``created_at`` of the
+    earliest match. Rows under *exclude_batch* (an upload still being
+    written) are ignored.
+    """
+    found: Dict[str, dict] = {}
+    unique = list(dict.fromkeys(hashes))
+    for i in range(0, len(unique), chunk_size):
+        stmt = (
+            select(CsvStudent.row_hash, CsvStudent.id, CsvStudent.upload_batch, CsvStudent.created_at)
+            .where(CsvStudent.teacher_id == teacher_id, CsvStudent.row_hash.in_(unique[i : i + chunk_size]))
+            .order_by(CsvStudent.id)
+        )
+        if exclude_batch is not None:
+            stmt = stmt.where(CsvStudent.upload_batch != exclude_batch)
+        for row_hash, record_id, upload_batch, created_at in db.execute(stmt):
+            found.setdefault(row_hash, {"id": record_id, "upload_batch": upload_batch, "created_at": created_at})
+    return found
+
+
+def filter_new_csv_rows(
+    db: Session,
+    *,
+    teacher_id: int,
+    rows: List[dict],
+    exclude_batch: Optional[str] = None,
+) -> List[dict]:
+    """*rows* minus those the teacher already has stored (see ``find_csv_students_by_hash``)."""
+    if not rows:
+        return []
+    hashes = [csv_row_hash(row) for row in rows]
+    existing = find_csv_students_by_hash(db, teacher_id=teacher_id, hashes=hashes, exclude_batch=exclude_batch)
+    return [row for row, row_hash in zip(rows, hashes) if row_hash not in existing]
+
+
+def get_csv_upload(db: Session, *, teacher_id: int, content_hash: str) -> Optional[CsvUpload]:
+    stmt = (
+        select(CsvUpload)
+        .where(CsvUpload.teacher_id == teacher_id, CsvUpload.content_hash == content_hash)
+        .order_by(CsvUpload.id)
+        .limit(1)
+    )
+    return db.scalars(stmt).first()
+
+
+def add_csv_upload(
+    db: Session,
+    *,
+    teacher_id: int,
+    content_hash: str,
+    upload_batch: str,
+    row_count: int,
+) -> CsvUpload:
+    """Stage the upload's index entry; it is committed with the upload's rows."""
+    upload = CsvUpload(
+        teacher_id=teacher_id,
+        content_hash=content_hash,
+        upload_batch=upload_batch,
+        row_count=row_count,
+    )
+    db.add(upload)
+    return upload
+
+
 def create_csv_students_batch(
     db: Session,
     *,
     teacher_id: int,
     upload_batch: str,
     rows: List[dict],
-) -> List[CsvStudent]:
+    batch_size: int = 1000,
+    commit: bool = True,
+) -> List[dict]:
+    """Insert *rows* in batches of *batch_size* within one transaction.
+
+    Returns one dict of column values per row, with ``id`` and
+    ``created_at`` taken from ``INSERT ... RETURNING`` instead of a SELECT
+    per row afterwards. With ``commit=False`` the caller owns the transaction.
+    """
+    stmt = insert(CsvStudent).returning(CsvStudent.id, CsvStudent.created_at, sort_by_parameter_order=True)
     records = []
-    for row in rows:
-        record = CsvStudent(
-            teacher_id=teacher_id,
-            upload_batch=upload_batch,
-            name=row["name"],
-            department=row["department"],
-            semesters_json=row["semesters_json"],
+    try:
+        for i in range(0, len(rows), batch_size):
+            values = _csv_student_values(teacher_id=teacher_id, upload_batch=upload_batch, rows=rows[i : i + batch_size])
+            for v, (record_id, created_at) in zip(values, db.execute(stmt, values).all()):
+                v["id"] = record_id
+                v["created_at"] = created_at
+                records.append(v)
+    except Exception:
+        db.rollback()
+        raise
+    if commit:
+        db.commit()
+    return records
+
+
+def insert_csv_students(
+    db: Session,
+    *,
+    teacher_id: int,
+    upload_batch: str,
+    rows: List[dict],
+) -> int:
+    """Insert *rows* without committing, for callers that write one upload in batches."""
+    if not rows:
+        return 0
+    db.execute(insert(CsvStudent), _csv_student_values(teacher_id=teacher_id, upload_batch=upload_batch, rows=rows))
+    return len(rows)
+
+
+def create_job(
+    db: Session,
+    *,
+    job_id: str,
+    teacher_id: int,
+    filename: str,
+    file_path: str,
+    upload_batch: str,
+    total_bytes: int,
+    score: bool = False,
+    model_type: Optional[str] = None,
+    content_hash: Optional[str] = None,
+) -> Job:
+    job = Job(
+        id=job_id,
+        teacher_id=teacher_id,
+        filename=filename,
+        file_path=file_path,
+        upload_batch=upload_batch,
+        total_bytes=total_bytes,
+        score=score,
+        model_type=model_type,
+        content_hash=content_hash,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def get_job(db: Session, *, job_id: str) -> Optional[Job]:
+    return db.get(Job, job_id)
+
+
+def list_unfinished_jobs(db: Session) -> List[Job]:
+    stmt = (
+        select(Job)
+        .where(Job.status.in_(("queued", "validating", "inserting")))
+        .order_by(Job.created_at)
+    )
+    return list(db.scalars(stmt).all())
+
+
+def claim_job(db: Session, *, job_id: str, owner: str, stale_before: datetime) -> bool:
+    """Take *job_id* for *owner* unless another runner renewed its claim after *stale_before*.
+
+    A single conditional UPDATE, so of several processes resuming the same
+    job exactly one gets it. Committed; False if the job is held or finished.
+    """
+    stmt = (
+        update(Job)
+        .where(
+            Job.id == job_id,
+            Job.status.in_(("queued", "validating", "inserting")),
+            or_(Job.owner.is_(None), Job.owner == owner, Job.heartbeat.is_(None), Job.heartbeat < stale_before),
         )
-        db.add(record)
-        records.append(record)
+        .values(owner=owner, heartbeat=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    claimed = db.execute(stmt).rowcount == 1
+    db.commit()
+    return claimed
+
+
+def renew_job_claim(db: Session, *, job_id: str, owner: str) -> bool:
+    """Refresh *owner*'s heartbeat without committing; False if the job was taken over."""
+    stmt = (
+        update(Job)
+        .where(Job.id == job_id, Job.owner == owner)
+        .values(heartbeat=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    return db.execute(stmt).rowcount == 1
+
+
+def release_job(db: Session, *, job_id: str, owner: str) -> None:
+    # Lets the next process resume the job at once instead of waiting out the lease.
+    stmt = (
+        update(Job)
+        .where(Job.id == job_id, Job.owner == owner)
+        .values(owner=None, heartbeat=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(stmt)
     db.commit()
-    for r in records:
-        db.refresh(r)
-    return records
 
 
 def list_all_teachers(db: Session) -> List[Teacher]:
@@ -1,21 +1,85 @@
 from __future__ import annotations
 
-from sqlalchemy import text
-from sqlalchemy import create_engine
+import os
+from typing import Any, Literal
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
 
-DATABASE_URL = "sqlite:///./student_performance.db"
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./student_performance.db")
+
+# "default" keeps SQLite's rollback journal and SQLAlchemy's pool defaults;
+# "production" switches a SQLite file to WAL with the PRAGMAs below, so
+# readers no longer wait on writers and a commit costs one WAL append
+# instead of a journal fsync, and sizes the pool for many request threads.
+DbProfile = Literal["default", "production"]
+DB_PROFILE: DbProfile = os.getenv("DB_PROFILE", "default")  # type: ignore[assignment]
 
 
 class Base(DeclarativeBase):
     pass
 
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False},
-)
+def _sqlite_pragmas() -> dict[str, Any]:
+    return {
+        "journal_mode": "WAL",
+        # With WAL, NORMAL only risks the last commits on power loss, not corruption.
+        "synchronous": "NORMAL",
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        # Negative: KiB rather than pages.
+        "cache_size": -int(os.getenv("SQLITE_CACHE_KB", "65536")),
+        "mmap_size": int(os.getenv("SQLITE_MMAP_BYTES", str(256 << 20))),
+    }
+
+
+def _sqlite_in_memory(url: str) -> bool:
+    return url.startswith("sqlite") and (":memory:" in url or url.rstrip("/") in ("sqlite:", "sqlite+pysqlite:"))
+
+
+def engine_options(url: str, profile: DbProfile) -> dict[str, Any]:
+    """Keyword arguments for ``create_engine`` under *profile*."""
+    options: dict[str, Any] = {}
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+    # In-memory SQLite keeps one connection per thread and takes no pool sizes.
+    if profile == "production" and not _sqlite_in_memory(url):
+        options.update(
+            pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        )
+        if not url.startswith("sqlite"):
+            # Server connections can be dropped while idle in the pool.
+            options.update(pool_pre_ping=True, pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")))
+    return options
+
+
+def create_db_engine(url: str | None = None, profile: DbProfile | None = None) -> Engine:
+    url = DATABASE_URL if url is None else url
+    profile = DB_PROFILE if profile is None else profile
+    if profile not in ("default", "production"):
+        raise ValueError(f"Unknown DB_PROFILE {profile!r}; expected 'default' or 'production'")
+    new_engine = create_engine(url, **engine_options(url, profile))
+
+    if profile == "production" and new_engine.dialect.name == "sqlite" and not _sqlite_in_memory(url):
+        pragmas = _sqlite_pragmas()
+
+        @event.listens_for(new_engine, "connect")
+        def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+            # Runs once per new DBAPI connection, before the pool hands it out.
+            cursor = dbapi_connection.cursor()
+            try:
+                for name, value in pragmas.items():
+                    cursor.execute(f"PRAGMA {name}={value}")
+            finally:
+                cursor.close()
+
+    return new_engine
+
+
+engine = create_db_engine()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -24,7 +88,18 @@ def init_db() -> None:
     from . import models  # noqa: F401
 
     Base.metadata.create_all(bind=engine)
+    if engine.dialect.name == "sqlite":
+        _migrate_sqlite()
+
+    # Ensure app_settings has exactly one row
+    from .models import AppSettings
+    with SessionLocal() as session:
+        if session.query(AppSettings).first() is None:
+            session.add(AppSettings(id=1, otp_enabled=False))
+            session.commit()
 
+
+def _migrate_sqlite() -> None:
     # Lightweight migrations for existing DBs
     with engine.begin() as conn:
         cols = conn.execute(text("PRAGMA table_info(prediction_records)"))
@@ -72,13 +147,35 @@ def init_db() -> None:
                 text("ALTER TABLE prediction_records ADD COLUMN avg_attendance FLOAT DEFAULT 0")
             )
 
+        if "model_type" not in existing:
+            conn.execute(text("ALTER TABLE prediction_records ADD COLUMN model_type VARCHAR"))
+
+        if "contributions_json" not in existing:
+            conn.execute(
+                text("ALTER TABLE prediction_records ADD COLUMN contributions_json VARCHAR")
+            )
+
+        if "model_version" not in existing:
+            conn.execute(text("ALTER TABLE prediction_records ADD COLUMN model_version VARCHAR"))
+
+        if "csv_student_id" not in existing:
+            conn.execute(text("ALTER TABLE prediction_records ADD COLUMN csv_student_id INTEGER"))
+            conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_prediction_records_csv_student_id "
+                    "ON prediction_records (csv_student_id)"
+                )
+            )
+
         # Drop the age column (no longer used as a prediction feature)
         if "age" in existing:
             conn.execute(text("ALTER TABLE prediction_records DROP COLUMN age"))
 
-    # Ensure app_settings has exactly one row
-    from .models import AppSettings
-    with SessionLocal() as session:
-        if session.query(AppSettings).first() is None:
-            session.add(AppSettings(id=1, otp_enabled=False))
-            session.commit()
+        cols = conn.execute(text("PRAGMA table_info(csv_students)"))
+        existing = {row[1] for row in cols.fetchall()}
+
+        if "row_hash" not in existing:
+            conn.execute(text("ALTER TABLE csv_students ADD COLUMN row_hash VARCHAR"))
+            conn.execute(
+                text("CREATE INDEX IF NOT EXISTS ix_csv_students_row_hash ON csv_students (row_hash)")
+            )
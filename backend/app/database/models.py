@@ -43,6 +43,14 @@ class PredictionRecord(Base):
         index=True,
     )
 
+    # The uploaded CSV row this prediction scored (POST /csv/upload-and-score, scoring jobs).
+    csv_student_id: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        ForeignKey("csv_students.id"),
+        nullable=True,
+        index=True,
+    )
+
     name: Mapped[Optional[str]] = mapped_column(String, nullable=True, default="")
 
     department: Mapped[Optional[str]] = mapped_column(String, nullable=True, default="")
@@ -56,6 +64,12 @@ class PredictionRecord(Base):
     prediction: Mapped[str] = mapped_column(String, nullable=False)
     confidence: Mapped[float] = mapped_column(Float, nullable=False)
     model_used: Mapped[str] = mapped_column(String, nullable=False)
+    model_type: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    # Registry version that produced the prediction (None for unversioned models).
+    model_version: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+
+    # SHAP contributions as {feature: value}; filled inline or on first request.
+    contributions_json: Mapped[Optional[str]] = mapped_column(String, nullable=True)
 
     photo: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
     photo_content_type: Mapped[Optional[str]] = mapped_column(String, nullable=True)
@@ -92,6 +106,26 @@ class CsvStudent(Base):
     name: Mapped[str] = mapped_column(String, nullable=False)
     department: Mapped[str] = mapped_column(String, nullable=False)
     semesters_json: Mapped[str] = mapped_column(String, nullable=False)
+    # Digest of name, department and semesters; re-uploaded rows are not stored again.
+    row_hash: Mapped[Optional[str]] = mapped_column(String, nullable=True, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class CsvUpload(Base):
+    # One per ingested file, so an identical re-upload maps to its batch.
+    __tablename__ = "csv_uploads"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    teacher_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("teachers.id"),
+        nullable=False,
+        index=True,
+    )
+    # SHA-256 of the uploaded bytes.
+    content_hash: Mapped[str] = mapped_column(String, nullable=False, index=True)
+    upload_batch: Mapped[str] = mapped_column(String, nullable=False)
+    row_count: Mapped[int] = mapped_column(Integer, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
 
 
@@ -100,3 +134,45 @@ class AppSettings(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, default=1)
     otp_enabled: Mapped[bool] = mapped_column(Integer, default=False, nullable=False)
+
+
+class Job(Base):
+    # A CSV upload ingested in the background by app.services.jobs.JobRunner.
+    __tablename__ = "jobs"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    teacher_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("teachers.id"),
+        nullable=False,
+        index=True,
+    )
+    # "queued", "validating", "inserting", "succeeded" or "failed".
+    status: Mapped[str] = mapped_column(String, nullable=False, default="queued", index=True)
+    filename: Mapped[str] = mapped_column(String, nullable=False)
+    # The spooled upload; removed once the job finishes.
+    file_path: Mapped[str] = mapped_column(String, nullable=False)
+    upload_batch: Mapped[str] = mapped_column(String, nullable=False)
+    score: Mapped[bool] = mapped_column(Integer, default=False, nullable=False)
+    model_type: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    content_hash: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+
+    total_bytes: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Offset reached by the current pass; inserts resume from here.
+    processed_bytes: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    rows_validated: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    rows_inserted: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    rows_scored: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Rows the teacher had already stored from an earlier upload.
+    rows_skipped: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    error_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # The first errors found, as a JSON list.
+    errors_json: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    message: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    # The runner holding the job and when it last renewed its claim; see crud.claim_job.
+    owner: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    heartbeat: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
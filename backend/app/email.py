@@ -1,22 +1,27 @@
 from __future__ import annotations
 
 import os
+from functools import lru_cache
 
-from fastapi_mail import ConnectionConfig, FastMail, MessageSchema, MessageType
 
-conf = ConnectionConfig(
-    MAIL_USERNAME=os.environ.get("MAIL_USERNAME", ""),
-    MAIL_PASSWORD=os.environ.get("MAIL_PASSWORD", ""),
-    MAIL_FROM=os.environ.get("MAIL_FROM", os.environ.get("MAIL_USERNAME", "")),
-    MAIL_PORT=int(os.environ.get("MAIL_PORT", "587")),
-    MAIL_SERVER=os.environ.get("MAIL_SERVER", "smtp.gmail.com"),
-    MAIL_STARTTLS=True,
-    MAIL_SSL_TLS=False,
-    USE_CREDENTIALS=True,
-    VALIDATE_CERTS=True,
-)
+@lru_cache(maxsize=1)
+def _fast_mail():
+    # fastapi_mail is slow to import and validates MAIL_FROM eagerly, so the
+    # client is only built when the first email is sent.
+    from fastapi_mail import ConnectionConfig, FastMail
 
-fast_mail = FastMail(conf)
+    conf = ConnectionConfig(
+        MAIL_USERNAME=os.environ.get("MAIL_USERNAME", ""),
+        MAIL_PASSWORD=os.environ.get("MAIL_PASSWORD", ""),
+        MAIL_FROM=os.environ.get("MAIL_FROM", os.environ.get("MAIL_USERNAME", "")),
+        MAIL_PORT=int(os.environ.get("MAIL_PORT", "587")),
+        MAIL_SERVER=os.environ.get("MAIL_SERVER", "smtp.gmail.com"),
+        MAIL_STARTTLS=True,
+        MAIL_SSL_TLS=False,
+        USE_CREDENTIALS=True,
+        VALIDATE_CERTS=True,
+    )
+    return FastMail(conf)
 
 
 async def send_otp_email(to_email: str, otp_code: str) -> None:
@@ -34,10 +39,12 @@ async def send_otp_email(to_email: str, otp_code: str) -> None:
     </div>
     """
 
+    from fastapi_mail import MessageSchema, MessageType
+
     message = MessageSchema(
         subject="Your Verification Code",
         recipients=[to_email],
         body=html,
         subtype=MessageType.html,
     )
-    await fast_mail.send_message(message)
+    await _fast_mail().send_message(message)
@@ -1,29 +1,39 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import os
+import threading
 import uuid
 import warnings
 
+import numpy as np
 from dotenv import load_dotenv
 
 load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"))
 from typing import Generator, List, Literal, Optional
 
-from fastapi import Depends, FastAPI, File, Form, HTTPException, Query, UploadFile
+from fastapi import BackgroundTasks, Depends, FastAPI, File, Form, HTTPException, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response, StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
 from app.auth import ADMIN_EMAIL, ADMIN_ID, ADMIN_PASSWORD, AuthPrincipal, create_access_token, get_current_teacher, hash_password, require_admin, require_principal, verify_password
-from app.database.crud import create_csv_students_batch, create_prediction_record, delete_student, delete_teacher, get_otp_enabled, list_all_students, list_all_teachers, list_csv_students_for_teacher, list_prediction_records, list_prediction_records_for_student, set_otp_enabled, set_prediction_photo
+from app.database.crud import add_csv_upload, create_csv_students_batch, create_prediction_record, create_prediction_records_batch, csv_row_hash, delete_student, delete_teacher, filter_new_csv_rows, find_csv_students_by_hash, find_predictions_for_csv_students, get_csv_upload, get_job, get_otp_enabled, insert_csv_students, list_all_students, list_all_teachers, list_csv_students_for_teacher, list_prediction_records, list_prediction_records_for_student, set_otp_enabled, set_prediction_contributions, set_prediction_photo
 from app.database.db import SessionLocal, init_db
 from app.database.models import Student, Teacher
 from app.email import send_otp_email
 from app.otp import can_resend_otp, cleanup_expired_otps, create_otp_record, verify_otp
-from app.services.csv_processor import generate_template_csv, validate_and_parse_csv
+from app.services.arrow_ingest import ArrowUnavailable, arrow_format, validate_and_parse_arrow
+from app.services.csv_columnar import validate_and_parse_csv_columnar
+from app.services.csv_parallel import ParallelCsvValidator
+from app.services.csv_processor import generate_template_csv, validate_and_parse_csv_stream
 from app.schemas import (
     AdminLogin,
+    BatchPredictionInput,
+    ExplanationOutput,
     FeatureContribution,
     OTPSentResponse,
     OTPSettingsResponse,
@@ -38,7 +48,12 @@ from app.schemas import (
     TeacherSignup,
     TokenResponse,
 )
-from app.services.predictor import ModelArtifactsNotFound, PredictorService
+from app.services.batching import MicroBatcher
+from app.services.inference_pool import InferencePool
+from app.services.jobs import JobRunner, job_progress
+from app.services.memory import memory_report
+from app.services.model_registry import ModelRegistry, ModelVersionError
+from app.services.predictor import EarlyExit, ModelArtifactsNotFound, PredictionResult, PredictorService, vectorize_semesters
 
 
 app = FastAPI(
@@ -60,7 +75,61 @@ app.add_middleware(
 )
 
 
-predictor = PredictorService()
+registry = ModelRegistry()
+
+
+def _load_predictor(version: Optional[str]) -> PredictorService:
+    # Without an activated registry version, serve the plain ml/models/ artifacts.
+    if version is None:
+        return PredictorService()
+    return PredictorService(registry.version_dir(version), version=version)
+
+
+# Model work runs here or, with INFERENCE_WORKERS > 0, in worker processes.
+# The pool owns the serving PredictorService so a model activation can swap it.
+inference_pool = InferencePool(_load_predictor(registry.active_version()))
+# Single-student requests are coalesced into one model call per short window.
+batcher = MicroBatcher(inference_pool)
+# Worker processes for /csv/upload?mode=parallel, started on first use.
+csv_validator = ParallelCsvValidator()
+
+# Model types loaded and warmed in the background at startup; empty disables
+# eager loading (models then load on first use and /ready is immediately 200).
+PRELOAD_MODELS = tuple(t.strip() for t in os.getenv("PRELOAD_MODELS", "ml,dl").split(",") if t.strip() in ("ml", "dl"))
+
+# Reported by GET /ready.
+_readiness: dict = {"status": "starting", "models": [], "error": None}
+
+# "inline" computes SHAP contributions inside the request, "deferred" leaves
+# them to GET /records/{id}/explanation, "none" skips them entirely.
+ExplainMode = Literal["none", "inline", "deferred"]
+
+# "auto" checks the rules first and only runs the Random Forest when they
+# do not settle the outcome (see _rule_fast_path).
+ModelChoice = Literal["ml", "dl", "auto"]
+
+RULES_FAST_PATH = "Rules (fast path)"
+
+# Confidence reported for an outcome the rules settled without running a
+# model. It is not a probability: it is the floor _apply_rule_override
+# gives rule decisions, so the fast path and the override agree.
+RULES_FAST_PATH_CONFIDENCE = 0.95
+
+# How far above the "Good" cut-off (75) a rule score must be before
+# model_type=auto trusts the rules without asking the model.
+RULE_FAST_PATH_MARGIN = float(os.getenv("RULE_FAST_PATH_MARGIN", "5"))
+
+# "buffered" reads the whole upload and echoes the created students;
+# "stream" validates the spooled file incrementally and writes it in batches;
+# "parallel" validates chunks of the file in worker processes (large files).
+# All modes return the earlier batch for a byte-identical file and skip rows
+# the teacher already has stored ("inserted" counts the new ones). Parquet
+# and Arrow IPC files are read in buffered mode only.
+CsvUploadMode = Literal["buffered", "stream", "parallel"]
+CSV_STREAM_BATCH_SIZE = int(os.getenv("CSV_STREAM_BATCH_SIZE", "500"))
+CSV_MAX_REPORTED_ERRORS = int(os.getenv("CSV_MAX_REPORTED_ERRORS", "100"))
+# Rows per INSERT statement when a validated upload is written.
+CSV_INSERT_BATCH_SIZE = int(os.getenv("CSV_INSERT_BATCH_SIZE", "1000"))
 
 
 def _rule_score(student: StudentInput) -> float:
@@ -170,10 +239,84 @@ def _apply_rule_override(*, student: StudentInput, prediction: str, confidence:
     order = {"Needs Attention": 0, "Average": 1, "Good": 2}
     if order.get(label, 0) > order.get(prediction, 0):
         # Make confidence reflect a deterministic rule.
-        return label, max(confidence, 0.95), f"{model_used} + Rules"
+        return label, max(confidence, RULES_FAST_PATH_CONFIDENCE), f"{model_used} + Rules"
     return prediction, confidence, model_used
 
 
+def _rule_fast_path(student: StudentInput) -> Optional[tuple[str, float, str]]:
+    """Outcome of _apply_rule_override when it does not depend on the model.
+
+    Very poor data is always forced to "Needs Attention", and clean data
+    well inside the "Good" band is always upgraded to "Good". Below 55 the
+    override never changes the model's label, so those rows still need it.
+    No model ran, so the confidence is RULES_FAST_PATH_CONFIDENCE.
+    """
+    is_suspicious, quality_score = _assess_data_quality(student)
+    if is_suspicious:
+        if quality_score < 0.6:
+            return "Needs Attention", RULES_FAST_PATH_CONFIDENCE, RULES_FAST_PATH
+        return None
+    if _rule_score(student) >= 75 + RULE_FAST_PATH_MARGIN:
+        return "Good", RULES_FAST_PATH_CONFIDENCE, RULES_FAST_PATH
+    return None
+
+
+def _predict_students(
+    students: List[StudentInput],
+    payloads: Optional[List[dict]],
+    *,
+    model_type: ModelChoice,
+    explain: ExplainMode,
+    early_exit: EarlyExit,
+    features: Optional[np.ndarray] = None,
+) -> tuple[List[PredictionResult], List[tuple[str, float, str]], List[str]]:
+    """Model results, final (prediction, confidence, model_used) and stored model_type per student.
+
+    Given *features* (the students' N x 24 matrix) instead of *payloads*,
+    the rows the model has to score go to the inference pool as one matrix.
+    """
+    fast = [_rule_fast_path(s) if model_type == "auto" else None for s in students]
+    model = "ml" if model_type == "auto" else model_type
+    pending = [i for i, f in enumerate(fast) if f is None]
+    options = {"model_type": model, "explain": (explain == "inline"), "early_exit": early_exit}
+
+    try:
+        if features is None:
+            scored = batcher.predict_batch([payloads[i] for i in pending], **options)
+        else:
+            scored = inference_pool.predict_matrix(features[pending], **options) if pending else []
+    except ModelArtifactsNotFound as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail="Prediction timed out")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {e}")
+
+    results: List[PredictionResult] = []
+    finals: List[tuple[str, float, str]] = []
+    stored: List[str] = []
+    by_index = dict(zip(pending, scored))
+    for i, student in enumerate(students):
+        if fast[i] is not None:
+            pred, conf, used = fast[i]
+            results.append(PredictionResult(prediction=pred, confidence=conf, model_used=used, contributions={}))
+            finals.append(fast[i])
+            stored.append("rules")
+            continue
+        result = by_index[i]
+        results.append(result)
+        finals.append(
+            _apply_rule_override(
+                student=student,
+                prediction=result.prediction,
+                confidence=result.confidence,
+                model_used=result.model_used,
+            )
+        )
+        stored.append(model)
+    return results, finals, stored
+
+
 def _payload_from_student(student: StudentInput) -> dict:
     payload: dict[str, float | int] = {}
 
@@ -197,6 +340,60 @@ def _payload_from_student(student: StudentInput) -> dict:
     return payload
 
 
+def _feature_matrix(students: List[StudentInput]) -> np.ndarray:
+    """N x 24 model input for *students*, filled like _payload_from_student."""
+    marks = np.zeros((len(students), 8, 3), dtype=np.float64)
+    taken = np.zeros((len(students), 8), dtype=bool)
+    for i, student in enumerate(students):
+        for s in student.semesters:
+            marks[i, s.semester - 1] = (s.internal_marks, s.university_marks, s.attendance)
+            taken[i, s.semester - 1] = True
+    return vectorize_semesters(marks, taken)
+
+
+def _prediction_output(
+    *,
+    record_id: int,
+    student: StudentInput,
+    payload: dict,
+    result: PredictionResult,
+    prediction: str,
+    confidence: float,
+    model_used: str,
+    explain: ExplainMode = "inline",
+) -> PredictionOutput:
+    return PredictionOutput(
+        record_id=record_id,
+        department=student.department,
+        semesters=student.semesters,
+        prediction=prediction,
+        confidence=confidence,
+        model_used=model_used,
+        feature_contributions=_feature_contributions(payload, result.contributions),
+        explanation_url=(
+            f"/records/{record_id}/explanation"
+            if explain == "deferred" and result.model_used != RULES_FAST_PATH
+            else None
+        ),
+        model_accuracy=result.model_accuracy,
+        trees_used=result.trees_used,
+        model_version=result.model_version,
+    )
+
+
+def _feature_contributions(payload: dict, contributions: dict) -> List[FeatureContribution]:
+    if not contributions:
+        return []
+    return [
+        FeatureContribution(
+            feature=f,
+            value=float(payload.get(f, 0.0)),
+            contribution=float(contributions.get(f, 0.0)),
+        )
+        for f in list(payload.keys())
+    ]
+
+
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
     try:
@@ -217,6 +414,30 @@ def _startup() -> None:
         cleanup_expired_otps(db)
     finally:
         db.close()
+    # Pick up the ingestion jobs the last process did not finish.
+    job_runner.resume()
+
+    if PRELOAD_MODELS:
+        _readiness.update(status="starting", models=[], error=None)
+        threading.Thread(target=_warm_up_models, name="model-warm-up", daemon=True).start()
+    else:
+        _readiness.update(status="ready", models=[], error=None)
+
+
+def _warm_up_models() -> None:
+    try:
+        models = inference_pool.warm_up(PRELOAD_MODELS)
+    except Exception as e:
+        _readiness.update(status="failed", error=str(e))
+        return
+    _readiness.update(status="ready", models=models)
+
+
+@app.on_event("shutdown")
+def _shutdown() -> None:
+    inference_pool.shutdown()
+    csv_validator.shutdown()
+    job_runner.shutdown()
 
 
 @app.get("/")
@@ -229,6 +450,13 @@ def health_check() -> dict:
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+def readiness_check() -> JSONResponse:
+    # Unlike /health, only 200 once the preloaded models are warm.
+    ready = _readiness["status"] == "ready"
+    return JSONResponse(status_code=200 if ready else 503, content=dict(_readiness))
+
+
 @app.get("/auth/otp-status", response_model=OTPSettingsResponse)
 def get_otp_status(db: Session = Depends(get_db)) -> OTPSettingsResponse:
     return OTPSettingsResponse(otp_enabled=get_otp_enabled(db))
@@ -394,24 +622,22 @@ async def resend_otp_route(payload: ResendOTPRequest, db: Session = Depends(get_
 @app.post("/predict", response_model=PredictionOutput)
 def predict(
     student: StudentInput,
-    model_type: Literal["ml", "dl"] = Query("ml"),
+    model_type: ModelChoice = Query("ml"),
+    explain: ExplainMode = Query("inline"),
+    early_exit: EarlyExit = Query("off"),
     db: Session = Depends(get_db),
     principal: AuthPrincipal = Depends(require_principal),
 ) -> PredictionOutput:
-    try:
-        payload = _payload_from_student(student)
-        result = predictor.predict(payload, model_type=model_type)
-    except ModelArtifactsNotFound as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Prediction failed: {e}")
-
-    final_pred, final_conf, final_model_used = _apply_rule_override(
-        student=student,
-        prediction=result.prediction,
-        confidence=result.confidence,
-        model_used=result.model_used,
+    payload = _payload_from_student(student)
+    results, finals, stored = _predict_students(
+        [student],
+        [payload],
+        model_type=model_type,
+        explain=explain,
+        early_exit=early_exit,
     )
+    result = results[0]
+    final_pred, final_conf, final_model_used = finals[0]
 
     record = create_prediction_record(
         db,
@@ -420,33 +646,84 @@ def predict(
         confidence=final_conf,
         model_used=final_model_used,
         student_id=(principal.id if principal.role == "student" else None),
+        model_type=stored[0],
+        contributions=result.contributions,
+        model_version=result.model_version,
     )
 
-    return PredictionOutput(
+    return _prediction_output(
         record_id=record.id,
-        department=student.department,
-        semesters=student.semesters,
+        student=student,
+        payload=payload,
+        result=result,
         prediction=final_pred,
         confidence=final_conf,
         model_used=final_model_used,
-        feature_contributions=[
-            FeatureContribution(
-                feature=f,
-                value=float(payload.get(f, 0.0)),
-                contribution=float(result.contributions.get(f, 0.0)),
-            )
-            for f in list(payload.keys())
+        explain=explain,
+    )
+
+
+@app.post("/predict/batch", response_model=List[PredictionOutput])
+def predict_batch(
+    batch: BatchPredictionInput,
+    model_type: ModelChoice = Query("ml"),
+    explain: ExplainMode = Query("inline"),
+    early_exit: EarlyExit = Query("off"),
+    db: Session = Depends(get_db),
+    principal: AuthPrincipal = Depends(require_principal),
+) -> List[PredictionOutput]:
+    students = batch.students
+    payloads = [_payload_from_student(s) for s in students]
+    results, finals, stored = _predict_students(
+        students,
+        payloads,
+        model_type=model_type,
+        explain=explain,
+        early_exit=early_exit,
+    )
+
+    record_ids = create_prediction_records_batch(
+        db,
+        entries=[
+            {
+                "student": student,
+                "prediction": pred,
+                "confidence": conf,
+                "model_used": used,
+                "model_type": used_type,
+                "contributions": result.contributions,
+                "model_version": result.model_version,
+            }
+            for student, result, (pred, conf, used), used_type in zip(students, results, finals, stored)
         ],
-        model_accuracy=result.model_accuracy,
+        student_id=(principal.id if principal.role == "student" else None),
     )
 
+    return [
+        _prediction_output(
+            record_id=record_id,
+            student=student,
+            payload=payload,
+            result=result,
+            prediction=pred,
+            confidence=conf,
+            model_used=used,
+            explain=explain,
+        )
+        for record_id, student, payload, result, (pred, conf, used) in zip(
+            record_ids, students, payloads, results, finals
+        )
+    ]
+
 
 @app.post("/predict-with-photo", response_model=PredictionOutput)
 async def predict_with_photo(
     name: str = Form(...),
     department: str = Form(...),
     semesters_json: str = Form(...),
-    model_type: Literal["ml", "dl"] = Query("ml"),
+    model_type: ModelChoice = Query("ml"),
+    explain: ExplainMode = Query("inline"),
+    early_exit: EarlyExit = Query("off"),
     photo: Optional[UploadFile] = File(None),
     db: Session = Depends(get_db),
     principal: AuthPrincipal = Depends(require_principal),
@@ -458,20 +735,18 @@ async def predict_with_photo(
 
     student = StudentInput(name=name, department=department, semesters=semesters)
 
-    try:
-        payload = _payload_from_student(student)
-        result = predictor.predict(payload, model_type=model_type)
-    except ModelArtifactsNotFound as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Prediction failed: {e}")
-
-    final_pred, final_conf, final_model_used = _apply_rule_override(
-        student=student,
-        prediction=result.prediction,
-        confidence=result.confidence,
-        model_used=result.model_used,
+    payload = _payload_from_student(student)
+    # Waiting on the model (or a worker process) must not block the event loop.
+    results, finals, stored = await run_in_threadpool(
+        _predict_students,
+        [student],
+        [payload],
+        model_type=model_type,
+        explain=explain,
+        early_exit=early_exit,
     )
+    result = results[0]
+    final_pred, final_conf, final_model_used = finals[0]
 
     record = create_prediction_record(
         db,
@@ -480,6 +755,9 @@ async def predict_with_photo(
         confidence=final_conf,
         model_used=final_model_used,
         student_id=(principal.id if principal.role == "student" else None),
+        model_type=stored[0],
+        contributions=result.contributions,
+        model_version=result.model_version,
     )
 
     if photo is not None:
@@ -494,36 +772,43 @@ async def predict_with_photo(
         if updated is None:
             raise HTTPException(status_code=404, detail="Record not found")
 
-    return PredictionOutput(
+    return _prediction_output(
         record_id=record.id,
-        department=student.department,
-        semesters=student.semesters,
+        student=student,
+        payload=payload,
+        result=result,
         prediction=final_pred,
         confidence=final_conf,
         model_used=final_model_used,
-        feature_contributions=[
-            FeatureContribution(
-                feature=f,
-                value=float(payload.get(f, 0.0)),
-                contribution=float(result.contributions.get(f, 0.0)),
-            )
-            for f in list(payload.keys())
-        ],
-        model_accuracy=result.model_accuracy,
+        explain=explain,
     )
 
 
 @app.post("/csv/upload")
 async def upload_csv(
     file: UploadFile = File(...),
+    mode: CsvUploadMode = Query("buffered"),
     db: Session = Depends(get_db),
     teacher: Teacher = Depends(get_current_teacher),
 ) -> dict:
-    if not file.filename or not file.filename.lower().endswith(".csv"):
-        raise HTTPException(status_code=400, detail="File must be a .csv file")
+    fmt = _upload_format(file.filename)
+    if fmt != "csv" and mode != "buffered":
+        raise HTTPException(status_code=400, detail=f"mode={mode} only reads .csv files")
+
+    if mode == "stream":
+        return await run_in_threadpool(_stream_csv_upload, file, db, teacher.id)
 
     content = await file.read()
-    parsed_rows, errors = validate_and_parse_csv(content)
+    content_hash = hashlib.sha256(content).hexdigest()
+    previous = get_csv_upload(db, teacher_id=teacher.id, content_hash=content_hash)
+    if previous is not None and mode != "buffered":
+        # The same bytes were ingested before: hand back that batch unparsed.
+        return {"count": previous.row_count, "inserted": 0, "duplicate": True, "upload_batch": previous.upload_batch}
+
+    if mode == "parallel":
+        return await run_in_threadpool(_parallel_csv_upload, content, content_hash, db, teacher.id)
+
+    parsed_rows, errors, _ = _validate_upload(content, fmt)
 
     if errors:
         raise HTTPException(
@@ -534,31 +819,403 @@ async def upload_csv(
             },
         )
 
+    # Rows the teacher already has are echoed with their stored ids, not inserted again.
+    hashes = [csv_row_hash(row) for row in parsed_rows]
+    existing = find_csv_students_by_hash(db, teacher_id=teacher.id, hashes=hashes)
+    if previous is not None and all(h in existing for h in hashes):
+        # The same bytes were ingested before. That batch only holds the rows
+        # that were new then, so the student list comes from the row hashes.
+        records = [{**row, **existing[row_hash]} for row, row_hash in zip(parsed_rows, hashes)]
+        return _csv_upload_response(records, inserted=0, duplicate=True, upload_batch=previous.upload_batch)
+
     batch_id = str(uuid.uuid4())
-    records = create_csv_students_batch(
+    add_csv_upload(db, teacher_id=teacher.id, content_hash=content_hash, upload_batch=batch_id, row_count=len(parsed_rows))
+    created = create_csv_students_batch(
         db,
         teacher_id=teacher.id,
         upload_batch=batch_id,
-        rows=parsed_rows,
+        rows=[row for row, row_hash in zip(parsed_rows, hashes) if row_hash not in existing],
+        batch_size=CSV_INSERT_BATCH_SIZE,
     )
+    new_records = iter(created)
+    records = [
+        {**row, **existing[row_hash]} if row_hash in existing else next(new_records)
+        for row, row_hash in zip(parsed_rows, hashes)
+    ]
+
+    return _csv_upload_response(records, inserted=len(created), duplicate=False, upload_batch=batch_id)
 
+
+def _csv_upload_response(records: List[dict], *, inserted: int, duplicate: bool, upload_batch: str) -> dict:
     return {
         "count": len(records),
-        "upload_batch": batch_id,
+        "inserted": inserted,
+        "duplicate": duplicate,
+        "upload_batch": upload_batch,
         "students": [
             {
-                "id": r.id,
-                "name": r.name,
-                "department": r.department,
-                "semesters": json.loads(r.semesters_json),
-                "upload_batch": r.upload_batch,
-                "created_at": r.created_at.isoformat(),
+                "id": r["id"],
+                "name": r["name"],
+                "department": r["department"],
+                "semesters": json.loads(r["semesters_json"]),
+                "upload_batch": r["upload_batch"],
+                "created_at": r["created_at"].isoformat(),
             }
             for r in records
         ],
     }
 
 
+def _upload_format(filename: Optional[str]) -> str:
+    """The upload's format: "csv", or the Arrow format of a Parquet / Arrow IPC file."""
+    if filename and filename.lower().endswith(".csv"):
+        return "csv"
+    fmt = arrow_format(filename or "")
+    if fmt is None:
+        raise HTTPException(status_code=400, detail="File must be a .csv, .parquet or .arrow file")
+    return fmt
+
+
+def _validate_upload(content: bytes, fmt: str) -> tuple[List[dict], List[dict], int]:
+    """Parsed rows, errors and the row number of the first data row."""
+    if fmt == "csv":
+        return (*validate_and_parse_csv_columnar(content), 2)
+    try:
+        return (*validate_and_parse_arrow(content, fmt), 1)
+    except ArrowUnavailable as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _file_sha256(f) -> str:
+    f.seek(0)
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: f.read(1 << 20), b""):
+        digest.update(chunk)
+    f.seek(0)
+    return digest.hexdigest()
+
+
+def _stream_csv_upload(file: UploadFile, db: Session, teacher_id: int) -> dict:
+    # Hashing the spooled file is a fraction of the cost of parsing it.
+    content_hash = _file_sha256(file.file)
+    previous = get_csv_upload(db, teacher_id=teacher_id, content_hash=content_hash)
+    if previous is not None:
+        return {"count": previous.row_count, "inserted": 0, "duplicate": True, "upload_batch": previous.upload_batch}
+
+    # The upload is already spooled to disk; read it from there in chunks and
+    # keep every batch in one transaction so a bad row rejects the whole file.
+    batch_id = str(uuid.uuid4())
+    inserted = 0
+
+    def insert_new_rows(rows: List[dict]) -> None:
+        nonlocal inserted
+        new_rows = filter_new_csv_rows(db, teacher_id=teacher_id, rows=rows, exclude_batch=batch_id)
+        inserted += insert_csv_students(db, teacher_id=teacher_id, upload_batch=batch_id, rows=new_rows)
+
+    try:
+        result = validate_and_parse_csv_stream(
+            file.file,
+            on_batch=insert_new_rows,
+            batch_size=CSV_STREAM_BATCH_SIZE,
+            max_errors=CSV_MAX_REPORTED_ERRORS,
+        )
+    except Exception:
+        db.rollback()
+        raise
+
+    if result.errors:
+        db.rollback()
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "message": f"CSV validation failed: {result.error_count} error(s) found",
+                "errors": result.errors,
+                "truncated": result.error_count > len(result.errors),
+            },
+        )
+    add_csv_upload(db, teacher_id=teacher_id, content_hash=content_hash, upload_batch=batch_id, row_count=result.row_count)
+    db.commit()
+    return {"count": result.row_count, "inserted": inserted, "duplicate": False, "upload_batch": batch_id}
+
+
+def _parallel_csv_upload(content: bytes, content_hash: str, db: Session, teacher_id: int) -> dict:
+    parsed_rows, errors = csv_validator.validate(content)
+    if errors:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "message": f"CSV validation failed: {len(errors)} error(s) found",
+                "errors": errors[:CSV_MAX_REPORTED_ERRORS],
+                "truncated": len(errors) > CSV_MAX_REPORTED_ERRORS,
+            },
+        )
+
+    batch_id = str(uuid.uuid4())
+    inserted = 0
+    try:
+        for i in range(0, len(parsed_rows), CSV_INSERT_BATCH_SIZE):
+            new_rows = filter_new_csv_rows(
+                db,
+                teacher_id=teacher_id,
+                rows=parsed_rows[i : i + CSV_INSERT_BATCH_SIZE],
+                exclude_batch=batch_id,
+            )
+            inserted += insert_csv_students(db, teacher_id=teacher_id, upload_batch=batch_id, rows=new_rows)
+        add_csv_upload(db, teacher_id=teacher_id, content_hash=content_hash, upload_batch=batch_id, row_count=len(parsed_rows))
+    except Exception:
+        db.rollback()
+        raise
+    db.commit()
+    return {"count": len(parsed_rows), "inserted": inserted, "duplicate": False, "upload_batch": batch_id}
+
+
+@app.post("/csv/upload-and-score")
+async def upload_and_score_csv(
+    file: UploadFile = File(...),
+    model_type: ModelChoice = Query("ml"),
+    early_exit: EarlyExit = Query("off"),
+    db: Session = Depends(get_db),
+    teacher: Teacher = Depends(get_current_teacher),
+) -> dict:
+    """Store a class CSV and predict every student in it with one model call.
+
+    Explanations are not computed up front; each result's record can be
+    explained later through GET /records/{id}/explanation. Parquet and Arrow
+    IPC files are accepted too (rows are then numbered from 1).
+    """
+    fmt = _upload_format(file.filename)
+    content = await file.read()
+    return await run_in_threadpool(_score_csv_upload, content, fmt, db, teacher.id, model_type, early_exit)
+
+
+def _score_csv_upload(
+    content: bytes,
+    fmt: str,
+    db: Session,
+    teacher_id: int,
+    model_type: ModelChoice,
+    early_exit: EarlyExit,
+) -> dict:
+    parsed_rows, errors, first_row = _validate_upload(content, fmt)
+    students: List[StudentInput] = []
+    if not errors:
+        students, errors = _students_from_rows(parsed_rows, first_row=first_row)
+    if errors:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "message": f"CSV validation failed: {len(errors)} error(s) found",
+                "errors": errors,
+            },
+        )
+
+    results, finals, stored = _predict_students(
+        students,
+        None,
+        model_type=model_type,
+        explain="none",
+        early_exit=early_exit,
+        features=_feature_matrix(students),
+    )
+
+    content_hash = hashlib.sha256(content).hexdigest()
+    previous = get_csv_upload(db, teacher_id=teacher_id, content_hash=content_hash)
+    batch_id = previous.upload_batch if previous is not None else str(uuid.uuid4())
+    # Students and their predictions are stored together or not at all.
+    try:
+        csv_ids, record_ids, inserted = _store_scored_rows(
+            db,
+            teacher_id=teacher_id,
+            upload_batch=batch_id,
+            parsed_rows=parsed_rows,
+            entries=_prediction_entries(students, results, finals, stored),
+        )
+        if previous is None:
+            add_csv_upload(db, teacher_id=teacher_id, content_hash=content_hash, upload_batch=batch_id, row_count=len(parsed_rows))
+    except Exception:
+        db.rollback()
+        raise
+    db.commit()
+
+    return {
+        "count": len(students),
+        "inserted": inserted,
+        "duplicate": previous is not None,
+        "upload_batch": batch_id,
+        "results": [
+            {
+                "row": first_row + i,
+                "csv_student_id": csv_id,
+                "record_id": record_id,
+                "name": student.name,
+                "department": student.department,
+                "prediction": pred,
+                "confidence": conf,
+                "model_used": used,
+                "model_version": result.model_version,
+            }
+            for i, (csv_id, record_id, student, result, (pred, conf, used)) in enumerate(
+                zip(csv_ids, record_ids, students, results, finals)
+            )
+        ],
+    }
+
+
+def _store_scored_rows(
+    db: Session,
+    *,
+    teacher_id: int,
+    upload_batch: str,
+    parsed_rows: List[dict],
+    entries: List[dict],
+    exclude_batch: Optional[str] = None,
+) -> tuple[List[int], List[int], int]:
+    """Store scored CSV rows and their predictions without committing.
+
+    Rows the teacher already has keep their stored id, and where the same
+    model type and version already scored such a row its record is reused,
+    so scoring a file again stores nothing new. Returns the CSV row id and
+    prediction record id of each row, and the number of rows inserted.
+    """
+    hashes = [csv_row_hash(row) for row in parsed_rows]
+    existing = find_csv_students_by_hash(db, teacher_id=teacher_id, hashes=hashes, exclude_batch=exclude_batch)
+    created = iter(
+        create_csv_students_batch(
+            db,
+            teacher_id=teacher_id,
+            upload_batch=upload_batch,
+            rows=[row for row, row_hash in zip(parsed_rows, hashes) if row_hash not in existing],
+            batch_size=CSV_INSERT_BATCH_SIZE,
+            commit=False,
+        )
+    )
+    csv_ids = [existing[h]["id"] if h in existing else next(created)["id"] for h in hashes]
+    inserted = sum(1 for h in hashes if h not in existing)
+
+    scored = find_predictions_for_csv_students(db, csv_student_ids=[existing[h]["id"] for h in hashes if h in existing])
+    record_ids: List[Optional[int]] = []
+    new_entries = []
+    for csv_id, entry in zip(csv_ids, entries):
+        match = next(
+            (
+                record_id
+                for record_id, model_type, model_version in scored.get(csv_id, [])
+                if model_type == entry["model_type"] and model_version == entry["model_version"]
+            ),
+            None,
+        )
+        record_ids.append(match)
+        if match is None:
+            new_entries.append({**entry, "csv_student_id": csv_id})
+    new_ids = iter(create_prediction_records_batch(db, entries=new_entries, commit=False))
+    return csv_ids, [record_id if record_id is not None else next(new_ids) for record_id in record_ids], inserted
+
+
+def _students_from_rows(parsed_rows: List[dict], *, first_row: int = 2) -> tuple[List[StudentInput], List[dict]]:
+    # The CSV checks are per field; the prediction input also rejects
+    # implausible students (all-zero marks or attendance, ...).
+    students: List[StudentInput] = []
+    errors: List[dict] = []
+    for i, row in enumerate(parsed_rows):
+        try:
+            students.append(
+                StudentInput(
+                    name=row["name"],
+                    department=row["department"],
+                    semesters=json.loads(row["semesters_json"]),
+                )
+            )
+        except ValidationError as e:
+            errors.append({"row": first_row + i, "field": "student", "message": e.errors()[0]["msg"]})
+    return students, errors
+
+
+def _prediction_entries(students, results, finals, stored) -> List[dict]:
+    return [
+        {
+            "student": student,
+            "prediction": pred,
+            "confidence": conf,
+            "model_used": used,
+            "model_type": used_type,
+            "contributions": result.contributions,
+            "model_version": result.model_version,
+        }
+        for student, result, (pred, conf, used), used_type in zip(students, results, finals, stored)
+    ]
+
+
+def _check_job_rows(parsed_rows: List[dict], first_row: int) -> List[dict]:
+    return _students_from_rows(parsed_rows, first_row=first_row)[1]
+
+
+def _score_job_rows(db: Session, teacher_id: int, upload_batch: str, parsed_rows: List[dict], model_type: str) -> int:
+    # Runs in a job thread; the runner commits the rows and records with the chunk.
+    students, _ = _students_from_rows(parsed_rows)
+    results, finals, stored = _predict_students(
+        students,
+        None,
+        model_type=model_type,
+        explain="none",
+        early_exit="off",
+        features=_feature_matrix(students),
+    )
+    _, _, inserted = _store_scored_rows(
+        db,
+        teacher_id=teacher_id,
+        upload_batch=upload_batch,
+        parsed_rows=parsed_rows,
+        entries=_prediction_entries(students, results, finals, stored),
+        exclude_batch=upload_batch,
+    )
+    return inserted
+
+
+# Background CSV ingestion (POST /csv/jobs); at most JOB_WORKERS jobs run at once.
+job_runner = JobRunner(SessionLocal, check_rows=_check_job_rows, score_rows=_score_job_rows)
+
+
+@app.post("/csv/jobs", status_code=202)
+async def create_csv_job(
+    file: UploadFile = File(...),
+    score: bool = Query(False),
+    model_type: ModelChoice = Query("ml"),
+    db: Session = Depends(get_db),
+    teacher: Teacher = Depends(get_current_teacher),
+) -> dict:
+    """Queue a CSV upload for background ingestion and return its job id.
+
+    The job validates the whole file, then inserts it (and, with
+    ``score=true``, predicts every student) in chunks; follow it with
+    GET /jobs/{job_id}.
+    """
+    if not file.filename or not file.filename.lower().endswith(".csv"):
+        raise HTTPException(status_code=400, detail="File must be a .csv file")
+
+    job = await run_in_threadpool(
+        job_runner.create,
+        db,
+        teacher_id=teacher.id,
+        filename=file.filename,
+        source=file.file,
+        score=score,
+        model_type=model_type if score else None,
+    )
+    return {"job_id": job.id, "status": job.status, "upload_batch": job.upload_batch, "status_url": f"/jobs/{job.id}"}
+
+
+@app.get("/jobs/{job_id}")
+def get_csv_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    teacher: Teacher = Depends(get_current_teacher),
+) -> dict:
+    job = get_job(db, job_id=job_id)
+    if job is None or job.teacher_id != teacher.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_progress(job)
+
+
 @app.get("/csv/students")
 def list_csv_students(
     db: Session = Depends(get_db),
@@ -611,6 +1268,7 @@ def history(
             "prediction": r.prediction,
             "confidence": r.confidence,
             "model_used": r.model_used,
+            "model_version": r.model_version,
             "has_photo": r.photo is not None,
             "created_at": r.created_at.isoformat(),
         }
@@ -637,6 +1295,61 @@ def get_record_photo(
     return Response(content=record.photo, media_type=media_type)
 
 
+@app.get("/records/{record_id}/explanation", response_model=ExplanationOutput)
+def get_record_explanation(
+    record_id: int,
+    db: Session = Depends(get_db),
+    principal: AuthPrincipal = Depends(require_principal),
+) -> ExplanationOutput:
+    from app.database.models import PredictionRecord
+
+    record = db.get(PredictionRecord, record_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Record not found")
+
+    if principal.role == "student" and record.student_id != principal.id:
+        raise HTTPException(status_code=403, detail="Not allowed")
+
+    student = StudentInput(
+        name=record.name or "-",
+        department=record.department or "--",
+        semesters=json.loads(record.semesters_json or "[]"),
+    )
+    payload = _payload_from_student(student)
+
+    if record.contributions_json:
+        contributions = json.loads(record.contributions_json)
+    elif record.model_type == "rules":
+        # Decided by the rule fast path; no model ran, so there is nothing to explain.
+        contributions = {}
+    else:
+        # Records written before model_type was stored only carry model_used.
+        model_type = record.model_type or ("dl" if record.model_used.startswith("Neural Network") else "ml")
+        try:
+            # Routed like any prediction, so with INFERENCE_WORKERS > 0 SHAP runs in a worker.
+            result = inference_pool.predict_batch([payload], model_type=model_type, explain=True)[0]
+        except ModelArtifactsNotFound as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except TimeoutError:
+            raise HTTPException(status_code=504, detail="Explanation timed out")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Explanation failed: {e}")
+        if result.model_version != record.model_version:
+            # Another model would explain a prediction it did not make.
+            raise HTTPException(
+                status_code=409,
+                detail=f"Model version {record.model_version} that made this prediction is no longer loaded",
+            )
+        contributions = result.contributions
+        set_prediction_contributions(db, record_id=record.id, contributions=contributions)
+
+    return ExplanationOutput(
+        record_id=record.id,
+        model_used=record.model_used,
+        feature_contributions=_feature_contributions(payload, contributions),
+    )
+
+
 # ── Admin endpoints ───────────────────────────────────────────────
 
 
@@ -702,3 +1415,83 @@ def update_otp_settings(
 ) -> OTPSettingsResponse:
     new_val = set_otp_enabled(db, enabled=payload.otp_enabled)
     return OTPSettingsResponse(otp_enabled=new_val)
+
+
+@app.get("/admin/stats")
+def get_service_stats(
+    _principal: AuthPrincipal = Depends(require_admin),
+) -> dict:
+    return {
+        # Summed over the worker processes when INFERENCE_WORKERS > 0.
+        "prediction_cache": inference_pool.cache_stats(),
+        "micro_batching": batcher.stats(),
+        "inference_pool": inference_pool.stats(),
+        "memory": {
+            "api_process": memory_report(),
+            # Read from /proc for each live worker when INFERENCE_WORKERS > 0.
+            "inference_workers": inference_pool.memory_stats(),
+        },
+    }
+
+
+# Progress of the latest POST /admin/models/{version}/activate.
+_activation: dict = {"version": None, "status": "idle", "error": None}
+_activation_lock = threading.Lock()
+
+
+def _activate_model_version(version: str) -> None:
+    try:
+        registry.verify(version)
+        candidate = PredictorService(registry.version_dir(version), version=version)
+        # Warmed where it will serve (here or in new worker processes) before it takes traffic.
+        try:
+            previous = inference_pool.swap(candidate, warm=PRELOAD_MODELS or ("ml", "dl"))
+        except ModelArtifactsNotFound:
+            raise ModelVersionError(f"Model version {version} has no loadable model")
+        try:
+            registry.set_active(version)
+        except Exception:
+            inference_pool.swap(previous)
+            raise
+    except Exception as e:
+        with _activation_lock:
+            _activation.update(status="failed", error=str(e))
+        return
+    with _activation_lock:
+        _activation.update(status="active", error=None)
+
+
+@app.get("/admin/models")
+def list_model_versions(
+    _principal: AuthPrincipal = Depends(require_admin),
+) -> dict:
+    with _activation_lock:
+        activation = dict(_activation)
+    return {
+        "active": inference_pool.predictor.version,
+        "activation": activation,
+        "versions": registry.list_versions(),
+    }
+
+
+@app.post("/admin/models/{version}/activate", status_code=202)
+def activate_model_version(
+    version: str,
+    background_tasks: BackgroundTasks,
+    _principal: AuthPrincipal = Depends(require_admin),
+) -> dict:
+    """Load, verify and warm up *version* in the background, then swap it in.
+
+    Requests keep being served by the current model until the swap; ones
+    already running finish on it.
+    """
+    try:
+        registry.manifest(version)
+    except ModelVersionError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    with _activation_lock:
+        if _activation["status"] == "loading":
+            raise HTTPException(status_code=409, detail=f"Model version {_activation['version']} is still loading")
+        _activation.update(version=version, status="loading", error=None)
+    background_tasks.add_task(_activate_model_version, version)
+    return {"version": version, "status": "loading"}
@@ -11,12 +11,14 @@ from .auth import (
     TeacherSignup,
     TokenResponse,
 )
-from .student import FeatureContribution, PredictionOutput, StudentInput
+from .student import BatchPredictionInput, ExplanationOutput, FeatureContribution, PredictionOutput, StudentInput
 
 __all__ = [
     "StudentInput",
+    "BatchPredictionInput",
     "PredictionOutput",
     "FeatureContribution",
+    "ExplanationOutput",
     "TeacherSignup",
     "TeacherLogin",
     "StudentSignup",
@@ -78,6 +78,10 @@ class StudentInput(BaseModel):
         return self
 
 
+class BatchPredictionInput(BaseModel):
+    students: List[StudentInput] = Field(..., min_length=1, max_length=500)
+
+
 class FeatureContribution(BaseModel):
     feature: str
     value: float
@@ -89,12 +93,34 @@ class PredictionOutput(BaseModel):
     department: Optional[str] = None
     semesters: List[SemesterInput] = Field(default_factory=list)
     prediction: str
-    confidence: float = Field(..., ge=0, le=1)
+    confidence: float = Field(
+        ...,
+        ge=0,
+        le=1,
+        description=(
+            "Model probability of the prediction, adjusted by the data quality checks. "
+            'When model_used is "Rules (fast path)" no model ran and this is a fixed '
+            "value marking a rule decision, not a probability."
+        ),
+    )
     model_used: str
     feature_contributions: List[FeatureContribution]
+    explanation_url: Optional[str] = None
     model_accuracy: Optional[float] = None
+    trees_used: Optional[int] = None
+    model_version: Optional[str] = None
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
     model_config = {
         "protected_namespaces": (),
     }
+
+
+class ExplanationOutput(BaseModel):
+    record_id: int
+    model_used: str
+    feature_contributions: List[FeatureContribution]
+
+    model_config = {
+        "protected_namespaces": (),
+    }
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import importlib
+import os
+from typing import Any, Literal
+
+import numpy as np
+
+from app.services.csv_columnar import _SEM_FIELDS, _parse_floats, _parse_ints, _validate_parsed
+from app.services.csv_processor import EXPECTED_COLUMNS, _check_header
+
+ArrowFormat = Literal["parquet", "arrow"]
+
+# Upload file extensions read by this module; Feather v2 is the Arrow IPC file format.
+ARROW_SUFFIXES: dict[str, ArrowFormat] = {
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+}
+
+# Larger integral doubles are not exact, so they take the fallback path.
+_MAX_EXACT_FLOAT = 2.0 ** 53
+
+
+class ArrowUnavailable(RuntimeError):
+    pass
+
+
+def _pyarrow():
+    """pyarrow with its parquet and ipc modules loaded, or None when not installed.
+
+    Imported on first use: it is optional and only Parquet/Arrow uploads need it.
+    """
+    if "pa" not in globals():
+        try:
+            pa = importlib.import_module("pyarrow")
+            importlib.import_module("pyarrow.parquet")
+            importlib.import_module("pyarrow.ipc")
+            globals()["pa"] = pa
+        except Exception:  # pragma: no cover
+            globals()["pa"] = None
+    return globals()["pa"]
+
+
+def arrow_format(filename: str) -> ArrowFormat | None:
+    return ARROW_SUFFIXES.get(os.path.splitext(filename.lower())[1])
+
+
+def _read_table(content: bytes, fmt: ArrowFormat):
+    pa = _pyarrow()
+    if pa is None:
+        raise ArrowUnavailable("Parquet and Arrow uploads need pyarrow: pip install pyarrow")
+    source = pa.BufferReader(content)
+    if fmt == "parquet":
+        parquet_file = pa.parquet.ParquetFile(source)
+        names = parquet_file.schema_arrow.names
+        wanted = sorted({names[i] for i in _column_map(names).values()})
+        # Only the expected columns are decoded.
+        return parquet_file.read(columns=wanted or None)
+    try:
+        return pa.ipc.open_file(source).read_all()
+    except pa.ArrowInvalid:
+        return pa.ipc.open_stream(pa.BufferReader(content)).read_all()
+
+
+def _column_map(names: list[str]) -> dict[str, int]:
+    # Header matching as for CSV: trimmed, case-insensitive, last repeat wins.
+    found = {n.strip().lower(): i for i, n in enumerate(names)}
+    return {c: found[c] for c in EXPECTED_COLUMNS if c in found}
+
+
+def _text_cells(column) -> list[str]:
+    pa = _pyarrow()
+    if not pa.types.is_string(column.type) and not pa.types.is_large_string(column.type):
+        column = column.cast(pa.string())
+    return ["" if v is None else v for v in column.to_pylist()]
+
+
+def _typed_cells(column, *, integer: bool) -> tuple[np.ndarray, np.ndarray, np.ndarray] | None:
+    """(values, empty, fast) read from a numeric column; None for other types.
+
+    Nulls (and NaN) are empty cells. In mark columns a float is taken only
+    when it is a whole number; other values are left to the fallback path.
+    """
+    pa = _pyarrow()
+    if pa.types.is_integer(column.type) and not pa.types.is_uint64(column.type):
+        empty = column.is_null().to_numpy()
+        values = column.cast(pa.int64()).fill_null(0).to_numpy()
+        return (values if integer else values.astype(np.float64)), empty, ~empty
+    if pa.types.is_floating(column.type) or pa.types.is_decimal(column.type):
+        floats = column.cast(pa.float64()).fill_null(np.nan).to_numpy()
+        empty = np.isnan(floats)
+        if not integer:
+            return np.where(empty, 0.0, floats), empty, ~empty
+        fast = ~empty & (np.floor(floats) == floats) & (np.abs(floats) < _MAX_EXACT_FLOAT)
+        return np.where(fast, floats, 0).astype(np.int64), empty, fast
+    return None
+
+
+def _cell_text(value: Any, *, integer: bool) -> str:
+    # What the cell would hold in a CSV export, for rows validated one by one.
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    if isinstance(value, str):
+        return value
+    if integer and isinstance(value, float) and value.is_integer() and abs(value) < _MAX_EXACT_FLOAT:
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def validate_and_parse_arrow(
+    content: bytes,
+    fmt: ArrowFormat,
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """``validate_and_parse_csv`` for a Parquet or Arrow IPC file.
+
+    Numeric columns are validated as typed arrays, with no text parsing;
+    string columns (e.g. marks exported as text) are parsed like CSV cells.
+    The same rules and messages apply, but rows are numbered from 1 since
+    the file has no header row. Raises ArrowUnavailable without pyarrow.
+    """
+    label = "Parquet" if fmt == "parquet" else "Arrow"
+    try:
+        table = _read_table(content, fmt)
+    except (OSError, ValueError):  # ArrowIOError, ArrowInvalid
+        return [], [{"row": 0, "field": "file", "message": f"File is not a valid {label} file"}]
+
+    header_errors = _check_header(table.column_names)
+    if header_errors:
+        return [], header_errors
+    if table.num_rows == 0:
+        return [], [{"row": 0, "field": "file", "message": f"{label} file has no data rows"}]
+
+    index = _column_map(table.column_names)
+    columns = {c: table.column(index[c]) for c in EXPECTED_COLUMNS}
+    integer_fields = {f for f_int, f_uni, _ in _SEM_FIELDS for f in (f_int, f_uni)}
+
+    parsed = {}
+    for field in (f for fields in _SEM_FIELDS for f in fields):
+        integer = field in integer_fields
+        typed = _typed_cells(columns[field], integer=integer)
+        if typed is None:
+            cells = _text_cells(columns[field])
+            typed = _parse_ints(cells) if integer else _parse_floats(cells)
+        parsed[field] = typed
+
+    def raw_row(r: int) -> dict[str, str]:
+        return {
+            f: _cell_text(columns[f][r].as_py(), integer=f in integer_fields)
+            for f in EXPECTED_COLUMNS
+        }
+
+    return _validate_parsed(
+        _text_cells(columns["name"]),
+        _text_cells(columns["department"]),
+        parsed,
+        raw_row,
+        first_row=1,
+    )
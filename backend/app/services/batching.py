@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import CancelledError, Future
+from functools import partial
+from typing import Dict, List
+
+from app.services.inference_pool import InferencePool
+from app.services.predictor import PredictionResult
+
+
+def _bucket(n: int) -> str:
+    """Power-of-two histogram bucket label for *n* (1, 2, 4, 8, ...)."""
+    return str(1 << max(0, n - 1).bit_length())
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-student predictions into one matrix call.
+
+    Callers block on a future while one worker thread collects requests for
+    up to *window_ms* (or until *max_batch* are waiting), groups them by
+    options and submits one batch per group to the inference pool. A window
+    of 0 turns batching off and calls the pool directly.
+    """
+
+    def __init__(
+        self,
+        pool: InferencePool,
+        *,
+        window_ms: float | None = None,
+        max_batch: int | None = None,
+    ):
+        self.pool = pool
+        self.window_ms = float(os.getenv("PREDICT_BATCH_WINDOW_MS", "2")) if window_ms is None else window_ms
+        self.max_batch = int(os.getenv("PREDICT_BATCH_MAX_SIZE", "64")) if max_batch is None else max_batch
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+        self._batch_sizes: Counter = Counter()
+        self._queue_depths: Counter = Counter()
+        self.batches = 0
+        self.requests = 0
+
+    def predict_batch(self, payloads: List[Dict[str, float | int]], **options) -> List[PredictionResult]:
+        """Same contract as ``PredictorService.predict_batch``; single rows go through the queue."""
+        if self.window_ms <= 0 or len(payloads) != 1:
+            return self.pool.predict_batch(payloads, **options)
+        return [self.pool.wait(self.submit(payloads[0], **options))]
+
+    def submit(
+        self,
+        payload: Dict[str, float | int],
+        *,
+        model_type: str = "ml",
+        explain: bool = True,
+        early_exit: str = "off",
+    ) -> Future:
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((payload, (model_type, explain, early_exit), future))
+        return future
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "window_ms": self.window_ms,
+                "max_batch": self.max_batch,
+                "queue_depth": self._queue.qsize(),
+                "requests": self.requests,
+                "batches": self.batches,
+                "mean_batch_size": (self.requests / self.batches) if self.batches else 0.0,
+                "batch_size_histogram": dict(sorted(self._batch_sizes.items(), key=lambda kv: int(kv[0]))),
+                "queue_depth_histogram": dict(sorted(self._queue_depths.items(), key=lambda kv: int(kv[0]))),
+            }
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        # Depth seen by the first request: itself plus everything already behind it.
+        depth = self._queue.qsize() + 1
+        deadline = time.monotonic() + self.window_ms / 1000.0
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        with self._lock:
+            self.batches += 1
+            self.requests += len(batch)
+            self._batch_sizes[_bucket(len(batch))] += 1
+            self._queue_depths[_bucket(depth)] += 1
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            groups: dict = defaultdict(list)
+            for payload, options, future in self._collect():
+                groups[options].append((payload, future))
+            for (model_type, explain, early_exit), items in groups.items():
+                futures = [future for _, future in items]
+                # Submitting does not wait for worker processes, so several
+                # batches can be in flight at once.
+                try:
+                    batch = self.pool.submit_batch(
+                        [payload for payload, _ in items],
+                        model_type=model_type,
+                        explain=explain,
+                        early_exit=early_exit,
+                    )
+                except Exception as e:
+                    # A bad payload or a closed pool fails this group, not the worker thread.
+                    for future in futures:
+                        future.set_exception(e)
+                    continue
+                batch.add_done_callback(partial(_fan_out, futures))
+
+
+def _fan_out(futures: List[Future], batch: Future) -> None:
+    error = CancelledError() if batch.cancelled() else batch.exception()
+    if error is not None:
+        for future in futures:
+            future.set_exception(error)
+        return
+    for future, result in zip(futures, batch.result()):
+        future.set_result(result)
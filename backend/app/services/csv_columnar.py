@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import csv
+import io
+from typing import Any, Callable, Mapping, Sequence
+
+import numpy as np
+
+from app.services.csv_processor import EXPECTED_COLUMNS, VALID_DEPARTMENTS, _check_header, _validate_row
+
+# Cells wider than this never take the fast path (and would blow up the
+# fixed-width byte matrices).
+_FAST_WIDTH = 24
+# Longest digit run that still fits in int64 without overflow.
+_MAX_INT_DIGITS = 18
+# Longest digit run whose integer value is still exact as a double.
+_MAX_FLOAT_DIGITS = 15
+_POW10_FLOAT = 10.0 ** np.arange(_MAX_FLOAT_DIGITS + 1)
+
+_SEM_FIELDS = [(f"sem{s}_internal", f"sem{s}_university", f"sem{s}_attendance") for s in range(1, 9)]
+_DEPARTMENTS = ", ".join(sorted(VALID_DEPARTMENTS))
+
+# Error slots in the order validate_and_parse_csv reports them within a row.
+_NAME_REQUIRED, _NAME_TOO_LONG, _DEPT_REQUIRED, _DEPT_INVALID = range(4)
+_SEM_SLOTS = 5  # partial, internal range, university range, sum > 600, attendance range
+_NO_SEMESTERS = 4 + 8 * _SEM_SLOTS
+
+
+def _byte_matrix(cells: Sequence[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(matrix, lengths, skipped): cells as an (n, width) uint8 matrix, NUL-padded.
+
+    Non-ASCII and over-wide cells (and cells holding a NUL) are blanked in
+    the matrix and flagged in *skipped* so their rows can be validated the
+    slow way. Every other cell has exactly its *lengths* bytes, all non-NUL.
+    """
+    n = len(cells)
+    joined = "\0".join(cells)
+    buffer = np.frombuffer(joined.encode("ascii"), dtype=np.uint8) if joined.isascii() else None
+    # Cell boundaries come from the separators unless a cell holds a NUL itself.
+    ends = None if buffer is None else np.flatnonzero(buffer == 0)
+    if ends is not None and len(ends) == n - 1:
+        ends = np.append(ends, len(buffer))
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        lengths = ends - starts
+        skipped = lengths > _FAST_WIDTH
+    else:
+        lengths = np.fromiter(map(len, cells), dtype=np.int64, count=n)
+        skipped = (lengths > _FAST_WIDTH) | np.fromiter(
+            (not c.isascii() or "\0" in c for c in cells), dtype=bool, count=n
+        )
+        buffer = np.frombuffer(
+            "\0".join("\0" * len(c) if s else c for c, s in zip(cells, skipped)).encode("ascii"), dtype=np.uint8
+        )
+        starts = np.cumsum(lengths + 1) - lengths - 1
+
+    # Gather each cell's bytes into its row; positions past the end stay 0.
+    width = int(lengths[~skipped].max(initial=0)) or 1
+    cols = np.arange(width)
+    inside = (cols < lengths[:, None]) & ~skipped[:, None]
+    positions = np.minimum(starts[:, None] + cols, max(len(buffer) - 1, 0))
+    matrix = np.where(inside, buffer.take(positions) if len(buffer) else 0, 0).astype(np.uint8)
+    return matrix, lengths, skipped
+
+
+def _digit_value(matrix: np.ndarray, digit: np.ndarray) -> np.ndarray:
+    """The digits of each row read as one integer, skipping any other bytes."""
+    values = np.zeros(len(matrix), dtype=np.int64)
+    for j in range(matrix.shape[1]):
+        values = np.where(digit[:, j], values * 10 + (matrix[:, j].astype(np.int64) - 48), values)
+    return values
+
+
+def _parse_ints(cells: Sequence[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(values, empty, fast) for cells that are plain ASCII digit runs.
+
+    Anything else (signs, spaces, underscores, huge numbers, garbage) is
+    neither empty nor fast and is left to ``int()`` on the fallback path.
+    """
+    m, lengths, skipped = _byte_matrix(cells)
+    digit = (m >= 48) & (m <= 57)
+    shaped = (digit.sum(axis=1) == lengths) & ~skipped
+    empty = shaped & (lengths == 0)
+    fast = shaped & (lengths > 0) & (lengths <= _MAX_INT_DIGITS)
+    return _digit_value(m, digit), empty, fast
+
+
+def _parse_floats(cells: Sequence[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(values, empty, fast) for cells like ``85``, ``85.5``, ``85.`` or ``.5``.
+
+    A value is its digits as an integer divided by 10**(digits after the
+    dot). Both are exact doubles for up to 15 digits, so the one rounding
+    in the division gives the same float as ``float()``.
+    """
+    m, lengths, skipped = _byte_matrix(cells)
+    digit = (m >= 48) & (m <= 57)
+    dot = m == 46
+    n_digits = digit.sum(axis=1)
+    shaped = (n_digits + dot.sum(axis=1) == lengths) & ~skipped
+    empty = shaped & (lengths == 0)
+    fast = shaped & (dot.sum(axis=1) <= 1) & (n_digits > 0) & (n_digits <= _MAX_FLOAT_DIGITS)
+
+    decimals = (digit & (np.cumsum(dot, axis=1) > 0)).sum(axis=1)
+    values = _digit_value(m, digit) / _POW10_FLOAT[np.minimum(decimals, _MAX_FLOAT_DIGITS)]
+    return values, empty, fast
+
+
+def columns_from_rows(fieldnames: list[str], rows: list[list[str]]) -> dict[str, Sequence[str]]:
+    """Transpose csv.reader rows into the columns ``validate_columns`` takes.
+
+    Mirrors csv.DictReader: short rows read as empty cells, extra cells are
+    ignored and, for repeated headers, the last column wins.
+    """
+    width = len(fieldnames)
+    index = {h.strip().lower(): i for i, h in enumerate(fieldnames)}
+    padded = [r if len(r) == width else (r + [""] * width)[:width] for r in rows]
+    transposed = list(zip(*padded)) if padded else [()] * width
+    return {name: transposed[index[name]] for name in EXPECTED_COLUMNS}
+
+
+def validate_and_parse_csv_columnar(
+    file_content: bytes,
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Drop-in for ``validate_and_parse_csv`` that validates column-wise."""
+    try:
+        text = file_content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return [], [{"row": 0, "field": "file", "message": "File is not valid UTF-8"}]
+
+    reader = csv.reader(io.StringIO(text))
+    fieldnames = next(reader, None)
+    header_errors = _check_header(fieldnames)
+    if header_errors:
+        return [], header_errors
+
+    # DictReader skips blank lines without counting them as rows.
+    rows = [r for r in reader if r]
+    if not rows:
+        return [], [{"row": 0, "field": "file", "message": "CSV file has no data rows"}]
+    return validate_columns(columns_from_rows(fieldnames, rows))
+
+
+def validate_columns(
+    columns: Mapping[str, Sequence[str]],
+    *,
+    first_row: int = 2,
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Validate data held column-wise; same (parsed_rows, errors) as ``validate_and_parse_csv``.
+
+    *columns* maps each of ``EXPECTED_COLUMNS`` to its raw cell strings and
+    *first_row* is the CSV row number of the first cell. Range, partial
+    semester, sum and department checks run as masks over whole columns;
+    rows holding a cell the masks cannot parse exactly (signs, spaces,
+    non-ASCII, overflow, invalid numbers) go through ``_validate_row``.
+    """
+    parsed = {}
+    for f_int, f_uni, f_att in _SEM_FIELDS:
+        parsed[f_int] = _parse_ints(columns[f_int])
+        parsed[f_uni] = _parse_ints(columns[f_uni])
+        parsed[f_att] = _parse_floats(columns[f_att])
+    return _validate_parsed(
+        columns["name"],
+        columns["department"],
+        parsed,
+        lambda r: {f: columns[f][r] for f in EXPECTED_COLUMNS},
+        first_row=first_row,
+    )
+
+
+def _validate_parsed(
+    names: Sequence[str],
+    depts: Sequence[str],
+    parsed: Mapping[str, tuple[np.ndarray, np.ndarray, np.ndarray]],
+    raw_row: Callable[[int], dict[str, str]],
+    *,
+    first_row: int,
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """The checks of ``validate_columns`` on semester columns already parsed.
+
+    *parsed* maps each semester field to (values, empty, fast) as returned
+    by ``_parse_ints`` / ``_parse_floats``; rows with a cell that is neither
+    empty nor fast are validated by ``_validate_row`` on ``raw_row(r)``.
+    """
+    names = [c.strip() for c in names]
+    n = len(names)
+    if n == 0:
+        return [], []
+    depts = [c.strip().upper() for c in depts]
+
+    name_len = np.fromiter(map(len, names), dtype=np.int64, count=n)
+    dept_empty = np.fromiter((not d for d in depts), dtype=bool, count=n)
+    dept_valid = np.fromiter((d in VALID_DEPARTMENTS for d in depts), dtype=bool, count=n)
+
+    slots = np.zeros((n, _NO_SEMESTERS + 1), dtype=bool)
+    slots[:, _NAME_REQUIRED] = name_len == 0
+    slots[:, _NAME_TOO_LONG] = name_len > 120
+    slots[:, _DEPT_REQUIRED] = dept_empty
+    slots[:, _DEPT_INVALID] = ~dept_empty & ~dept_valid
+
+    fallback = np.zeros(n, dtype=bool)
+    any_taken = np.zeros(n, dtype=bool)
+    sems = []
+    for s, (f_int, f_uni, f_att) in enumerate(_SEM_FIELDS):
+        internal, e_int, ok_int = parsed[f_int]
+        university, e_uni, ok_uni = parsed[f_uni]
+        attendance, e_att, ok_att = parsed[f_att]
+        fallback |= ~(e_int | ok_int) | ~(e_uni | ok_uni) | ~(e_att | ok_att)
+
+        all_empty = e_int & e_uni & e_att
+        complete = ok_int & ok_uni & ok_att
+        base = 4 + s * _SEM_SLOTS
+        slots[:, base] = ~all_empty & (e_int | e_uni | e_att)
+        slots[:, base + 1] = complete & ((internal < 0) | (internal > 300))
+        slots[:, base + 2] = complete & ((university < 0) | (university > 300))
+        slots[:, base + 3] = complete & (internal + university > 600)
+        slots[:, base + 4] = complete & ((attendance < 0) | (attendance > 100))
+        any_taken |= ~all_empty
+        sems.append((complete, internal, university, attendance))
+    slots[:, _NO_SEMESTERS] = ~any_taken
+    slots[fallback] = False
+
+    # np.nonzero walks row-major: by row, then by slot, i.e. report order.
+    rows_idx, slot_idx = np.nonzero(slots)
+    errors: list[tuple[int, dict[str, Any]]] = []
+    for r, k in zip(rows_idx.tolist(), slot_idx.tolist()):
+        errors.append((r, _error(first_row + r, k, depts[r], sems, r)))
+
+    parsed_rows = _parsed_rows(names, depts, sems)
+
+    if fallback.any():
+        for r in np.flatnonzero(fallback).tolist():
+            row, row_errors = _validate_row(first_row + r, raw_row(r))
+            parsed_rows[r] = row
+            errors.extend((r, e) for e in row_errors)
+        errors.sort(key=lambda item: item[0])
+
+    return parsed_rows, [e for _, e in errors]
+
+
+def _error(row_num: int, slot: int, dept: str, sems: list, r: int) -> dict[str, Any]:
+    if slot == _NAME_REQUIRED:
+        return {"row": row_num, "field": "name", "message": "Name is required"}
+    if slot == _NAME_TOO_LONG:
+        return {"row": row_num, "field": "name", "message": "Name must be 120 characters or less"}
+    if slot == _DEPT_REQUIRED:
+        return {"row": row_num, "field": "department", "message": "Department is required"}
+    if slot == _DEPT_INVALID:
+        return {
+            "row": row_num,
+            "field": "department",
+            "message": f"Invalid department '{dept}'. Must be one of: {_DEPARTMENTS}",
+        }
+    if slot == _NO_SEMESTERS:
+        return {"row": row_num, "field": "semesters", "message": "At least one complete semester is required"}
+
+    s, check = divmod(slot - 4, _SEM_SLOTS)
+    sem = s + 1
+    _, internals, universities, attendances = sems[s]
+    internal, university, attendance = int(internals[r]), int(universities[r]), float(attendances[r])
+    if check == 0:
+        return {
+            "row": row_num,
+            "field": f"sem{sem}",
+            "message": f"Semester {sem} is partially filled. Provide all three: internal, university, attendance — or leave all empty.",
+        }
+    if check == 1:
+        return {"row": row_num, "field": f"sem{sem}_internal", "message": f"Value {internal} out of range (0-300)"}
+    if check == 2:
+        return {"row": row_num, "field": f"sem{sem}_university", "message": f"Value {university} out of range (0-300)"}
+    if check == 3:
+        return {"row": row_num, "field": f"sem{sem}", "message": f"Internal + University ({internal + university}) exceeds 600"}
+    return {"row": row_num, "field": f"sem{sem}_attendance", "message": f"Value {attendance} out of range (0-100)"}
+
+
+def _as_text(values: np.ndarray, fmt: Callable[[Any], str]) -> np.ndarray:
+    # Marks and attendance take few distinct values; format each one once.
+    uniques, inverse = np.unique(values, return_inverse=True)
+    return np.array(list(map(fmt, uniques.tolist())), dtype=object)[inverse.ravel()]
+
+
+def _parsed_rows(names: list[str], depts: list[str], sems: list) -> list[dict[str, Any]]:
+    # The text json.dumps gives for the semester dicts, built a column at a
+    # time: each complete semester becomes ", {...}" and a row's pieces are
+    # joined once at the end.
+    pieces = np.full((len(names), len(sems)), "", dtype=object)
+    for s, (complete, internal, university, attendance) in enumerate(sems, start=1):
+        if not complete.any():
+            continue
+        template = ', {{"semester": %d, "internal_marks": {}, "university_marks": {}, "attendance": {}}}' % s
+        pieces[complete, s - 1] = list(map(
+            template.format,
+            _as_text(internal[complete], str),
+            _as_text(university[complete], str),
+            _as_text(attendance[complete], repr),
+        ))
+    bodies = map("".join, pieces.tolist())
+    return [
+        {"name": name, "department": dept, "semesters_json": f"[{body[2:]}]"}
+        for name, dept, body in zip(names, depts, bodies)
+    ]
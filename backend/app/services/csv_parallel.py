@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import csv
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterator, List
+
+from app.services.csv_columnar import columns_from_rows, validate_columns
+from app.services.csv_processor import _check_header
+
+NOT_UTF8 = {"row": 0, "field": "file", "message": "File is not valid UTF-8"}
+_BOM = b"\xef\xbb\xbf"
+
+
+def _record_end(content: bytes, start: int, target: int) -> int:
+    """Offset just past the first newline at or after *target* that ends a record.
+
+    A newline inside a quoted field leaves an odd number of quote characters
+    between *start* and it (escaped quotes come in pairs), so keep going
+    until the count is even. This assumes RFC 4180 quoting; a stray quote in
+    an unquoted field can move a cut. Returns ``len(content)`` if there is
+    no such newline. *content* may also be an ``mmap`` (which has no
+    ``count``), so counts are taken on slices.
+    """
+    quotes = content[start:target].count(b'"')
+    pos = target
+    while True:
+        newline = content.find(b"\n", pos)
+        if newline < 0:
+            return len(content)
+        quotes += content[pos:newline].count(b'"')
+        if quotes % 2 == 0:
+            return newline + 1
+        pos = newline + 1
+
+
+def split_records(content: bytes, start: int, chunk_bytes: int) -> Iterator[tuple[int, int]]:
+    """(start, end) byte ranges of about *chunk_bytes* each, cut between records."""
+    while start < len(content):
+        end = _record_end(content, start, min(start + chunk_bytes, len(content)))
+        yield start, end
+        start = end
+
+
+def read_header(content: bytes) -> tuple[List[str] | None, int, list[dict[str, Any]]]:
+    """Field names, the offset where data rows start, and any header errors."""
+    start = len(_BOM) if content[: len(_BOM)] == _BOM else 0
+    header_end = _record_end(content, start, start)
+    try:
+        fieldnames = next(csv.reader(io.StringIO(content[start:header_end].decode("utf-8"))), None)
+    except UnicodeDecodeError:
+        return None, header_end, [dict(NOT_UTF8)]
+    return fieldnames, header_end, _check_header(fieldnames)
+
+
+def validate_chunk(chunk: bytes, fieldnames: List[str]) -> tuple[list, list] | None:
+    """Validate one run of whole records; row numbers count from 0. None if not UTF-8."""
+    try:
+        text = chunk.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    rows = [r for r in csv.reader(io.StringIO(text)) if r]
+    if not rows:
+        return [], []
+    return validate_columns(columns_from_rows(fieldnames, rows), first_row=0)
+
+
+class ParallelCsvValidator:
+    """Validate large uploads in chunks across worker processes.
+
+    The file is cut into runs of whole records of about *chunk_bytes*, each
+    validated by ``validate_columns`` in a worker; results are merged in
+    order and error row numbers shifted back to file positions, so the
+    output is the same as ``validate_and_parse_csv``. With 0 workers the
+    chunks run in the calling thread.
+    """
+
+    def __init__(self, *, workers: int | None = None, chunk_bytes: int | None = None):
+        self.workers = int(os.getenv("CSV_PARALLEL_WORKERS", str(os.cpu_count() or 1))) if workers is None else workers
+        self.chunk_bytes = int(os.getenv("CSV_CHUNK_BYTES", str(8 << 20))) if chunk_bytes is None else chunk_bytes
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def validate(self, content: bytes) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        fieldnames, header_end, header_errors = read_header(content)
+        if header_errors:
+            # Undecodable bytes anywhere take precedence, as in validate_and_parse_csv.
+            try:
+                content.decode("utf-8")
+            except UnicodeDecodeError:
+                return [], [dict(NOT_UTF8)]
+            return [], header_errors
+
+        chunks = [content[a:b] for a, b in split_records(content, header_end, self.chunk_bytes)]
+        if self.workers > 0 and len(chunks) > 1:
+            results = list(self._get_executor().map(validate_chunk, chunks, [fieldnames] * len(chunks)))
+        else:
+            results = [validate_chunk(chunk, fieldnames) for chunk in chunks]
+        if any(r is None for r in results):
+            return [], [dict(NOT_UTF8)]
+
+        parsed_rows: list[dict[str, Any]] = []
+        errors: list[dict[str, Any]] = []
+        for chunk_rows, chunk_errors in results:
+            first_row = len(parsed_rows) + 2  # row 1 is header
+            for e in chunk_errors:
+                e["row"] += first_row
+            parsed_rows.extend(chunk_rows)
+            errors.extend(chunk_errors)
+        if not parsed_rows and not errors:
+            errors.append({"row": 0, "field": "file", "message": "CSV file has no data rows"})
+        return parsed_rows, errors
+
+    def warm_up(self) -> None:
+        """Start the worker processes (and their imports) ahead of the first upload."""
+        if self.workers > 0:
+            list(self._get_executor().map(validate_chunk, [b""] * self.workers, [[]] * self.workers))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn, like the inference pool: the API process runs threads.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
@@ -3,7 +3,8 @@ from __future__ import annotations
 import csv
 import io
 import json
-from typing import Any
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Callable
 
 VALID_DEPARTMENTS = {"CSE", "IT", "ECE", "EEE", "ME", "CE"}
 
@@ -16,6 +17,115 @@ for _sem in range(1, 9):
     ])
 
 
+def _check_header(fieldnames: list[str] | None) -> list[dict[str, Any]]:
+    if fieldnames is None:
+        return [{"row": 0, "field": "file", "message": "CSV file is empty or has no header row"}]
+
+    # Normalize headers
+    normalized = [h.strip().lower() for h in fieldnames]
+    expected_set = {c.lower() for c in EXPECTED_COLUMNS}
+    actual_set = set(normalized)
+
+    missing = expected_set - actual_set
+    if missing:
+        return [{
+            "row": 0,
+            "field": "header",
+            "message": f"Missing columns: {', '.join(sorted(missing))}",
+        }]
+    return []
+
+
+def _validate_row(row_num: int, raw_row: dict[str | None, Any]) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """Validate one data row; returns (parsed_row, errors for this row)."""
+    errors: list[dict[str, Any]] = []
+
+    # Normalize keys
+    row = {k.strip().lower(): (v.strip() if v else "") for k, v in raw_row.items() if k is not None}
+
+    # --- name ---
+    name = row.get("name", "")
+    if not name:
+        errors.append({"row": row_num, "field": "name", "message": "Name is required"})
+    elif len(name) > 120:
+        errors.append({"row": row_num, "field": "name", "message": "Name must be 120 characters or less"})
+
+    # --- department ---
+    dept = row.get("department", "").upper()
+    if not dept:
+        errors.append({"row": row_num, "field": "department", "message": "Department is required"})
+    elif dept not in VALID_DEPARTMENTS:
+        errors.append({
+            "row": row_num,
+            "field": "department",
+            "message": f"Invalid department '{dept}'. Must be one of: {', '.join(sorted(VALID_DEPARTMENTS))}",
+        })
+
+    # --- semesters ---
+    semesters: list[dict[str, Any]] = []
+    for sem in range(1, 9):
+        raw_int = row.get(f"sem{sem}_internal", "")
+        raw_uni = row.get(f"sem{sem}_university", "")
+        raw_att = row.get(f"sem{sem}_attendance", "")
+
+        # If all three are empty, semester is not taken
+        if raw_int == "" and raw_uni == "" and raw_att == "":
+            continue
+
+        # If partially filled
+        if raw_int == "" or raw_uni == "" or raw_att == "":
+            errors.append({
+                "row": row_num,
+                "field": f"sem{sem}",
+                "message": f"Semester {sem} is partially filled. Provide all three: internal, university, attendance — or leave all empty.",
+            })
+            continue
+
+        # Parse values
+        try:
+            internal = int(raw_int)
+        except ValueError:
+            errors.append({"row": row_num, "field": f"sem{sem}_internal", "message": f"'{raw_int}' is not a valid integer"})
+            continue
+        try:
+            university = int(raw_uni)
+        except ValueError:
+            errors.append({"row": row_num, "field": f"sem{sem}_university", "message": f"'{raw_uni}' is not a valid integer"})
+            continue
+        try:
+            attendance = float(raw_att)
+        except ValueError:
+            errors.append({"row": row_num, "field": f"sem{sem}_attendance", "message": f"'{raw_att}' is not a valid number"})
+            continue
+
+        # Range checks
+        if internal < 0 or internal > 300:
+            errors.append({"row": row_num, "field": f"sem{sem}_internal", "message": f"Value {internal} out of range (0-300)"})
+        if university < 0 or university > 300:
+            errors.append({"row": row_num, "field": f"sem{sem}_university", "message": f"Value {university} out of range (0-300)"})
+        if internal + university > 600:
+            errors.append({"row": row_num, "field": f"sem{sem}", "message": f"Internal + University ({internal + university}) exceeds 600"})
+        if attendance < 0 or attendance > 100:
+            errors.append({"row": row_num, "field": f"sem{sem}_attendance", "message": f"Value {attendance} out of range (0-100)"})
+
+        semesters.append({
+            "semester": sem,
+            "internal_marks": internal,
+            "university_marks": university,
+            "attendance": attendance,
+        })
+
+    if not semesters and not any("sem" in e["field"] for e in errors):
+        errors.append({"row": row_num, "field": "semesters", "message": "At least one complete semester is required"})
+
+    parsed = {
+        "name": name,
+        "department": dept,
+        "semesters_json": json.dumps(semesters),
+    }
+    return parsed, errors
+
+
 def validate_and_parse_csv(
     file_content: bytes,
 ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
@@ -35,111 +145,83 @@ def validate_and_parse_csv(
 
     reader = csv.DictReader(io.StringIO(text))
 
-    if reader.fieldnames is None:
-        return [], [{"row": 0, "field": "file", "message": "CSV file is empty or has no header row"}]
-
-    # Normalize headers
-    normalized = [h.strip().lower() for h in reader.fieldnames]
-    expected_set = {c.lower() for c in EXPECTED_COLUMNS}
-    actual_set = set(normalized)
-
-    missing = expected_set - actual_set
-    if missing:
-        return [], [{
-            "row": 0,
-            "field": "header",
-            "message": f"Missing columns: {', '.join(sorted(missing))}",
-        }]
+    header_errors = _check_header(reader.fieldnames)
+    if header_errors:
+        return [], header_errors
 
     for row_num, raw_row in enumerate(reader, start=2):  # row 1 is header
-        # Normalize keys
-        row = {k.strip().lower(): (v.strip() if v else "") for k, v in raw_row.items() if k is not None}
-
-        # --- name ---
-        name = row.get("name", "")
-        if not name:
-            errors.append({"row": row_num, "field": "name", "message": "Name is required"})
-        elif len(name) > 120:
-            errors.append({"row": row_num, "field": "name", "message": "Name must be 120 characters or less"})
-
-        # --- department ---
-        dept = row.get("department", "").upper()
-        if not dept:
-            errors.append({"row": row_num, "field": "department", "message": "Department is required"})
-        elif dept not in VALID_DEPARTMENTS:
-            errors.append({
-                "row": row_num,
-                "field": "department",
-                "message": f"Invalid department '{dept}'. Must be one of: {', '.join(sorted(VALID_DEPARTMENTS))}",
-            })
+        parsed, row_errors = _validate_row(row_num, raw_row)
+        errors.extend(row_errors)
+        parsed_rows.append(parsed)
 
-        # --- semesters ---
-        semesters: list[dict[str, Any]] = []
-        for sem in range(1, 9):
-            raw_int = row.get(f"sem{sem}_internal", "")
-            raw_uni = row.get(f"sem{sem}_university", "")
-            raw_att = row.get(f"sem{sem}_attendance", "")
+    if not parsed_rows and not errors:
+        errors.append({"row": 0, "field": "file", "message": "CSV file has no data rows"})
 
-            # If all three are empty, semester is not taken
-            if raw_int == "" and raw_uni == "" and raw_att == "":
-                continue
+    return parsed_rows, errors
 
-            # If partially filled
-            if raw_int == "" or raw_uni == "" or raw_att == "":
-                errors.append({
-                    "row": row_num,
-                    "field": f"sem{sem}",
-                    "message": f"Semester {sem} is partially filled. Provide all three: internal, university, attendance — or leave all empty.",
-                })
-                continue
 
-            # Parse values
-            try:
-                internal = int(raw_int)
-            except ValueError:
-                errors.append({"row": row_num, "field": f"sem{sem}_internal", "message": f"'{raw_int}' is not a valid integer"})
-                continue
-            try:
-                university = int(raw_uni)
-            except ValueError:
-                errors.append({"row": row_num, "field": f"sem{sem}_university", "message": f"'{raw_uni}' is not a valid integer"})
+@dataclass
+class StreamParseResult:
+    row_count: int
+    errors: list[dict[str, Any]]
+    # Total number of errors; ``errors`` keeps only the first *max_errors*.
+    error_count: int
+
+
+def validate_and_parse_csv_stream(
+    stream: BinaryIO,
+    *,
+    on_batch: Callable[[list[dict[str, Any]]], None],
+    batch_size: int = 500,
+    max_errors: int = 100,
+) -> StreamParseResult:
+    """Validate a CSV read incrementally from a binary *stream*.
+
+    Valid rows are handed to *on_batch* in lists of at most *batch_size*
+    while the file is still error-free; after the first error, rows are only
+    validated. Memory stays bounded by one batch plus *max_errors*, so the
+    caller should write batches in one transaction and roll it back if the
+    result has errors. Errors are the same as ``validate_and_parse_csv``.
+    """
+    errors: list[dict[str, Any]] = []
+    error_count = 0
+    row_count = 0
+    batch: list[dict[str, Any]] = []
+
+    # newline="" as the csv module requires; utf-8-sig strips the BOM.
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text)
+        header_errors = _check_header(reader.fieldnames)
+        if header_errors:
+            return StreamParseResult(0, header_errors, len(header_errors))
+
+        for row_num, raw_row in enumerate(reader, start=2):  # row 1 is header
+            parsed, row_errors = _validate_row(row_num, raw_row)
+            row_count += 1
+            if row_errors:
+                error_count += len(row_errors)
+                errors.extend(row_errors[: max(0, max_errors - len(errors))])
+                batch.clear()
                 continue
-            try:
-                attendance = float(raw_att)
-            except ValueError:
-                errors.append({"row": row_num, "field": f"sem{sem}_attendance", "message": f"'{raw_att}' is not a valid number"})
+            if error_count:
                 continue
-
-            # Range checks
-            if internal < 0 or internal > 300:
-                errors.append({"row": row_num, "field": f"sem{sem}_internal", "message": f"Value {internal} out of range (0-300)"})
-            if university < 0 or university > 300:
-                errors.append({"row": row_num, "field": f"sem{sem}_university", "message": f"Value {university} out of range (0-300)"})
-            if internal + university > 600:
-                errors.append({"row": row_num, "field": f"sem{sem}", "message": f"Internal + University ({internal + university}) exceeds 600"})
-            if attendance < 0 or attendance > 100:
-                errors.append({"row": row_num, "field": f"sem{sem}_attendance", "message": f"Value {attendance} out of range (0-100)"})
-
-            semesters.append({
-                "semester": sem,
-                "internal_marks": internal,
-                "university_marks": university,
-                "attendance": attendance,
-            })
-
-        if not semesters and not any(e["row"] == row_num and "sem" in e["field"] for e in errors):
-            errors.append({"row": row_num, "field": "semesters", "message": "At least one complete semester is required"})
-
-        parsed_rows.append({
-            "name": name,
-            "department": dept,
-            "semesters_json": json.dumps(semesters),
-        })
-
-    if not parsed_rows and not errors:
+            batch.append(parsed)
+            if len(batch) >= batch_size:
+                on_batch(batch)
+                batch = []
+    except UnicodeDecodeError:
+        return StreamParseResult(0, [{"row": 0, "field": "file", "message": "File is not valid UTF-8"}], 1)
+    finally:
+        # Leave the underlying stream open for its owner.
+        text.detach()
+
+    if batch and not error_count:
+        on_batch(batch)
+    if not row_count and not error_count:
         errors.append({"row": 0, "field": "file", "message": "CSV file has no data rows"})
-
-    return parsed_rows, errors
+        error_count = 1
+    return StreamParseResult(row_count, errors, error_count)
 
 
 def generate_template_csv() -> str:
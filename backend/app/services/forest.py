@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+# Arrays written by CompiledForest.save, one .npy file each.
+_ARRAYS = ("packed", "threshold", "value", "roots")
+
+
+class CompiledForest:
+    """A fitted RandomForestClassifier flattened into contiguous node arrays.
+
+    All trees share one set of arrays and ``roots[t]`` is the first node of
+    tree ``t``. sklearn grows trees depth-first, so a node's left child is
+    always the next node and only ``right`` has to be stored. Leaves have a
+    threshold of -inf and point ``right`` at themselves, so every row can be
+    walked through all trees in lock-step with plain NumPy indexing.
+
+    When a StandardScaler is folded in, thresholds are in raw feature units
+    and inputs are compared directly without scaling them first.
+
+    ``save``/``load`` keep the arrays as plain .npy files, so several worker
+    processes can memory-map one copy instead of each unpickling the model.
+    """
+
+    def __init__(
+        self,
+        *,
+        packed: np.ndarray,
+        threshold: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+    ):
+        # One gather per step instead of two: right child and feature packed together.
+        self.packed = packed
+        self.threshold = threshold
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+
+    @property
+    def feature(self) -> np.ndarray:
+        return self.packed & 255
+
+    @property
+    def right(self) -> np.ndarray:
+        return self.packed >> 8
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_classes(self) -> int:
+        return self.value.shape[1]
+
+    @classmethod
+    def from_sklearn(cls, model, scaler=None) -> "CompiledForest":
+        features, thresholds, rights, values, roots = [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            is_leaf = tree.children_left == -1
+            own = np.arange(n)
+            if not np.array_equal(tree.children_left[~is_leaf], own[~is_leaf] + 1):
+                raise ValueError("Expected trees in depth-first node order")
+
+            # Normalise leaf values the same way DecisionTreeClassifier.predict_proba does.
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, -np.inf, tree.threshold))
+            rights.append(np.where(is_leaf, own, tree.children_right) + offset)
+            values.append(value / normalizer)
+            roots.append(offset)
+            offset += n
+            max_depth = max(max_depth, tree.max_depth)
+
+        feature = np.concatenate(features).astype(np.int64)
+        threshold = np.concatenate(thresholds).astype(np.float64)
+        if feature.max() >= 256:
+            raise ValueError("At most 256 features are supported")
+        if scaler is not None:
+            split = np.isfinite(threshold)
+            threshold[split] = _unscale_thresholds(threshold[split], feature[split], scaler)
+
+        return cls(
+            packed=(np.concatenate(rights).astype(np.int64) << 8) | feature,
+            threshold=threshold,
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.int64),
+            max_depth=int(max_depth),
+        )
+
+    def save(self, directory: str | Path) -> None:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in _ARRAYS:
+            np.save(directory / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+        (directory / "meta.json").write_text(json.dumps({"max_depth": self.max_depth}), encoding="utf-8")
+
+    @classmethod
+    def load(cls, directory: str | Path, *, mmap: bool = True) -> "CompiledForest":
+        """Load arrays written by :meth:`save`, read-only memory-mapped unless *mmap* is False."""
+        directory = Path(directory)
+        meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode="r" if mmap else None) for name in _ARRAYS}
+        return cls(**arrays, max_depth=int(meta["max_depth"]))
+
+    def leaves(self, x: np.ndarray, trees: slice = slice(None)) -> np.ndarray:
+        """Leaf index reached by each row of *x* in each selected tree, shape (n, trees)."""
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        n, n_features = x.shape
+        flat = x.ravel()
+        roots = self.roots[trees]
+        # Tree-major order keeps each tree's nodes together while walking.
+        idx = np.repeat(roots, n)
+        row_offset = np.tile(np.arange(n, dtype=np.int64) * n_features, len(roots))
+        for _ in range(self.max_depth):
+            packed = self.packed[idx]
+            go_left = flat[row_offset + (packed & 255)] <= self.threshold[idx]
+            idx = np.where(go_left, idx + 1, packed >> 8)
+        return idx.reshape(len(roots), n).T
+
+    def tree_proba(self, x: np.ndarray, trees: slice = slice(None)) -> np.ndarray:
+        """Per-tree class probabilities, shape (n, trees, classes)."""
+        return self.value[self.leaves(x, trees)]
+
+    def predict_proba(self, x: np.ndarray) -> np.ndarray:
+        return self.tree_proba(x).sum(axis=1) / self.n_trees
+
+    def predict_proba_early(
+        self,
+        x: np.ndarray,
+        *,
+        chunk: int = 25,
+        min_confidence: float | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Vote tree chunk by tree chunk and stop each row as soon as it is decided.
+
+        A row stops once its leading class is ahead of the runner-up by more
+        than the number of trees left, so the remaining trees cannot change
+        the argmax. With *min_confidence*, a row also stops once the leading
+        class's mean over the trees seen so far reaches that value, which is
+        faster but no longer guaranteed.
+
+        Returns (proba, trees_used). Each row's proba is the mean over the
+        trees it used, so it only equals ``predict_proba`` when every tree
+        was evaluated.
+        """
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        n = len(x)
+        totals = np.zeros((n, self.n_classes), dtype=np.float64)
+        used = np.zeros(n, dtype=np.int64)
+        active = np.arange(n)
+        # The margin test cannot pass before a majority of trees has voted,
+        # so without a confidence bound there is no point stopping earlier.
+        first = chunk if min_confidence is not None else max(chunk, self.n_trees // 2 + 1)
+        start = 0
+        while start < self.n_trees:
+            stop = min(max(start + chunk, first), self.n_trees)
+            totals[active] += self.tree_proba(x[active], slice(start, stop)).sum(axis=1)
+            used[active] = stop
+            remaining = self.n_trees - stop
+            if remaining == 0:
+                break
+            top2 = np.sort(totals[active], axis=1)[:, -2:]
+            done = top2[:, 1] - top2[:, 0] > remaining
+            if min_confidence is not None:
+                done |= top2[:, 1] / stop >= min_confidence
+            active = active[~done]
+            if len(active) == 0:
+                break
+            start = stop
+        return totals / used[:, None], used
+
+
+def _unscale_thresholds(threshold: np.ndarray, feature: np.ndarray, scaler) -> np.ndarray:
+    """Raw-unit thresholds equivalent to ``scaler.transform(x)[f] <= threshold``.
+
+    Inputs are float32 and scaling is monotone, so each split is some float32
+    cut-off ``u`` with ``x <= u``. Start from the algebraic inverse and nudge
+    ``u`` one ulp at a time, checking with the scaler itself, until it is the
+    largest float32 that still goes left.
+    """
+    rows = np.arange(len(threshold))
+    n_features = len(scaler.mean_)
+
+    def goes_left(u: np.ndarray) -> np.ndarray:
+        probe = np.zeros((len(u), n_features), dtype=np.float32)
+        probe[rows, feature] = u
+        scaled = scaler.transform(probe)[rows, feature]
+        return scaled.astype(np.float64) <= threshold
+
+    mean = np.asarray(scaler.mean_, dtype=np.float64)[feature]
+    scale = np.asarray(scaler.scale_, dtype=np.float64)[feature]
+    with np.errstate(over="ignore", invalid="ignore"):
+        u = (threshold * scale + mean).astype(np.float32)
+        for _ in range(64):
+            down = ~goes_left(u)
+            up = ~down & goes_left(np.nextafter(u, np.float32(np.inf)))
+            if not down.any() and not up.any():
+                break
+            u = np.where(down, np.nextafter(u, np.float32(-np.inf)), u)
+            u = np.where(up, np.nextafter(u, np.float32(np.inf)), u)
+    return u.astype(np.float64)
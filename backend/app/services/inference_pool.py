@@ -0,0 +1,414 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Set, Tuple
+
+import numpy as np
+
+from app.services.memory import memory_report
+from app.services.predictor import ModelArtifactsNotFound, PredictionResult, PredictorService, vectorize
+
+# Set in each worker process by _init_worker.
+_worker_predictor: PredictorService | None = None
+
+
+def _init_worker(started, models_dir: str, dl_explainer: str, version: str | None, warm: tuple) -> None:
+    # Warming here means no process, recycled ones included, takes work cold.
+    global _worker_predictor
+    _worker_predictor = PredictorService(models_dir, dl_explainer=dl_explainer, version=version)
+    loaded, error = [], None
+    try:
+        loaded = _worker_predictor.warm_up(warm) if warm else []
+    except Exception as e:
+        error = str(e)
+    started.put((os.getpid(), loaded, error))
+
+
+def _worker_pid() -> int:
+    return os.getpid()
+
+
+def _predict_in_worker(
+    x: np.ndarray,
+    model_type: str,
+    explain: bool,
+    early_exit: str,
+) -> Tuple[List[PredictionResult], int, Dict[str, Any]]:
+    results = _worker_predictor.predict_matrix(x, model_type=model_type, explain=explain, early_exit=early_exit)
+    # The worker's cache counters ride along, so the API process can report them.
+    return results, os.getpid(), _worker_predictor.cache.stats()
+
+
+def _run_inline(fn, *args, **kwargs) -> Future:
+    # In-process calls finish before the future is handed back.
+    future: Future = Future()
+    try:
+        future.set_result(fn(*args, **kwargs))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+class _WorkerProcesses(ProcessPoolExecutor):
+    """A ProcessPoolExecutor that knows its worker pids and unfinished tasks.
+
+    Every worker warms the *warm* model types before taking any task.
+    """
+
+    def __init__(self, predictor: PredictorService, *, warm: tuple = (), **kwargs):
+        ctx = multiprocessing.get_context("spawn")
+        # Each worker reports (pid, models warmed, error) here once initialized.
+        self._started = ctx.SimpleQueue()
+        super().__init__(
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(self._started, str(predictor.models_dir), predictor.dl_explainer, predictor.version, tuple(warm)),
+            **kwargs,
+        )
+        self._reports: Dict[int, tuple] = {}
+        self._pids_lock = threading.Lock()
+        # Guarded by the owning pool's lock.
+        self.pending: Set[Future] = set()
+        self.stuck: Set[Future] = set()
+        self.retired = False
+
+    def reports(self) -> Dict[int, tuple]:
+        """``(models warmed, error)`` of every worker initialized so far, by pid."""
+        with self._pids_lock:
+            while not self._started.empty():
+                pid, loaded, error = self._started.get()
+                self._reports[pid] = (loaded, error)
+            return dict(self._reports)
+
+    def pids(self) -> Set[int]:
+        """Pids of every worker started so far, including ones that have since exited."""
+        return set(self.reports())
+
+    def live_processes(self) -> list:
+        pids = self.pids()
+        return [p for p in multiprocessing.active_children() if p.pid in pids]
+
+
+class _WorkerFuture(Future):
+    # Remembers the executor running the task, so a timeout can retire it.
+    def __init__(self, executor: _WorkerProcesses):
+        super().__init__()
+        self.executor = executor
+
+
+class InferencePool:
+    """Run model and explainer work in worker processes instead of the API process.
+
+    Each worker builds one PredictorService (artifacts load on first use) and
+    receives float32 feature matrices over the executor's pipe, so inference
+    can use every core instead of sharing the API's GIL. Workers keep their
+    own prediction caches. With 0 workers, calls run on *predictor* in the
+    calling thread.
+
+    A task that outlives *timeout* fails its caller and retires its
+    executor: later calls start fresh workers, while calls already on the
+    old ones finish there. The old workers are then terminated, stuck one
+    included, once only timed-out tasks remain on them.
+    """
+
+    def __init__(
+        self,
+        predictor: PredictorService,
+        *,
+        workers: int | None = None,
+        timeout: float | None = None,
+        max_tasks_per_child: int | None = None,
+    ):
+        self.predictor = predictor
+        self.workers = int(os.getenv("INFERENCE_WORKERS", "0")) if workers is None else workers
+        self.timeout = float(os.getenv("INFERENCE_TIMEOUT_SECONDS", "30")) if timeout is None else timeout
+        self.max_tasks_per_child = (
+            int(os.getenv("INFERENCE_MAX_TASKS_PER_CHILD", "0")) if max_tasks_per_child is None else max_tasks_per_child
+        )
+        self._executor: _WorkerProcesses | None = None
+        # Model types every new worker warms before taking work (see warm_up).
+        self._warm_types: tuple = ()
+        self._lock = threading.Lock()
+        # Latest cache stats reported by each worker of the current executor, by pid.
+        self._worker_cache: Dict[int, Dict[str, Any]] = {}
+        self.submitted = 0
+        self.timeouts = 0
+        self.restarts = 0
+
+    @property
+    def result_timeout(self) -> float | None:
+        # In-process calls finish before submit_batch returns; only workers can hang.
+        return self.timeout if self.workers > 0 else None
+
+    def submit_batch(
+        self,
+        payloads: List[Dict[str, float | int]],
+        *,
+        model_type: str = "ml",
+        explain: bool = True,
+        early_exit: str = "off",
+    ) -> Future:
+        if self.workers <= 0:
+            return _run_inline(
+                self.predictor.predict_batch, payloads, model_type=model_type, explain=explain, early_exit=early_exit
+            )
+        return self._submit_to_worker(vectorize(payloads), model_type, explain, early_exit)
+
+    def submit_matrix(
+        self,
+        x: np.ndarray,
+        *,
+        model_type: str = "ml",
+        explain: bool = True,
+        early_exit: str = "off",
+    ) -> Future:
+        """:meth:`submit_batch` for an already vectorized N x 24 float32 matrix."""
+        if self.workers <= 0:
+            return _run_inline(
+                self.predictor.predict_matrix, x, model_type=model_type, explain=explain, early_exit=early_exit
+            )
+        return self._submit_to_worker(x, model_type, explain, early_exit)
+
+    def wait(self, future: Future):
+        """``future.result()`` bounded by the per-task timeout; a timeout retires the workers."""
+        try:
+            return future.result(timeout=self.result_timeout)
+        except TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            if isinstance(future, _WorkerFuture):
+                # The task may be stuck; otherwise it would hold its worker indefinitely.
+                self._retire(future.executor, future)
+            raise
+
+    def predict_batch(self, payloads: List[Dict[str, float | int]], **options) -> List[PredictionResult]:
+        return self.wait(self.submit_batch(payloads, **options))
+
+    def predict_matrix(self, x: np.ndarray, **options) -> List[PredictionResult]:
+        return self.wait(self.submit_matrix(x, **options))
+
+    def warm_up(self, model_types: tuple = ("ml", "dl")) -> list:
+        """Warm the serving predictor, or start a warm set of worker processes.
+
+        With workers, every process started from now on (replacements
+        included) warms *model_types* before taking work.
+        """
+        if self.workers <= 0:
+            return self.predictor.warm_up(model_types)
+        executor = self._new_executor(self.predictor, warm=model_types)
+        try:
+            loaded = self._warm_workers(executor)
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        with self._lock:
+            self._warm_types = tuple(model_types)
+            old_executor, self._executor = self._executor, executor
+            self._worker_cache = {}
+        if old_executor is not None:
+            old_executor.shutdown(wait=False)
+        return loaded
+
+    def swap(self, predictor: PredictorService, *, warm: tuple | None = None) -> PredictorService:
+        """Serve *predictor* from now on and return the previous one.
+
+        With *warm*, those model types are first loaded where *predictor*
+        will serve: in this process, or in a new set of worker processes
+        started on its artifacts. The predictor and its workers then replace
+        the old ones together, so no request reaches cold workers. If warm-up
+        fails, or loads none of the types (ModelArtifactsNotFound), nothing
+        is swapped. Calls already running finish on the old artifacts.
+        """
+        executor = None
+        if warm is not None:
+            if self.workers > 0:
+                executor = self._new_executor(predictor, warm=warm)
+                try:
+                    loaded = self._warm_workers(executor)
+                except BaseException:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise
+            else:
+                loaded = predictor.warm_up(warm)
+            if not loaded:
+                if executor is not None:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                raise ModelArtifactsNotFound(f"No model could be loaded from {predictor.models_dir}")
+        with self._lock:
+            old, self.predictor = self.predictor, predictor
+            old_executor, self._executor = self._executor, executor
+            if warm is not None:
+                self._warm_types = tuple(warm)
+            self._worker_cache = {}
+        if old_executor is not None:
+            old_executor.shutdown(wait=False)
+        return old
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Prediction cache counters of the processes that serve predictions.
+
+        With workers, the sums of what each worker of the current executor
+        reported with its latest result, including workers since recycled by
+        *max_tasks_per_child*; ``size`` only counts the live ones.
+        """
+        if self.workers <= 0:
+            return self.predictor.cache.stats()
+        with self._lock:
+            reports = dict(self._worker_cache)
+            executor = self._executor
+        live = {p.pid for p in executor.live_processes()} if executor is not None else set()
+        totals = {key: sum(r[key] for r in reports.values()) for key in ("hits", "misses", "evictions")}
+        totals["size"] = sum(r["size"] for pid, r in reports.items() if pid in live)
+        lookups = totals["hits"] + totals["misses"]
+        return {
+            **totals,
+            "max_size": self.predictor.cache.max_size * self.workers,
+            "ttl_seconds": self.predictor.cache.ttl_seconds,
+            "hit_rate": (totals["hits"] / lookups) if lookups else 0.0,
+            "workers_reporting": len(reports),
+        }
+
+    def memory_stats(self) -> Dict[str, Any]:
+        """Memory of each live worker process (see memory_report), by pid.
+
+        ``pss_kb`` is the sum over the workers: their combined footprint,
+        with shared model pages counted once. Empty without workers.
+        """
+        with self._lock:
+            executor = self._executor
+        reports = {}
+        for process in executor.live_processes() if executor is not None else []:
+            report = memory_report(process.pid)
+            if report is not None:  # exited meanwhile, or no /proc
+                reports[str(process.pid)] = report
+        return {"workers": reports, "pss_kb": sum(r["pss_kb"] for r in reports.values())}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "timeout_seconds": self.timeout,
+                "max_tasks_per_child": self.max_tasks_per_child,
+                "submitted": self.submitted,
+                "timeouts": self.timeouts,
+                "restarts": self.restarts,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self) -> _WorkerProcesses:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._new_executor(self.predictor, warm=self._warm_types)
+            return self._executor
+
+    def _new_executor(self, predictor: PredictorService, *, warm: tuple = ()) -> _WorkerProcesses:
+        kwargs = {}
+        if self.max_tasks_per_child > 0:
+            kwargs["max_tasks_per_child"] = self.max_tasks_per_child
+        # spawn (see _WorkerProcesses): the API process runs threads, which fork does not copy safely.
+        return _WorkerProcesses(predictor, warm=warm, max_workers=self.workers, **kwargs)
+
+    def _warm_workers(self, executor: _WorkerProcesses) -> list:
+        """Start all of *executor*'s workers and return the model types they warmed.
+
+        Submitting one task per worker to a new executor starts a process
+        for each (none is idle yet); each reports once its initializer has
+        warmed it. Raises unless every worker warmed the same model types.
+        """
+        futures = [executor.submit(_worker_pid) for _ in range(self.workers)]
+        deadline = None if self.result_timeout is None else time.monotonic() + self.result_timeout
+        for f in futures:
+            f.result(timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+        reports = executor.reports()
+        while len(reports) < self.workers:
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"{len(reports)} of {self.workers} workers started")
+            time.sleep(0.05)
+            reports = executor.reports()
+        errors = sorted({error for _, error in reports.values() if error})
+        if errors:
+            raise RuntimeError(f"Worker warm-up failed: {'; '.join(errors)}")
+        loaded = {tuple(models) for models, _ in reports.values()}
+        if len(loaded) > 1:
+            raise RuntimeError(f"Workers warmed different models: {sorted(loaded)}")
+        return list(loaded.pop())
+
+    def _submit_to_worker(self, x: np.ndarray, model_type: str, explain: bool, early_exit: str) -> Future:
+        with self._lock:
+            self.submitted += 1
+        executor = self._get_executor()
+        try:
+            task = executor.submit(self._task, x, model_type, explain, early_exit)
+        except RuntimeError:
+            # BrokenProcessPool, or the executor was closed by swap() or
+            # shutdown() after _get_executor handed it out: retry on a new one.
+            self._restart(executor)
+            executor = self._get_executor()
+            task = executor.submit(self._task, x, model_type, explain, early_exit)
+        future = _WorkerFuture(executor)
+        future.set_running_or_notify_cancel()
+        with self._lock:
+            executor.pending.add(future)
+        task.add_done_callback(lambda t: self._on_done(executor, t, future))
+        return future
+
+    # The function run in a worker for each prediction task.
+    _task = staticmethod(_predict_in_worker)
+
+    def _on_done(self, executor: _WorkerProcesses, task: Future, future: Future) -> None:
+        error = CancelledError() if task.cancelled() else task.exception()
+        if error is not None:
+            # A worker died (OOM, segfault): replace the pool so later calls work.
+            if isinstance(error, BrokenProcessPool):
+                self._restart(executor)
+            future.set_exception(error)
+        else:
+            results, pid, cache_stats = task.result()
+            with self._lock:
+                if self._executor is executor:
+                    self._worker_cache[pid] = cache_stats
+            future.set_result(results)
+        with self._lock:
+            executor.pending.discard(future)
+        self._reap(executor)
+
+    def _restart(self, executor: _WorkerProcesses) -> None:
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self._worker_cache = {}
+            self.restarts += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _retire(self, executor: _WorkerProcesses, stuck: Future) -> None:
+        # New calls get fresh workers; queued and running calls stay on the old ones.
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+                self._worker_cache = {}
+                self.restarts += 1
+            executor.retired = True
+            if not stuck.done():
+                executor.stuck.add(stuck)
+        executor.shutdown(wait=False)
+        self._reap(executor)
+
+    def _reap(self, executor: _WorkerProcesses) -> None:
+        # Once only timed-out tasks are left, nothing else can fail: kill the workers.
+        with self._lock:
+            if not executor.retired or not executor.stuck or executor.pending - executor.stuck:
+                return
+            executor.stuck.clear()
+        for process in executor.live_processes():
+            process.terminate()
@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, BinaryIO, Callable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.database.crud import (
+    add_csv_upload,
+    claim_job,
+    create_job,
+    filter_new_csv_rows,
+    get_csv_upload,
+    get_job,
+    insert_csv_students,
+    list_unfinished_jobs,
+    release_job,
+    renew_job_claim,
+)
+from app.database.models import Job
+from app.services.csv_parallel import NOT_UTF8, read_header, split_records, validate_chunk
+
+FINISHED = ("succeeded", "failed")
+
+# check_rows(parsed_rows, first_row) -> errors;
+# score_rows(db, teacher_id, upload_batch, parsed_rows, model_type) -> rows inserted.
+CheckRows = Callable[[List[dict], int], List[dict]]
+ScoreRows = Callable[[Session, int, str, List[dict], str], int]
+
+
+class JobRunner:
+    """Validate, insert and optionally score spooled CSV uploads in the background.
+
+    A job makes two passes over its file in chunks of *chunk_bytes* whole
+    records: the first validates everything (so a bad row still rejects the
+    file, as with /csv/upload), the second inserts the rows and, for scoring
+    jobs, their predictions. Each inserted chunk is committed together with
+    the job's byte offset, so after a restart a job picks up after the last
+    committed chunk instead of starting over. A job that fails during the
+    insert pass keeps the chunks it already committed under its upload_batch.
+
+    Rows the teacher already has stored are not inserted again, and a file
+    identical to an earlier upload finishes at once with that upload's
+    batch. Scoring jobs predict every row of their file, but *score_rows*
+    stores the rows together with their predictions and, like the rows,
+    skips predictions the same model version already stored.
+
+    At most *workers* jobs run at once (others wait in the queue), keeping
+    ingestion to a bounded share of the process. With 0 workers a job runs
+    in the thread that submits it.
+
+    Several processes (e.g. ``uvicorn --workers``) can share the jobs table:
+    a runner claims a job before running it and renews the claim with every
+    committed chunk, and another runner only takes the job over once the
+    claim is *lease_seconds* old.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        *,
+        check_rows: Optional[CheckRows] = None,
+        score_rows: Optional[ScoreRows] = None,
+        workers: int | None = None,
+        chunk_bytes: int | None = None,
+        jobs_dir: str | None = None,
+        max_errors: int | None = None,
+        lease_seconds: float | None = None,
+    ):
+        self.session_factory = session_factory
+        self.check_rows = check_rows
+        self.score_rows = score_rows
+        self.workers = int(os.getenv("JOB_WORKERS", "1")) if workers is None else workers
+        self.chunk_bytes = int(os.getenv("JOB_CHUNK_BYTES", str(1 << 20))) if chunk_bytes is None else chunk_bytes
+        self.jobs_dir = os.getenv("JOBS_DIR", "./job_uploads") if jobs_dir is None else jobs_dir
+        self.max_errors = int(os.getenv("CSV_MAX_REPORTED_ERRORS", "100")) if max_errors is None else max_errors
+        self.lease_seconds = float(os.getenv("JOB_LEASE_SECONDS", "120")) if lease_seconds is None else lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def create(
+        self,
+        db: Session,
+        *,
+        teacher_id: int,
+        filename: str,
+        source: BinaryIO,
+        score: bool = False,
+        model_type: Optional[str] = None,
+    ) -> Job:
+        """Spool (and hash) *source* to the jobs directory, record a queued job and submit it."""
+        job_id = uuid.uuid4().hex
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        path = os.path.join(self.jobs_dir, f"{job_id}.csv")
+        digest = hashlib.sha256()
+        source.seek(0)
+        with open(path, "wb") as out:
+            for chunk in iter(lambda: source.read(1 << 20), b""):
+                digest.update(chunk)
+                out.write(chunk)
+        content_hash = digest.hexdigest()
+        previous = None if score else get_csv_upload(db, teacher_id=teacher_id, content_hash=content_hash)
+        job = create_job(
+            db,
+            job_id=job_id,
+            teacher_id=teacher_id,
+            filename=filename,
+            file_path=path,
+            upload_batch=previous.upload_batch if previous is not None else str(uuid.uuid4()),
+            total_bytes=os.path.getsize(path),
+            score=score,
+            model_type=model_type,
+            content_hash=content_hash,
+        )
+        if previous is not None:
+            job.processed_bytes, job.rows_skipped = job.total_bytes, previous.row_count
+            self._finish(db, job, "succeeded", message="Identical to an earlier upload; nothing to ingest")
+            return job
+        self.submit(job.id)
+        db.refresh(job)
+        return job
+
+    def submit(self, job_id: str) -> None:
+        if self.workers <= 0:
+            self.run(job_id)
+            return
+        self._get_executor().submit(self.run, job_id)
+
+    def resume(self) -> int:
+        """Resubmit the jobs a previous process left queued or half done.
+
+        Jobs another live runner holds are skipped when they come to run.
+        """
+        self._stopping.clear()
+        with self.session_factory() as db:
+            job_ids = [job.id for job in list_unfinished_jobs(db)]
+        for job_id in job_ids:
+            self.submit(job_id)
+        return len(job_ids)
+
+    def shutdown(self) -> None:
+        # Running jobs stop after their current chunk and resume on the next start.
+        self._stopping.set()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, job_id: str) -> None:
+        with self.session_factory() as db:
+            stale_before = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+            if not claim_job(db, job_id=job_id, owner=self.owner, stale_before=stale_before):
+                return
+            job = get_job(db, job_id=job_id)
+            if job.started_at is None:
+                job.started_at = datetime.utcnow()
+                db.commit()
+            try:
+                finished = self._run(db, job)
+            except Exception as e:
+                db.rollback()
+                self._finish(db, job, "failed", message=f"Ingestion failed: {e}")
+                return
+            if not finished:
+                release_job(db, job_id=job.id, owner=self.owner)
+                return
+            if (
+                not job.error_count
+                and job.content_hash
+                and get_csv_upload(db, teacher_id=job.teacher_id, content_hash=job.content_hash) is None
+            ):
+                add_csv_upload(
+                    db,
+                    teacher_id=job.teacher_id,
+                    content_hash=job.content_hash,
+                    upload_batch=job.upload_batch,
+                    row_count=job.rows_validated,
+                )
+            self._finish(db, job, "succeeded" if not job.error_count else "failed")
+
+    def _run(self, db: Session, job: Job) -> bool:
+        """Process *job*; False if stopped part-way for a shutdown or a lost claim."""
+        size = os.path.getsize(job.file_path)
+        with open(job.file_path, "rb") as f:
+            if size == 0:
+                return self._process(db, job, b"")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                return self._process(db, job, content)
+
+    def _process(self, db: Session, job: Job, content) -> bool:
+        fieldnames, header_end, header_errors = read_header(content)
+        if header_errors:
+            self._add_errors(job, header_errors)
+            return True
+        if job.status in ("queued", "validating"):
+            # Validation is not resumable: start the pass over.
+            job.status, job.processed_bytes, job.rows_validated = "validating", header_end, 0
+            job.error_count, job.errors_json = 0, None
+            if not self._commit(db, job):
+                return False
+            if not self._validate(db, job, content, fieldnames):
+                return False
+            if job.error_count:
+                return True
+            job.status, job.processed_bytes = "inserting", header_end
+            if not self._commit(db, job):
+                return False
+        return self._insert(db, job, content, fieldnames)
+
+    def _validate(self, db: Session, job: Job, content, fieldnames: List[str]) -> bool:
+        for start, end in split_records(content, job.processed_bytes, self.chunk_bytes):
+            if self._stopping.is_set():
+                return False
+            result = validate_chunk(content[start:end], fieldnames)
+            if result is None:
+                self._add_errors(job, [dict(NOT_UTF8)])
+                db.commit()
+                return True
+            rows, errors = result
+            first_row = job.rows_validated + 2  # row 1 is header
+            for e in errors:
+                e["row"] += first_row
+            if not errors and job.score and self.check_rows is not None:
+                errors = self.check_rows(rows, first_row)
+            self._add_errors(job, errors)
+            job.rows_validated += len(rows)
+            job.processed_bytes = end
+            if not self._commit(db, job):
+                return False
+        if job.rows_validated == 0 and not job.error_count:
+            self._add_errors(job, [{"row": 0, "field": "file", "message": "CSV file has no data rows"}])
+            db.commit()
+        return True
+
+    def _insert(self, db: Session, job: Job, content, fieldnames: List[str]) -> bool:
+        for start, end in split_records(content, job.processed_bytes, self.chunk_bytes):
+            if self._stopping.is_set():
+                return False
+            # Validated in the first pass; parsing again is cheaper than keeping the rows.
+            rows, _ = validate_chunk(content[start:end], fieldnames)
+            if job.score and self.score_rows is not None:
+                inserted = self.score_rows(db, job.teacher_id, job.upload_batch, rows, job.model_type or "ml")
+                job.rows_scored += len(rows)
+            else:
+                new_rows = filter_new_csv_rows(db, teacher_id=job.teacher_id, rows=rows, exclude_batch=job.upload_batch)
+                inserted = insert_csv_students(db, teacher_id=job.teacher_id, upload_batch=job.upload_batch, rows=new_rows)
+            job.rows_inserted += inserted
+            job.rows_skipped += len(rows) - inserted
+            job.processed_bytes = end
+            # The rows and the offset they bring the job to land together.
+            if not self._commit(db, job):
+                return False
+        return True
+
+    def _commit(self, db: Session, job: Job) -> bool:
+        # Renewing in the same transaction means a runner that lost the job commits nothing.
+        if not renew_job_claim(db, job_id=job.id, owner=self.owner):
+            db.rollback()
+            return False
+        db.commit()
+        return True
+
+    def _add_errors(self, job: Job, errors: List[dict]) -> None:
+        if not errors:
+            return
+        kept = json.loads(job.errors_json) if job.errors_json else []
+        if len(kept) < self.max_errors:
+            kept.extend(errors[: self.max_errors - len(kept)])
+            job.errors_json = json.dumps(kept)
+        job.error_count += len(errors)
+
+    def _finish(self, db: Session, job: Job, status: str, *, message: Optional[str] = None) -> None:
+        job.status = status
+        job.finished_at = datetime.utcnow()
+        if message is not None:
+            job.message = message
+        elif status == "failed":
+            job.message = f"CSV validation failed: {job.error_count} error(s) found"
+        db.commit()
+        try:
+            os.remove(job.file_path)
+        except OSError:
+            pass
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._stopping.clear()
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ingest-job")
+            return self._executor
+
+
+def job_progress(job: Job) -> dict[str, Any]:
+    """The GET /jobs/{id} view of *job*: status, progress, errors and throughput."""
+    errors = json.loads(job.errors_json) if job.errors_json else []
+    end = job.finished_at or datetime.utcnow()
+    elapsed = (end - job.started_at).total_seconds() if job.started_at else 0.0
+    # Bytes of the current pass: validation, then insertion.
+    if job.status == "succeeded":
+        progress = 1.0
+    elif job.status == "queued" or not job.total_bytes:
+        progress = 0.0
+    else:
+        progress = round(job.processed_bytes / job.total_bytes, 4)
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "filename": job.filename,
+        "upload_batch": job.upload_batch,
+        "score": bool(job.score),
+        "model_type": job.model_type,
+        "total_bytes": job.total_bytes,
+        "processed_bytes": job.processed_bytes,
+        "progress": progress,
+        "rows_validated": job.rows_validated,
+        "rows_inserted": job.rows_inserted,
+        "rows_scored": job.rows_scored,
+        "rows_skipped": job.rows_skipped,
+        "error_count": job.error_count,
+        "errors": errors,
+        "truncated": job.error_count > len(errors),
+        "message": job.message,
+        "created_at": job.created_at.isoformat(),
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "elapsed_seconds": round(elapsed, 3),
+        # Rows validated plus rows inserted or skipped, over both passes.
+        "rows_per_second": (
+            round((job.rows_validated + job.rows_inserted + job.rows_skipped) / elapsed, 1) if elapsed > 0 else None
+        ),
+    }
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict
+
+
+def memory_report(pid: int | str = "self") -> Dict[str, int] | None:
+    """Unique vs shared memory of a process in kB, from /proc/<pid>/smaps_rollup.
+
+    ``unique`` is what the process alone holds (private pages); ``shared``
+    is mapped by other processes too, e.g. memory-mapped model arrays.
+    ``pss`` charges each shared page proportionally, so summing it across
+    workers gives their real combined footprint. Returns None where
+    smaps_rollup is unavailable (non-Linux).
+    """
+    path = Path("/proc") / str(pid) / "smaps_rollup"
+    try:
+        lines = path.read_text().splitlines()
+    except OSError:
+        return None
+    fields: Dict[str, int] = {}
+    for line in lines[1:]:
+        name, _, rest = line.partition(":")
+        parts = rest.split()
+        if parts and parts[0].isdigit():
+            fields[name] = int(parts[0])
+    return {
+        "rss_kb": fields.get("Rss", 0),
+        "pss_kb": fields.get("Pss", 0),
+        "unique_kb": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        "shared_kb": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+        "swap_kb": fields.get("Swap", 0),
+    }
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+
+@dataclass
+class DenseLayer:
+    weights: np.ndarray  # (inputs, units)
+    bias: np.ndarray  # (units,)
+    activation: str  # "relu", "softmax" or "linear"
+
+
+class DenseNetwork:
+    """NumPy version of the small dense classifier built in ``ml/train_dl.py``.
+
+    Serves as the TensorFlow-free inference backend and computes
+    integrated-gradients attributions analytically, without running the
+    Keras/TFLite model thousands of times like KernelExplainer.
+    """
+
+    def __init__(
+        self,
+        layers: List[DenseLayer],
+        *,
+        input_mean: np.ndarray | None = None,
+        input_scale: np.ndarray | None = None,
+    ):
+        if not layers or layers[-1].activation != "softmax":
+            raise ValueError("Expected a stack of dense layers ending in softmax")
+        for layer in layers[:-1]:
+            if layer.activation not in ("relu", "linear"):
+                raise ValueError(f"Unsupported hidden activation: {layer.activation}")
+        self.layers = layers
+        # Set when a StandardScaler has been folded into the first layer.
+        self.input_mean = input_mean
+        self.input_scale = input_scale
+
+    @classmethod
+    def from_keras(cls, model) -> "DenseNetwork":
+        layers = []
+        for layer in model.layers:
+            weights = layer.get_weights()
+            if not weights:
+                continue
+            activation = layer.get_config().get("activation", "linear")
+            layers.append(
+                DenseLayer(
+                    weights=np.asarray(weights[0], dtype=np.float64),
+                    bias=np.asarray(weights[1], dtype=np.float64),
+                    activation=activation,
+                )
+            )
+        return cls(layers)
+
+    @classmethod
+    def from_npz(cls, path: str | Path, *, fold_scaler: bool = True) -> "DenseNetwork":
+        """Load weights written by ``export_numpy_weights`` in ``ml/train_dl.py``.
+
+        With *fold_scaler* the stored StandardScaler is folded into the first
+        layer, so the network takes raw (unscaled) feature vectors.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            activations = [str(a) for a in data["activations"]]
+            layers = [
+                DenseLayer(
+                    weights=data[f"kernel_{i}"].astype(np.float64),
+                    bias=data[f"bias_{i}"].astype(np.float64),
+                    activation=activation,
+                )
+                for i, activation in enumerate(activations)
+            ]
+            network = cls(layers)
+            if fold_scaler:
+                network = network.fold_scaler(data["scaler_mean"], data["scaler_scale"])
+        return network
+
+    def fold_scaler(self, mean: np.ndarray, scale: np.ndarray) -> "DenseNetwork":
+        # (x - mean) / scale @ W + b  ==  x @ (W / scale) + (b - (mean / scale) @ W)
+        mean = np.asarray(mean, dtype=np.float64)
+        scale = np.asarray(scale, dtype=np.float64)
+        first = self.layers[0]
+        folded = DenseLayer(
+            weights=first.weights / scale[:, None],
+            bias=first.bias - (mean / scale) @ first.weights,
+            activation=first.activation,
+        )
+        return DenseNetwork([folded, *self.layers[1:]], input_mean=mean, input_scale=scale)
+
+    def from_scaled(self, x_scaled: np.ndarray) -> np.ndarray:
+        """Map scaled feature rows (e.g. background.npy) into this network's input space."""
+        if self.input_mean is None:
+            return x_scaled
+        return np.asarray(x_scaled, dtype=np.float64) * self.input_scale + self.input_mean
+
+    @classmethod
+    def from_tflite(cls, interpreter) -> "DenseNetwork":
+        # TFLite fuses ReLU into FULLY_CONNECTED and keeps SOFTMAX as its own op,
+        # so hidden layers are ReLU and the last one feeds the softmax, as in
+        # train_dl.py. Callers should check the result against the interpreter.
+        ops = [op for op in interpreter._get_ops_details() if op["op_name"] == "FULLY_CONNECTED"]
+        layers = []
+        for i, op in enumerate(ops):
+            _, weights_idx, bias_idx = op["inputs"][:3]
+            layers.append(
+                DenseLayer(
+                    weights=np.asarray(interpreter.get_tensor(weights_idx), dtype=np.float64).T,
+                    bias=np.asarray(interpreter.get_tensor(bias_idx), dtype=np.float64),
+                    activation="softmax" if i == len(ops) - 1 else "relu",
+                )
+            )
+        return cls(layers)
+
+    def _forward(self, x: np.ndarray) -> tuple[np.ndarray, List[np.ndarray]]:
+        pre_activations = []
+        h = np.asarray(x, dtype=np.float64)
+        for layer in self.layers:
+            z = h @ layer.weights + layer.bias
+            pre_activations.append(z)
+            if layer.activation == "relu":
+                h = np.maximum(z, 0.0)
+            elif layer.activation == "softmax":
+                e = np.exp(z - z.max(axis=1, keepdims=True))
+                h = e / e.sum(axis=1, keepdims=True)
+            else:
+                h = z
+        return h, pre_activations
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        return self._forward(x)[0]
+
+    def input_gradients(self, x: np.ndarray, class_idx: np.ndarray) -> np.ndarray:
+        """d proba[class_idx] / d x for every row of *x*."""
+        proba, pre_activations = self._forward(x)
+        rows = np.arange(len(x))
+        # Softmax Jacobian row for the target class: p_c * (onehot_c - p).
+        grad = -proba * proba[rows, class_idx][:, None]
+        grad[rows, class_idx] += proba[rows, class_idx]
+        for layer, z in zip(reversed(self.layers), reversed(pre_activations)):
+            if layer.activation == "relu":
+                grad = grad * (z > 0)
+            grad = grad @ layer.weights.T
+        return grad
+
+    def integrated_gradients(
+        self,
+        x: np.ndarray,
+        baseline: np.ndarray,
+        class_idx: np.ndarray,
+        *,
+        steps: int = 64,
+    ) -> np.ndarray:
+        """Integrated gradients of the class probability from *baseline* to *x*.
+
+        Attributions sum (up to the Riemann error) to
+        ``proba(x)[c] - proba(baseline)[c]``, the same quantity SHAP splits.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        baseline = np.broadcast_to(np.asarray(baseline, dtype=np.float64), x.shape)
+        n, n_features = x.shape
+        alphas = (np.arange(steps) + 0.5) / steps
+        delta = x - baseline
+        path = baseline[:, None, :] + alphas[None, :, None] * delta[:, None, :]
+        grads = self.input_gradients(
+            path.reshape(n * steps, n_features),
+            np.repeat(np.asarray(class_idx), steps),
+        )
+        return delta * grads.reshape(n, steps, n_features).mean(axis=1)
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+_VERSION_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+# Files a version may carry; anything else in the source directory is ignored.
+ARTIFACT_FILES = (
+    "rf_model.joblib",
+    "scaler.joblib",
+    "label_map.json",
+    "background.npy",
+    "ml_metrics.json",
+    "dl_weights.npz",
+    "dl_model.keras",
+    "dl_model.tflite",
+    "dl_metrics.json",
+)
+
+
+class ModelVersionError(Exception):
+    pass
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _content_hash(files: Dict[str, str]) -> str:
+    h = hashlib.sha256()
+    for name in sorted(files):
+        h.update(f"{name}\0{files[name]}\n".encode())
+    return h.hexdigest()
+
+
+class ModelRegistry:
+    """Versioned model artifacts under ``<root>/<version>/`` with a manifest each.
+
+    ``manifest.json`` lists the sha256 of every artifact and a content hash
+    over all of them, so a half-copied or edited version is refused. The
+    ``ACTIVE`` file names the version the API serves after a restart.
+    """
+
+    def __init__(self, root: str | Path | None = None):
+        if root is None:
+            root = os.getenv("MODEL_REGISTRY_DIR") or Path(__file__).resolve().parents[2] / "ml" / "models" / "versions"
+        self.root = Path(root)
+
+    def version_dir(self, version: str) -> Path:
+        if not _VERSION_RE.match(version):
+            raise ModelVersionError(f"Invalid model version: {version!r}")
+        return self.root / version
+
+    def publish(self, source_dir: str | Path, version: str) -> dict:
+        """Copy the artifacts in *source_dir* into a new version and write its manifest."""
+        source_dir = Path(source_dir)
+        target = self.version_dir(version)
+        if target.exists():
+            raise ModelVersionError(f"Model version already exists: {version}")
+        names = [name for name in ARTIFACT_FILES if (source_dir / name).is_file()]
+        if not names:
+            raise ModelVersionError(f"No model artifacts found in {source_dir}")
+
+        tmp = self.root / f".{version}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        for name in names:
+            shutil.copy2(source_dir / name, tmp / name)
+        files = {name: _sha256(tmp / name) for name in names}
+        manifest = {
+            "version": version,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "files": files,
+            "content_hash": _content_hash(files),
+        }
+        (tmp / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        os.rename(tmp, target)
+        return manifest
+
+    def manifest(self, version: str) -> dict:
+        path = self.version_dir(version) / "manifest.json"
+        if not path.exists():
+            raise ModelVersionError(f"Unknown model version: {version}")
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def verify(self, version: str) -> dict:
+        """The manifest of *version*, after checking every file against its hash."""
+        manifest = self.manifest(version)
+        directory = self.version_dir(version)
+        for name, expected in manifest["files"].items():
+            path = directory / name
+            if not path.is_file() or _sha256(path) != expected:
+                raise ModelVersionError(f"Model version {version} failed verification: {name}")
+        if _content_hash(manifest["files"]) != manifest["content_hash"]:
+            raise ModelVersionError(f"Model version {version} failed verification: content hash")
+        return manifest
+
+    def list_versions(self) -> List[dict]:
+        if not self.root.exists():
+            return []
+        manifests = []
+        for path in sorted(self.root.iterdir()):
+            if path.is_dir() and (path / "manifest.json").exists():
+                manifests.append(self.manifest(path.name))
+        return manifests
+
+    def active_version(self) -> str | None:
+        path = self.root / "ACTIVE"
+        if not path.exists():
+            return None
+        version = path.read_text(encoding="utf-8").strip()
+        return version or None
+
+    def set_active(self, version: str) -> None:
+        self.version_dir(version)
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / ".ACTIVE.tmp"
+        tmp.write_text(version, encoding="utf-8")
+        os.replace(tmp, self.root / "ACTIVE")
@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+import hashlib
+import importlib
 import json
 import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Literal, Tuple
@@ -9,20 +14,37 @@ from typing import Dict, List, Literal, Tuple
 import joblib
 import numpy as np
 
-try:
-    import shap
-except Exception:  # pragma: no cover
-    shap = None
+from app.services.forest import CompiledForest
+from app.services.mlp import DenseNetwork
+from app.services.prediction_cache import PredictionCache
+from app.services.tflite_pool import InterpreterPool
+
+# Optional heavy dependencies, imported on first use by _optional so that
+# importing this module (and app.main) stays fast. Tests may still replace
+# them with setattr on the module, e.g. ``predictor.keras = None``.
+_OPTIONAL_IMPORTS: Dict[str, Tuple[str, str | None]] = {
+    "shap": ("shap", None),
+    "keras": ("tensorflow", "keras"),
+    "tflite": ("tflite_runtime.interpreter", None),
+}
+
+
+def _optional(name: str):
+    """The optional dependency *name*, or None when it is not installed."""
+    if name not in globals():
+        module_name, attr = _OPTIONAL_IMPORTS[name]
+        try:
+            module = importlib.import_module(module_name)
+            globals()[name] = getattr(module, attr) if attr else module
+        except Exception:  # pragma: no cover
+            globals()[name] = None
+    return globals()[name]
 
-try:
-    from tensorflow import keras
-except Exception:  # pragma: no cover
-    keras = None
 
-try:
-    import tflite_runtime.interpreter as tflite
-except Exception:  # pragma: no cover
-    tflite = None
+def __getattr__(name: str):
+    if name in _OPTIONAL_IMPORTS:
+        return _optional(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 FEATURES: List[str] = [
@@ -36,6 +58,20 @@ FEATURES: List[str] = [
 
 ModelType = Literal["ml", "dl"]
 
+# "gradient" explains the DL model with integrated gradients on a NumPy copy of
+# the network; "kernel" keeps the exact but slow shap.KernelExplainer.
+DLExplainer = Literal["gradient", "kernel"]
+
+DLBackend = Literal["numpy", "keras", "tflite"]
+
+# "off" votes with every tree. "safe" stops once the remaining trees cannot
+# change the predicted class. "bound" also stops once the leading class
+# reaches RF_EARLY_EXIT_CONFIDENCE over the trees evaluated so far.
+EarlyExit = Literal["off", "safe", "bound"]
+
+# Past a few hundred rows sklearn's compiled loops overtake the NumPy forest walk.
+COMPILED_FOREST_MAX_ROWS = 256
+
 
 @dataclass
 class PredictionResult:
@@ -44,33 +80,117 @@ class PredictionResult:
     model_used: str
     contributions: Dict[str, float]
     model_accuracy: float | None = None
+    trees_used: int | None = None
+    model_version: str | None = None
 
 
 class ModelArtifactsNotFound(Exception):
     pass
 
 
+def _class_shap_values(shap_vals, class_idx: np.ndarray) -> np.ndarray:
+    # Older shap releases return one (n, features) array per class, newer ones
+    # a single (n, features, classes) array.
+    if isinstance(shap_vals, list):
+        return np.stack([shap_vals[int(c)][i] for i, c in enumerate(class_idx)])
+    shap_vals = np.asarray(shap_vals)
+    if shap_vals.ndim == 3:
+        return shap_vals[np.arange(len(class_idx)), :, class_idx]
+    return shap_vals
+
+
+def vectorize(payloads: List[Dict[str, float | int]]) -> np.ndarray:
+    """Feature dicts (as built by ``main._payload_from_student``) to an N x 24 float32 matrix."""
+    return np.array([[float(p[f]) for f in FEATURES] for p in payloads], dtype=np.float32)
+
+
+def vectorize_semesters(marks: np.ndarray, taken: np.ndarray) -> np.ndarray:
+    """Per-semester marks to the N x 24 float32 matrix, filling semesters not taken.
+
+    *marks* is N x 8 x 3 (internal, university, attendance) and *taken* the
+    N x 8 mask of semesters provided; every row needs at least one. As in
+    ``main._payload_from_student``, a missing semester copies the nearest
+    earlier one and leading gaps copy the first one provided.
+    """
+    n = len(marks)
+    position = np.where(taken, np.arange(8), -1)
+    last_taken = np.maximum.accumulate(position, axis=1)
+    source = np.where(last_taken < 0, taken.argmax(axis=1)[:, None], last_taken)
+    return marks[np.arange(n)[:, None], source].reshape(n, len(FEATURES)).astype(np.float32)
+
+
+def _artifact_fingerprint(paths: List[Path]) -> str:
+    """Cheap identity for a set of model files: name, size and mtime of each."""
+    h = hashlib.sha1()
+    for path in paths:
+        if path.exists():
+            stat = path.stat()
+            h.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return h.hexdigest()[:16]
+
+
+def _contributions(vals: np.ndarray) -> Dict[str, float]:
+    return {FEATURES[i]: float(vals[i]) for i in range(len(FEATURES))}
+
+
 class PredictorService:
-    def __init__(self, models_dir: str | Path | None = None):
+    def __init__(
+        self,
+        models_dir: str | Path | None = None,
+        *,
+        dl_explainer: DLExplainer | None = None,
+        version: str | None = None,
+    ):
         if models_dir is None:
             models_dir = Path(__file__).resolve().parents[2] / "ml" / "models"
         self.models_dir = Path(models_dir)
+        # Registry version these artifacts belong to; None for the plain ml/models/ layout.
+        self.version = version
+        self.dl_explainer: DLExplainer = dl_explainer or os.getenv("DL_EXPLAINER", "gradient")
+        if self.dl_explainer not in ("gradient", "kernel"):
+            raise ValueError(f"Unsupported DL explainer: {self.dl_explainer}")
+        self.early_exit_chunk = int(os.getenv("RF_EARLY_EXIT_CHUNK", "25"))
+        self.early_exit_confidence = float(os.getenv("RF_EARLY_EXIT_CONFIDENCE", "0.9"))
+        # Memory-map the compiled forest and background arrays so worker
+        # processes share one physical copy.
+        self.mmap_artifacts = os.getenv("MODEL_MMAP", "1") != "0"
+        # Explainers need the unpickled forest, which defeats the shared mapping
+        # above, so warm_up only builds them when asked to.
+        self.preload_explainers = os.getenv("PRELOAD_EXPLAINERS", "0") == "1"
+        # Results keyed by feature vector, options and artifact fingerprint,
+        # so retrained models never serve stale entries.
+        self.cache = PredictionCache(
+            max_size=int(os.getenv("PREDICTION_CACHE_SIZE", "4096")),
+            ttl_seconds=float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "600")),
+        )
 
         self._ml_loaded = False
         self._dl_loaded = False
+        # Separate locks so ML and DL can load concurrently (see warm_up), while
+        # concurrent first requests for one model still load it only once.
+        self._ml_lock = threading.RLock()
+        self._dl_lock = threading.RLock()
 
         self._ml_model = None
+        self._ml_forest: CompiledForest | None = None
         self._ml_scaler = None
         self._ml_label_map: Dict[int, str] | None = None
         self._ml_background: np.ndarray | None = None
         self._ml_accuracy: float | None = None
+        self._ml_explainer = None
+        self._ml_explainer_built = False
+        self._ml_fingerprint: str | None = None
 
         self._dl_model = None
-        self._dl_use_tflite = False
+        self._dl_backend: DLBackend | None = None
         self._dl_scaler = None
         self._dl_label_map: Dict[int, str] | None = None
         self._dl_background: np.ndarray | None = None
         self._dl_accuracy: float | None = None
+        self._dl_explainer = None
+        self._dl_network: DenseNetwork | None = None
+        self._dl_baseline: np.ndarray | None = None
+        self._dl_fingerprint: str | None = None
 
     def _load_label_map(self, path: Path) -> Dict[int, str]:
         with path.open("r", encoding="utf-8") as f:
@@ -80,7 +200,7 @@ class PredictorService:
     def _load_background(self, path: Path) -> np.ndarray:
         if not path.exists():
             return None
-        return np.load(path)
+        return np.load(path, mmap_mode="r" if self.mmap_artifacts else None)
 
     def _load_accuracy(self, path: Path) -> float | None:
         if not path.exists():
@@ -95,6 +215,11 @@ class PredictorService:
     def _ensure_ml_loaded(self) -> None:
         if self._ml_loaded:
             return
+        with self._ml_lock:
+            if not self._ml_loaded:
+                self._load_ml()
+
+    def _load_ml(self) -> None:
         model_path = self.models_dir / "rf_model.joblib"
         scaler_path = self.models_dir / "scaler.joblib"
         label_map_path = self.models_dir / "label_map.json"
@@ -105,148 +230,369 @@ class PredictorService:
                 "ML artifacts not found. Run: python backend/ml/train_ml.py"
             )
 
-        self._ml_model = joblib.load(model_path)
+        self._ml_fingerprint = _artifact_fingerprint(
+            [model_path, scaler_path, label_map_path, background_path, self.models_dir / "ml_metrics.json"]
+        )
         self._ml_scaler = joblib.load(scaler_path)
+        # The sklearn model itself is only unpickled when SHAP or a very large
+        # batch needs it (see _get_ml_model).
+        self._ml_forest = self._load_compiled_forest()
         self._ml_label_map = self._load_label_map(label_map_path)
         self._ml_background = self._load_background(background_path)
         self._ml_accuracy = self._load_accuracy(self.models_dir / "ml_metrics.json")
         self._ml_loaded = True
 
+    def _get_ml_model(self):
+        if self._ml_model is None:
+            with self._ml_lock:
+                if self._ml_model is None:
+                    self._ml_model = joblib.load(self.models_dir / "rf_model.joblib")
+        return self._ml_model
+
+    def _load_compiled_forest(self) -> CompiledForest:
+        """The compiled forest, memory-mapped from rf_compiled/<fingerprint>/ when possible.
+
+        The first process to load a given model compiles it and writes the
+        arrays; every later process only maps them.
+        """
+        if not self.mmap_artifacts:
+            return CompiledForest.from_sklearn(self._get_ml_model(), self._ml_scaler)
+        cache_root = self.models_dir / "rf_compiled"
+        cache_dir = cache_root / self._ml_fingerprint
+        if not (cache_dir / "meta.json").exists():
+            forest = CompiledForest.from_sklearn(self._get_ml_model(), self._ml_scaler)
+            tmp_dir = cache_root / f".{self._ml_fingerprint}.{os.getpid()}.tmp"
+            try:
+                forest.save(tmp_dir)
+                os.rename(tmp_dir, cache_dir)
+            except OSError:
+                # Read-only models dir, or another worker got there first.
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                if not (cache_dir / "meta.json").exists():
+                    return forest
+            for stale in cache_root.iterdir():
+                if stale.name != cache_dir.name and not stale.name.startswith("."):
+                    shutil.rmtree(stale, ignore_errors=True)
+        return CompiledForest.load(cache_dir)
+
     def _ensure_dl_loaded(self) -> None:
         if self._dl_loaded:
             return
+        with self._dl_lock:
+            if not self._dl_loaded:
+                self._load_dl()
 
+    def _load_dl(self) -> None:
         scaler_path = self.models_dir / "scaler.joblib"
         label_map_path = self.models_dir / "label_map.json"
         background_path = self.models_dir / "background.npy"
+        numpy_path = self.models_dir / "dl_weights.npz"
         keras_path = self.models_dir / "dl_model.keras"
         tflite_path = self.models_dir / "dl_model.tflite"
 
-        # Try full Keras first, then TFLite fallback
-        if keras is not None and keras_path.exists():
+        # Prefer the NumPy export (no TensorFlow needed), then full Keras, then TFLite.
+        if numpy_path.exists():
+            if not label_map_path.exists():
+                raise ModelArtifactsNotFound(
+                    "DL artifacts not found. Run: python backend/ml/train_dl.py"
+                )
+            # The scaler is folded into the first layer, so no scaler.joblib here.
+            self._dl_model = DenseNetwork.from_npz(numpy_path)
+            self._dl_backend = "numpy"
+        elif keras_path.exists() and _optional("keras") is not None:
             if not scaler_path.exists() or not label_map_path.exists():
                 raise ModelArtifactsNotFound(
                     "DL artifacts not found. Run: python backend/ml/train_dl.py"
                 )
-            self._dl_model = keras.models.load_model(keras_path)
-            self._dl_use_tflite = False
-        elif tflite is not None and tflite_path.exists():
+            self._dl_model = _optional("keras").models.load_model(keras_path)
+            self._dl_backend = "keras"
+        elif tflite_path.exists() and _optional("tflite") is not None:
             if not scaler_path.exists() or not label_map_path.exists():
                 raise ModelArtifactsNotFound(
                     "DL artifacts not found. Run: python backend/ml/train_dl.py"
                 )
-            interpreter = tflite.Interpreter(model_path=str(tflite_path))
-            interpreter.allocate_tensors()
-            self._dl_model = interpreter
-            self._dl_use_tflite = True
+            self._dl_model = InterpreterPool(
+                lambda: _optional("tflite").Interpreter(model_path=str(tflite_path)),
+                size=int(os.getenv("TFLITE_POOL_SIZE", "4")),
+            )
+            self._dl_backend = "tflite"
         else:
             raise ModelArtifactsNotFound(
-                "DL model not found. Ensure dl_model.keras or dl_model.tflite exists."
+                "DL model not found. Ensure dl_weights.npz, dl_model.keras or dl_model.tflite exists."
             )
 
-        self._dl_scaler = joblib.load(scaler_path)
+        self._dl_scaler = joblib.load(scaler_path) if self._dl_backend != "numpy" else None
         self._dl_label_map = self._load_label_map(label_map_path)
-        self._dl_background = self._load_background(background_path)
+        self._dl_background = self._dl_from_scaled(self._load_background(background_path))
         self._dl_accuracy = self._load_accuracy(self.models_dir / "dl_metrics.json")
-        self._dl_loaded = True
-
-    def _vectorize(self, payload: Dict[str, float | int]) -> np.ndarray:
-        return np.array([[float(payload[f]) for f in FEATURES]], dtype=np.float32)
-
-    def predict(self, payload: Dict[str, float | int], *, model_type: ModelType = "ml") -> PredictionResult:
-        if model_type == "ml":
-            self._ensure_ml_loaded()
-            return self._predict_ml(payload)
-        if model_type == "dl":
-            self._ensure_dl_loaded()
-            return self._predict_dl(payload)
-        raise ValueError(f"Unsupported model_type: {model_type}")
-
-    def _predict_ml(self, payload: Dict[str, float | int]) -> PredictionResult:
-        x = self._vectorize(payload)
-        x_scaled = self._ml_scaler.transform(x)
-
-        proba = self._ml_model.predict_proba(x_scaled)[0]
-        class_idx = int(np.argmax(proba))
-        confidence = float(proba[class_idx])
-        prediction = self._ml_label_map[class_idx]
-
-        contribs = self._explain_ml(x_scaled)
-        return PredictionResult(
-            prediction=prediction,
-            confidence=confidence,
-            model_used="Random Forest",
-            contributions=contribs,
-            model_accuracy=self._ml_accuracy,
-        )
-
-    def _predict_dl(self, payload: Dict[str, float | int]) -> PredictionResult:
-        x = self._vectorize(payload)
-        x_scaled = self._dl_scaler.transform(x)
-
-        if self._dl_use_tflite:
-            interpreter = self._dl_model
-            input_details = interpreter.get_input_details()
-            output_details = interpreter.get_output_details()
-            interpreter.set_tensor(input_details[0]["index"], x_scaled.astype(np.float32))
-            interpreter.invoke()
-            proba = interpreter.get_tensor(output_details[0]["index"])[0]
-        else:
-            proba = self._dl_model.predict(x_scaled, verbose=0)[0]
-
-        class_idx = int(np.argmax(proba))
-        confidence = float(proba[class_idx])
-        prediction = self._dl_label_map[class_idx]
-
-        contribs = self._explain_dl(x_scaled)
-        return PredictionResult(
-            prediction=prediction,
-            confidence=confidence,
-            model_used="Neural Network",
-            contributions=contribs,
-            model_accuracy=self._dl_accuracy,
+        self._dl_network = self._build_dl_network()
+        self._dl_baseline = self._build_dl_baseline()
+        self._dl_explainer = self._build_dl_explainer()
+        model_path = {"numpy": numpy_path, "keras": keras_path, "tflite": tflite_path}[self._dl_backend]
+        self._dl_fingerprint = _artifact_fingerprint(
+            [model_path, scaler_path, label_map_path, background_path, self.models_dir / "dl_metrics.json"]
         )
+        self._dl_loaded = True
 
-    def _explain_ml(self, x_scaled: np.ndarray) -> Dict[str, float]:
+    def reload(self, model_type: ModelType | None = None) -> None:
+        """Drop loaded artifacts, their explainers and cached results so the next call reloads them."""
+        self.cache.clear()
+        if model_type in (None, "ml"):
+            self._ml_loaded = False
+            self._ml_model = None
+            self._ml_forest = None
+            self._ml_explainer = None
+            self._ml_explainer_built = False
+        if model_type in (None, "dl"):
+            self._dl_loaded = False
+            self._dl_model = None
+            self._dl_explainer = None
+            self._dl_network = None
+
+    def _build_ml_explainer(self):
+        shap = _optional("shap")
         if shap is None:
-            return {f: 0.0 for f in FEATURES}
+            return None
+        try:
+            return shap.TreeExplainer(self._get_ml_model())
+        except Exception:
+            return None
 
+    def _dl_from_scaled(self, x_scaled: np.ndarray | None) -> np.ndarray | None:
+        # Reference data is stored scaled; the NumPy backend takes raw features.
+        if x_scaled is None or self._dl_backend != "numpy":
+            return x_scaled
+        return self._dl_model.from_scaled(x_scaled)
+
+    def _build_dl_network(self) -> DenseNetwork | None:
+        if self._dl_backend == "numpy":
+            return self._dl_model
         try:
-            explainer = shap.TreeExplainer(self._ml_model)
-            shap_vals = explainer.shap_values(x_scaled)
-            # shap_vals can be list (per class) or array
-            if isinstance(shap_vals, list):
-                proba = self._ml_model.predict_proba(x_scaled)[0]
-                class_idx = int(np.argmax(proba))
-                vals = shap_vals[class_idx][0]
+            if self._dl_backend == "tflite":
+                with self._dl_model.acquire() as slot:
+                    network = DenseNetwork.from_tflite(slot.interpreter)
             else:
-                vals = shap_vals[0]
-            return {FEATURES[i]: float(vals[i]) for i in range(len(FEATURES))}
+                network = DenseNetwork.from_keras(self._dl_model)
+            # Only trust the NumPy copy if it reproduces the real model.
+            probe = np.zeros((1, len(FEATURES)), dtype=np.float32)
+            if self._dl_background is not None:
+                probe = self._dl_background.reshape(-1, len(FEATURES))[:8].astype(np.float32)
+            if not np.allclose(network.predict(probe), self._forward_dl(probe), atol=1e-4):
+                return None
+            return network
         except Exception:
-            return {f: 0.0 for f in FEATURES}
+            return None
 
-    def _explain_dl(self, x_scaled: np.ndarray) -> Dict[str, float]:
-        if shap is None or self._dl_background is None:
-            return {f: 0.0 for f in FEATURES}
+    def _build_dl_baseline(self) -> np.ndarray:
+        # Zero in scaled space is the training mean, a sensible default reference.
+        if self._dl_background is None:
+            return self._dl_from_scaled(np.zeros(len(FEATURES), dtype=np.float64))
+        return self._dl_background.reshape(-1, len(FEATURES)).mean(axis=0)
 
+    def _build_dl_explainer(self):
+        if self.dl_explainer == "gradient" and self._dl_network is not None:
+            return None
+        shap = _optional("shap")
+        if shap is None or self._dl_background is None:
+            return None
         try:
             # KernelExplainer is slow; keep it bounded.
             background = self._dl_background
             if background.ndim == 1:
                 background = background.reshape(1, -1)
-            background = background[:50]
+            return shap.KernelExplainer(self._forward_dl, background[:50])
+        except Exception:
+            return None
 
-            def f(inp: np.ndarray) -> np.ndarray:
-                return self._dl_model.predict(inp, verbose=0)
+    def predict(
+        self,
+        payload: Dict[str, float | int],
+        *,
+        model_type: ModelType = "ml",
+        explain: bool = True,
+        early_exit: EarlyExit = "off",
+    ) -> PredictionResult:
+        return self.predict_batch([payload], model_type=model_type, explain=explain, early_exit=early_exit)[0]
+
+    def predict_batch(
+        self,
+        payloads: List[Dict[str, float | int]],
+        *,
+        model_type: ModelType = "ml",
+        explain: bool = True,
+        early_exit: EarlyExit = "off",
+    ) -> List[PredictionResult]:
+        """Score several students with a single pass over an N x 24 matrix.
+
+        With ``explain=False`` the SHAP step is skipped and ``contributions``
+        is left empty; use :meth:`explain` to compute it later. *early_exit*
+        only applies to the Random Forest (see ``EarlyExit``).
+
+        Rows already in ``self.cache`` skip the model and explainer entirely.
+        """
+        if not payloads:
+            return []
+        return self.predict_matrix(
+            vectorize(payloads), model_type=model_type, explain=explain, early_exit=early_exit
+        )
 
-            explainer = shap.KernelExplainer(f, background)
-            shap_vals = explainer.shap_values(x_scaled, nsamples=100)
-            if isinstance(shap_vals, list):
-                proba = self._dl_model.predict(x_scaled, verbose=0)[0]
-                class_idx = int(np.argmax(proba))
-                vals = shap_vals[class_idx][0]
+    def predict_matrix(
+        self,
+        x: np.ndarray,
+        *,
+        model_type: ModelType = "ml",
+        explain: bool = True,
+        early_exit: EarlyExit = "off",
+    ) -> List[PredictionResult]:
+        """:meth:`predict_batch` for an already vectorized N x 24 float32 matrix."""
+        if model_type not in ("ml", "dl"):
+            raise ValueError(f"Unsupported model_type: {model_type}")
+        if len(x) == 0:
+            return []
+        if model_type == "ml":
+            self._ensure_ml_loaded()
+            fingerprint = self._ml_fingerprint
+        else:
+            self._ensure_dl_loaded()
+            fingerprint = self._dl_fingerprint
+            early_exit = "off"
+
+        keys = [(model_type, fingerprint, explain, early_exit, row.tobytes()) for row in x]
+        results: List[PredictionResult | None] = [self.cache.get(key) for key in keys]
+        misses = [i for i, result in enumerate(results) if result is None]
+        if misses:
+            if model_type == "ml":
+                fresh = self._predict_ml(x[misses], explain=explain, early_exit=early_exit)
             else:
-                vals = shap_vals[0]
-            return {FEATURES[i]: float(vals[i]) for i in range(len(FEATURES))}
+                fresh = self._predict_dl(x[misses], explain=explain)
+            for i, result in zip(misses, fresh):
+                results[i] = result
+                self.cache.put(keys[i], result)
+        return results
+
+    def warm_up(
+        self,
+        model_types: Tuple[ModelType, ...] = ("ml", "dl"),
+        *,
+        explain: bool | None = None,
+    ) -> List[ModelType]:
+        """Load artifacts and run one prediction per model type.
+
+        Model types warm up concurrently, filling lazy caches before real
+        traffic arrives. Explainers are only built with *explain* (default:
+        ``PRELOAD_EXPLAINERS=1``), since the ML one loads the full sklearn
+        forest. Returns the model types that are ready; ones without
+        artifacts are skipped.
+        """
+        explain = self.preload_explainers if explain is None else explain
+        probe = vectorize([{f: 0.0 for f in FEATURES}])
+
+        def warm(model_type: ModelType) -> bool:
+            try:
+                self.predict_matrix(probe, model_type=model_type, explain=explain)
+            except ModelArtifactsNotFound:
+                return False
+            return True
+
+        with ThreadPoolExecutor(max_workers=max(1, len(model_types))) as executor:
+            loaded = list(executor.map(warm, model_types))
+        return [t for t, ok in zip(model_types, loaded) if ok]
+
+    def explain(self, payload: Dict[str, float | int], *, model_type: ModelType = "ml") -> Dict[str, float]:
+        return self.predict(payload, model_type=model_type, explain=True).contributions
+
+    def _predict_ml(
+        self,
+        x: np.ndarray,
+        *,
+        explain: bool = True,
+        early_exit: EarlyExit = "off",
+    ) -> List[PredictionResult]:
+        # The compiled forest has the scaler folded into its thresholds.
+        trees_used = np.full(len(x), self._ml_forest.n_trees)
+        if early_exit != "off":
+            proba, trees_used = self._ml_forest.predict_proba_early(
+                x,
+                chunk=self.early_exit_chunk,
+                min_confidence=(self.early_exit_confidence if early_exit == "bound" else None),
+            )
+        elif len(x) <= COMPILED_FOREST_MAX_ROWS:
+            proba = self._ml_forest.predict_proba(x)
+        else:
+            proba = self._get_ml_model().predict_proba(self._ml_scaler.transform(x))
+        class_idx = np.argmax(proba, axis=1)
+
+        if explain:
+            contribs = self._explain_ml(self._ml_scaler.transform(x), class_idx)
+        else:
+            contribs = [{} for _ in class_idx]
+        return [
+            PredictionResult(
+                prediction=self._ml_label_map[int(c)],
+                confidence=float(proba[i, c]),
+                model_used="Random Forest",
+                contributions=contribs[i],
+                model_accuracy=self._ml_accuracy,
+                trees_used=int(trees_used[i]),
+                model_version=self.version,
+            )
+            for i, c in enumerate(class_idx)
+        ]
+
+    def _forward_dl(self, x_scaled: np.ndarray) -> np.ndarray:
+        if self._dl_backend == "numpy":
+            return self._dl_model.predict(x_scaled)
+        x_scaled = x_scaled.astype(np.float32)
+        if self._dl_backend == "keras":
+            return self._dl_model.predict(x_scaled, verbose=0)
+
+        return self._dl_model.predict(x_scaled)
+
+    def _predict_dl(self, x: np.ndarray, *, explain: bool = True) -> List[PredictionResult]:
+        # The NumPy backend has the scaler folded in and takes raw features.
+        x_in = x if self._dl_backend == "numpy" else self._dl_scaler.transform(x)
+
+        proba = self._forward_dl(x_in)
+        class_idx = np.argmax(proba, axis=1)
+
+        contribs = self._explain_dl(x_in, class_idx) if explain else [{} for _ in class_idx]
+        return [
+            PredictionResult(
+                prediction=self._dl_label_map[int(c)],
+                confidence=float(proba[i, c]),
+                model_used="Neural Network",
+                contributions=contribs[i],
+                model_accuracy=self._dl_accuracy,
+                model_version=self.version,
+            )
+            for i, c in enumerate(class_idx)
+        ]
+
+    def _explain_ml(self, x_scaled: np.ndarray, class_idx: np.ndarray) -> List[Dict[str, float]]:
+        if not self._ml_explainer_built:
+            with self._ml_lock:
+                if not self._ml_explainer_built:
+                    self._ml_explainer = self._build_ml_explainer()
+                    self._ml_explainer_built = True
+        if self._ml_explainer is None:
+            return [{f: 0.0 for f in FEATURES} for _ in range(len(x_scaled))]
+
+        try:
+            shap_vals = self._ml_explainer.shap_values(x_scaled)
+            return [_contributions(vals) for vals in _class_shap_values(shap_vals, class_idx)]
+        except Exception:
+            return [{f: 0.0 for f in FEATURES} for _ in range(len(x_scaled))]
+
+    def _explain_dl(self, x_scaled: np.ndarray, class_idx: np.ndarray) -> List[Dict[str, float]]:
+        if self.dl_explainer == "gradient" and self._dl_network is not None:
+            vals = self._dl_network.integrated_gradients(x_scaled, self._dl_baseline, class_idx)
+            return [_contributions(v) for v in vals]
+
+        if self._dl_explainer is None:
+            return [{f: 0.0 for f in FEATURES} for _ in range(len(x_scaled))]
+
+        try:
+            shap_vals = self._dl_explainer.shap_values(x_scaled, nsamples=100, silent=True)
+            return [_contributions(vals) for vals in _class_shap_values(shap_vals, class_idx)]
         except Exception:
-            return {f: 0.0 for f in FEATURES}
+            return [{f: 0.0 for f in FEATURES} for _ in range(len(x_scaled))]
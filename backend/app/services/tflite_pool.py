@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import queue
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+import numpy as np
+
+
+class _Slot:
+    """One allocated interpreter plus the tensor indices it was built with."""
+
+    def __init__(self, interpreter: Any):
+        interpreter.allocate_tensors()
+        input_details = interpreter.get_input_details()[0]
+        self.interpreter = interpreter
+        self.input_index = input_details["index"]
+        self.output_index = interpreter.get_output_details()[0]["index"]
+        self.rows = int(input_details["shape"][0])
+
+    def run(self, x: np.ndarray) -> np.ndarray:
+        # Reallocate only when the batch size changes.
+        if x.shape[0] != self.rows:
+            self.interpreter.resize_tensor_input(self.input_index, list(x.shape))
+            self.interpreter.allocate_tensors()
+            self.rows = x.shape[0]
+        self.interpreter.set_tensor(self.input_index, x)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self.output_index)
+
+
+class InterpreterPool:
+    """A fixed set of TFLite interpreters shared by request threads.
+
+    An interpreter is not safe under concurrent ``set_tensor``/``invoke``,
+    so each call checks one out for its whole run; callers block once all
+    *size* are busy. A whole N x 24 batch runs as one invocation.
+    """
+
+    def __init__(self, factory: Callable[[], Any], *, size: int = 4):
+        if size < 1:
+            raise ValueError("Interpreter pool size must be at least 1")
+        self.size = size
+        self._slots: queue.Queue[_Slot] = queue.Queue()
+        for _ in range(size):
+            self._slots.put(_Slot(factory()))
+
+    @contextmanager
+    def acquire(self) -> Iterator[_Slot]:
+        slot = self._slots.get()
+        try:
+            yield slot
+        finally:
+            self._slots.put(slot)
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        with self.acquire() as slot:
+            return slot.run(x)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Columnar CSV validation vs typed Parquet / Arrow IPC ingestion.
+
+Builds a class of N students as an Arrow table, writes it as CSV, Parquet
+and Arrow IPC, and times validate_and_parse_csv_columnar on the CSV against
+validate_and_parse_arrow on the other two (file read included), checking
+that all three return the same rows. Needs pyarrow.
+
+Usage: python benchmarks/bench_arrow.py [rows ...]  (from the backend directory)
+"""
+
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pcsv
+import pyarrow.parquet as pq
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.arrow_ingest import validate_and_parse_arrow  # noqa: E402
+from app.services.csv_columnar import validate_and_parse_csv_columnar  # noqa: E402
+
+DEPARTMENTS = np.array(["CSE", "IT", "ECE", "EEE", "ME", "CE"])
+
+
+def make_table(n: int, *, seed: int = 0) -> pa.Table:
+    rng = np.random.default_rng(seed)
+    taken = rng.integers(1, 9, n)
+    columns = {
+        "name": pa.array([f"Student {i}" for i in range(n)]),
+        "department": pa.array(DEPARTMENTS[rng.integers(0, len(DEPARTMENTS), n)]),
+    }
+    for sem in range(1, 9):
+        missing = taken < sem
+        columns[f"sem{sem}_internal"] = pa.array(rng.integers(100, 291, n), mask=missing)
+        columns[f"sem{sem}_university"] = pa.array(rng.integers(100, 291, n), mask=missing)
+        columns[f"sem{sem}_attendance"] = pa.array(np.round(rng.uniform(60, 100, n), 1), mask=missing)
+    return pa.table(columns)
+
+
+def _encode(table: pa.Table) -> dict:
+    csv_buffer, parquet_buffer, ipc_buffer = io.BytesIO(), io.BytesIO(), io.BytesIO()
+    pcsv.write_csv(table, csv_buffer)
+    pq.write_table(table, parquet_buffer)
+    with pa.ipc.new_file(ipc_buffer, table.schema) as writer:
+        writer.write_table(table)
+    return {"csv": csv_buffer.getvalue(), "parquet": parquet_buffer.getvalue(), "arrow": ipc_buffer.getvalue()}
+
+
+def _time(fn, *args) -> tuple[float, tuple]:
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    sizes = [int(a) for a in sys.argv[1:]] or [100_000, 1_000_000]
+    print(f"{'rows':>9} {'csv MB':>7} {'csv':>8} {'pq MB':>6} {'parquet':>8} {'ipc MB':>7} {'arrow':>8} {'speedup':>8}")
+    for n in sizes:
+        files = _encode(make_table(n))
+        t_csv, expected = _time(validate_and_parse_csv_columnar, files["csv"])
+        assert not expected[1], "generated data should be valid"
+        t_pq, actual = _time(validate_and_parse_arrow, files["parquet"], "parquet")
+        assert actual == expected, "Parquet ingestion disagrees with the CSV validator"
+        del actual
+        t_ipc, actual = _time(validate_and_parse_arrow, files["arrow"], "arrow")
+        assert actual == expected, "Arrow ingestion disagrees with the CSV validator"
+        del actual, expected
+        mb = {k: len(v) / 1e6 for k, v in files.items()}
+        print(
+            f"{n:>9} {mb['csv']:>7.1f} {t_csv:>7.2f}s {mb['parquet']:>6.1f} {t_pq:>7.2f}s"
+            f" {mb['arrow']:>7.1f} {t_ipc:>7.2f}s {t_csv / t_pq:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Throughput and latency of concurrent single-student predictions,
+calling the predictor directly versus through the micro-batcher, in
+process or on a pool of worker processes.
+
+Usage: python benchmarks/bench_batching.py [threads] [requests_per_thread] [workers]
+(from the backend directory)
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.batching import MicroBatcher  # noqa: E402
+from app.services.inference_pool import InferencePool  # noqa: E402
+from app.services.predictor import FEATURES, PredictorService  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _run(scorer, payloads, threads: int, per_thread: int) -> tuple[float, np.ndarray]:
+    latencies = [[] for _ in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(t: int) -> None:
+        barrier.wait()
+        for i in range(per_thread):
+            payload = payloads[(t * per_thread + i) % len(payloads)]
+            start = time.perf_counter()
+            scorer.predict_batch([payload], model_type="ml", explain=False)
+            latencies[t].append(time.perf_counter() - start)
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for t in pool:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return threads * per_thread / elapsed, np.concatenate([np.asarray(l) for l in latencies]) * 1000
+
+
+def main() -> None:
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    rows = pd.read_csv(ROOT / "data" / "student_data.csv")[FEATURES]
+    payloads = rows.to_dict(orient="records")
+
+    predictor = PredictorService()
+    predictor.cache.max_size = 0  # measure the model, not the cache
+    predictor.predict(payloads[0], model_type="ml", explain=False)
+
+    print(f"{threads} threads x {per_thread} requests")
+    print(f"{'mode':>18} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'mean batch':>11}")
+    qps, lat = _run(predictor, payloads, threads, per_thread)
+    print(f"{'direct':>18} {qps:>9.0f} {np.percentile(lat, 50):>8.2f} {np.percentile(lat, 99):>8.2f} {1:>11.1f}")
+    pools = [("", InferencePool(predictor, workers=0))]
+    if workers > 0:
+        pool = InferencePool(predictor, workers=workers, timeout=120)
+        for _ in range(workers * 4):  # start and warm every worker
+            pool.predict_batch(payloads[:1], model_type="ml", explain=False)
+        pools.append((f" x{workers}p", pool))
+    for suffix, pool in pools:
+        for window_ms in (1.0, 2.0, 5.0):
+            batcher = MicroBatcher(pool, window_ms=window_ms, max_batch=64)
+            qps, lat = _run(batcher, payloads, threads, per_thread)
+            mean_batch = batcher.stats()["mean_batch_size"]
+            label = f"batched {window_ms:g}ms{suffix}"
+            print(f"{label:>18} {qps:>9.0f} {np.percentile(lat, 50):>8.2f} {np.percentile(lat, 99):>8.2f} {mean_batch:>11.1f}")
+        pool.shutdown()
+
+if __name__ == "__main__":
+    main()
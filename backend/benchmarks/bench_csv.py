@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Row-by-row vs columnar vs chunked-parallel CSV validation.
+
+Generates uploads of N students (a few percent with errors) and times
+validate_and_parse_csv against validate_and_parse_csv_columnar and against
+ParallelCsvValidator with 1, 2 and 4 worker processes (CSV_BENCH_WORKERS
+to change), checking that all return the same rows and errors.
+
+Usage: python benchmarks/bench_csv.py [rows ...]  (from the backend directory)
+"""
+
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.csv_columnar import validate_and_parse_csv_columnar  # noqa: E402
+from app.services.csv_parallel import ParallelCsvValidator  # noqa: E402
+from app.services.csv_processor import EXPECTED_COLUMNS, validate_and_parse_csv  # noqa: E402
+
+DEPARTMENTS = ["CSE", "IT", "ECE", "EEE", "ME", "CE"]
+
+
+def make_csv(n: int, *, error_rate: float = 0.02, seed: int = 0) -> bytes:
+    rnd = random.Random(seed)
+    lines = [",".join(EXPECTED_COLUMNS)]
+    for i in range(n):
+        taken = rnd.randint(1, 8)
+        cells = [f"Student {i}", rnd.choice(DEPARTMENTS)]
+        for sem in range(1, 9):
+            if sem <= taken:
+                cells += [str(rnd.randint(100, 290)), str(rnd.randint(100, 290)), f"{rnd.uniform(60, 100):.1f}"]
+            else:
+                cells += ["", "", ""]
+        if rnd.random() < error_rate:
+            cells[rnd.choice([1, 2, 3, 4])] = rnd.choice(["XYZ", "350", "", "abc"])
+        lines.append(",".join(cells))
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _time(fn, content: bytes) -> tuple[float, tuple]:
+    start = time.perf_counter()
+    result = fn(content)
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    workers = [int(w) for w in os.getenv("CSV_BENCH_WORKERS", "1,2,4").split(",")]
+    validators = {w: ParallelCsvValidator(workers=w, chunk_bytes=1 << 20) for w in workers}
+    print(f"{os.cpu_count()} cores; parallel columns use 1 MB chunks")
+    header = f"{'rows':>9} {'row-by-row':>11} {'columnar':>9}" + "".join(f" {f'{w} workers':>10}" for w in workers)
+    print(header)
+    try:
+        for n in sizes:
+            content = make_csv(n)
+            t_rows, expected = _time(validate_and_parse_csv, content)
+            t_cols, actual = _time(validate_and_parse_csv_columnar, content)
+            assert actual == expected, "columnar validator disagrees with validate_and_parse_csv"
+            del actual
+            line = f"{n:>9} {t_rows:>10.2f}s {t_cols:>8.2f}s"
+            for w, validator in validators.items():
+                validator.warm_up()
+                t_par, actual = _time(validator.validate, content)
+                assert actual == expected, "parallel validator disagrees with validate_and_parse_csv"
+                del actual
+                line += f" {t_par:>9.2f}s"
+            print(line)
+    finally:
+        for validator in validators.values():
+            validator.shutdown()
+
+
+if __name__ == "__main__":
+    main()
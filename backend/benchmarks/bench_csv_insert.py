@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Insert phase of a CSV upload: one ORM object + refresh per row vs bulk RETURNING.
+
+Writes N validated rows into a scratch SQLite database both ways and
+reports the time each takes.
+
+Usage: python benchmarks/bench_csv_insert.py [rows ...]  (from the backend directory)
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.database.crud import create_csv_students_batch  # noqa: E402
+from app.database.db import Base  # noqa: E402
+from app.database.models import CsvStudent, Teacher  # noqa: E402
+from app.services.csv_columnar import validate_and_parse_csv_columnar  # noqa: E402
+from bench_csv import make_csv  # noqa: E402
+
+
+def _per_row(db, *, teacher_id: int, upload_batch: str, rows: list) -> list:
+    # The previous implementation: one ORM add per row, then a SELECT per row.
+    records = []
+    for row in rows:
+        record = CsvStudent(teacher_id=teacher_id, upload_batch=upload_batch, **row)
+        db.add(record)
+        records.append(record)
+    db.commit()
+    for r in records:
+        db.refresh(r)
+    return records
+
+
+def main() -> None:
+    sizes = [int(a) for a in sys.argv[1:]] or [1_000, 10_000, 50_000]
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        with Session() as db:
+            teacher = Teacher(email="bench@example.com", password_hash="x")
+            db.add(teacher)
+            db.commit()
+            teacher_id = teacher.id
+
+        print(f"{'rows':>7} {'per-row':>9} {'bulk':>8} {'speedup':>8}")
+        for n in sizes:
+            rows, errors = validate_and_parse_csv_columnar(make_csv(n, error_rate=0))
+            assert not errors
+            timings = []
+            for insert in (_per_row, create_csv_students_batch):
+                with Session() as db:
+                    start = time.perf_counter()
+                    records = insert(db, teacher_id=teacher_id, upload_batch=f"{insert.__name__}-{n}", rows=rows)
+                    timings.append(time.perf_counter() - start)
+                    assert len(records) == n
+            print(f"{n:>7} {timings[0]:>8.2f}s {timings[1]:>7.2f}s {timings[0] / timings[1]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Concurrent prediction inserts under the "default" and "production" DB profiles.
+
+For each profile and worker count, starts that many writer processes (like
+``uvicorn --workers``) that each store records through
+crud.create_prediction_record -- one commit per record, as /predict does --
+into a fresh SQLite file, next to one reader process polling
+list_prediction_records as GET /history does. Reports write throughput,
+commit latency percentiles, "database is locked" failures and reads served.
+
+Usage: python benchmarks/bench_db_contention.py [workers ...]  (from the backend directory)
+Records per writer: $DB_BENCH_RECORDS (default 200).
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.database import models  # noqa: E402,F401
+from app.database.crud import create_prediction_record, list_prediction_records  # noqa: E402
+from app.database.db import Base, create_db_engine  # noqa: E402
+from app.schemas import StudentInput  # noqa: E402
+
+PROFILES = ("default", "production")
+
+
+def _session(url: str, profile: str):
+    return sessionmaker(autocommit=False, autoflush=False, bind=create_db_engine(url, profile))()
+
+
+def _writer(url: str, profile: str, records: int, start, results) -> None:
+    student = StudentInput(
+        name="Bench",
+        department="CSE",
+        semesters=[{"semester": 1, "internal_marks": 200, "university_marks": 210, "attendance": 85}],
+    )
+    db = _session(url, profile)
+    latencies, failures = [], 0
+    start.wait()
+    began = time.perf_counter()
+    for _ in range(records):
+        t0 = time.perf_counter()
+        try:
+            create_prediction_record(db, student=student, prediction="Good", confidence=0.9, model_used="bench")
+            latencies.append(time.perf_counter() - t0)
+        except OperationalError:
+            db.rollback()
+            failures += 1
+    results.put(("writer", began, time.perf_counter(), latencies, failures))
+    db.close()
+
+
+def _reader(url: str, profile: str, start, stop, results) -> None:
+    db = _session(url, profile)
+    latencies = []
+    start.wait()
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        list_prediction_records(db, limit=50)
+        db.rollback()  # end the read transaction, as closing a request session does
+        latencies.append(time.perf_counter() - t0)
+    results.put(("reader", 0.0, 0.0, latencies, 0))
+    db.close()
+
+
+def run(profile: str, workers: int, records: int) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/bench.db"
+        Base.metadata.create_all(create_db_engine(url, profile))
+
+        start, stop, results = ctx.Barrier(workers + 2), ctx.Event(), ctx.Queue()
+        procs = [ctx.Process(target=_writer, args=(url, profile, records, start, results)) for _ in range(workers)]
+        procs.append(ctx.Process(target=_reader, args=(url, profile, start, stop, results)))
+        for p in procs:
+            p.start()
+        start.wait()
+
+        writes = [results.get() for _ in range(workers)]
+        stop.set()
+        reads = results.get()
+        for p in procs:
+            p.join()
+
+    commits = np.array([lat for w in writes for lat in w[3]])
+    elapsed = max(w[2] for w in writes) - min(w[1] for w in writes)
+    return {
+        "writes_per_s": len(commits) / elapsed,
+        "p50_ms": float(np.percentile(commits, 50)) * 1000 if len(commits) else float("nan"),
+        "p99_ms": float(np.percentile(commits, 99)) * 1000 if len(commits) else float("nan"),
+        "failures": sum(w[4] for w in writes),
+        "reads": len(reads[3]),
+        "read_p99_ms": float(np.percentile(reads[3], 99)) * 1000 if reads[3] else float("nan"),
+    }
+
+
+def main() -> None:
+    worker_counts = [int(a) for a in sys.argv[1:]] or [1, 4, 8]
+    records = int(os.getenv("DB_BENCH_RECORDS", "200"))
+    print(f"{os.cpu_count()} cores, {records} records per writer, 1 reader")
+    print(
+        f"{'profile':>10} {'writers':>7} {'writes/s':>9} {'p50 ms':>7} {'p99 ms':>7}"
+        f" {'locked':>6} {'reads':>6} {'read p99':>8}"
+    )
+    for workers in worker_counts:
+        for profile in PROFILES:
+            r = run(profile, workers, records)
+            print(
+                f"{profile:>10} {workers:>7} {r['writes_per_s']:>9.0f} {r['p50_ms']:>7.1f} {r['p99_ms']:>7.1f}"
+                f" {r['failures']:>6} {r['reads']:>6} {r['read_p99_ms']:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
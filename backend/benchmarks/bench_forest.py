@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Compare sklearn's predict_proba with the compiled forest evaluator,
+with and without early-exit voting.
+
+Usage: python benchmarks/bench_forest.py  (from the backend directory)
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.forest import CompiledForest  # noqa: E402
+from app.services.predictor import FEATURES  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _time(fn, repeat: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    model = joblib.load(ROOT / "ml" / "models" / "rf_model.joblib")
+    scaler = joblib.load(ROOT / "ml" / "models" / "scaler.joblib")
+    X = pd.read_csv(ROOT / "data" / "student_data.csv")[FEATURES].to_numpy(dtype=np.float32)
+
+    start = time.perf_counter()
+    forest = CompiledForest.from_sklearn(model, scaler)
+    print(f"compile: {(time.perf_counter() - start) * 1000:.1f} ms, {len(forest.feature)} nodes, depth {forest.max_depth}")
+
+    print(f"{'rows':>6} {'sklearn ms':>12} {'compiled ms':>12} {'speedup':>8} {'max |diff|':>11}")
+    for n in (1, 60, 250, 1000):
+        x = X[:n]
+        diff = np.abs(model.predict_proba(scaler.transform(x)) - forest.predict_proba(x)).max()
+        repeat = 20 if n < 1000 else 5
+        t_sklearn = _time(lambda: model.predict_proba(scaler.transform(x)), repeat)
+        t_compiled = _time(lambda: forest.predict_proba(x), repeat)
+        print(f"{n:>6} {t_sklearn * 1000:>12.3f} {t_compiled * 1000:>12.3f} {t_sklearn / t_compiled:>7.1f}x {diff:>11.2e}")
+
+    full = forest.predict_proba(X).argmax(axis=1)
+    print(f"\n{'rows':>6} {'mode':>6} {'ms':>9} {'mean trees':>11} {'label changes':>14}")
+    for n in (1, 60, 250):
+        x = X[:n]
+        for mode, bound in (("safe", None), ("bound", 0.9)):
+            proba, used = forest.predict_proba_early(x, min_confidence=bound)
+            changed = int((proba.argmax(axis=1) != full[:n]).sum())
+            t = _time(lambda: forest.predict_proba_early(x, min_confidence=bound), 20)
+            print(f"{n:>6} {mode:>6} {t * 1000:>9.3f} {used.mean():>11.1f} {changed:>14}")
+
+
+if __name__ == "__main__":
+    main()
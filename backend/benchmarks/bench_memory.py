@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Per-worker memory with and without memory-mapped model artifacts.
+
+Starts N worker processes that each load the Random Forest and score one
+student (no SHAP, the default for most traffic), then reports how much of
+the model load each worker holds privately versus shares with the others.
+
+Usage: python benchmarks/bench_memory.py [workers]  (from the backend directory)
+"""
+
+import multiprocessing as mp
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _worker(mmap: str, explain: bool, results, done) -> None:
+    os.environ["MODEL_MMAP"] = mmap
+    sys.path.insert(0, str(ROOT))
+    import pandas as pd
+
+    from app.services.memory import memory_report
+    from app.services.predictor import FEATURES, PredictorService
+
+    payload = pd.read_csv(ROOT / "data" / "student_data.csv")[FEATURES].iloc[0].to_dict()
+    before = memory_report()
+    PredictorService().predict(payload, model_type="ml", explain=explain)
+    after = memory_report()
+    results.put((before, after))
+    done.wait()
+
+
+def _measure(workers: int, mmap: str, explain: bool) -> list:
+    ctx = mp.get_context("spawn")
+    results, done = ctx.Queue(), ctx.Event()
+    procs = [ctx.Process(target=_worker, args=(mmap, explain, results, done)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    reports = [results.get() for _ in procs]
+    done.set()
+    for p in procs:
+        p.join()
+    return reports
+
+
+def main() -> None:
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    from app.services.predictor import PredictorService
+
+    # Make sure the compiled forest cache exists before workers race for it.
+    os.environ["MODEL_MMAP"] = "1"
+    PredictorService()._ensure_ml_loaded()
+
+    print(f"{workers} workers; model load cost per worker (kB, after - before)")
+    print(f"{'mode':>16} {'unique':>9} {'shared':>9} {'pss':>9} {'total pss':>10}")
+    for label, mmap, explain in (
+        ("joblib", "0", False),
+        ("mmap", "1", False),
+        ("joblib+shap", "0", True),
+        ("mmap+shap", "1", True),
+    ):
+        reports = _measure(workers, mmap, explain)
+        unique = sum(a["unique_kb"] - b["unique_kb"] for b, a in reports) / workers
+        shared = sum(a["shared_kb"] - b["shared_kb"] for b, a in reports) / workers
+        pss = [a["pss_kb"] - b["pss_kb"] for b, a in reports]
+        print(f"{label:>16} {unique:>9.0f} {shared:>9.0f} {sum(pss) / workers:>9.0f} {sum(pss):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Fail when a cold ``import app.main`` exceeds the start-up budget.
+
+Imports the app in fresh interpreters (``-X importtime``), keeps the fastest
+run, prints the slowest top-level imports and exits 1 if the wall time is
+over budget or if a heavy optional dependency was imported eagerly.
+
+Usage: python benchmarks/check_import_budget.py [budget_ms] [runs]  (from the backend directory)
+The budget defaults to $IMPORT_BUDGET_MS or 1500.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Only the code paths that use these should pay for them.
+LAZY_MODULES = ("shap", "tensorflow", "keras", "tflite_runtime", "fastapi_mail", "pyarrow")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({"ms": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+
+def _run_once() -> tuple[dict, list]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    imports = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Top-level and direct children of the root import only.
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= 1 and cumulative.strip().isdigit():
+            imports.append((int(cumulative) / 1000, name.strip()))
+    return result, imports
+
+
+def main() -> int:
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    best, best_imports = None, []
+    for _ in range(runs):
+        result, imports = _run_once()
+        if best is None or result["ms"] < best["ms"]:
+            best, best_imports = result, imports
+
+    print(f"import app.main: {best['ms']:.0f} ms (best of {runs}, budget {budget:.0f} ms)")
+    print("slowest imports (cumulative ms):")
+    for ms, name in sorted(best_imports, reverse=True)[:10]:
+        print(f"  {ms:8.1f}  {name}")
+
+    failed = False
+    if best["loaded"]:
+        print(f"FAIL: imported eagerly: {', '.join(best['loaded'])}")
+        failed = True
+    if best["ms"] > budget:
+        print(f"FAIL: over budget by {best['ms'] - budget:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
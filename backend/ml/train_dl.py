@@ -17,9 +17,32 @@ except Exception:  # pragma: no cover
     keras = None
 
 
+def export_numpy_weights(model, scaler: StandardScaler, path: Path) -> None:
+    """Write the dense layers and scaler to a compact .npz for the NumPy backend."""
+    arrays = {}
+    activations = []
+    for layer in model.layers:
+        weights = layer.get_weights()
+        if not weights:
+            continue
+        i = len(activations)
+        arrays[f"kernel_{i}"] = weights[0].astype(np.float32)
+        arrays[f"bias_{i}"] = weights[1].astype(np.float32)
+        activations.append(layer.get_config().get("activation", "linear"))
+    arrays["activations"] = np.array(activations)
+    arrays["scaler_mean"] = scaler.mean_.astype(np.float64)
+    arrays["scaler_scale"] = scaler.scale_.astype(np.float64)
+    np.savez(path, **arrays)
+
+
 def main() -> None:
     out_dir = Path(__file__).resolve().parent / "models"
     if (out_dir / "dl_model.keras").exists():
+        if not (out_dir / "dl_weights.npz").exists() and keras is not None:
+            model = keras.models.load_model(out_dir / "dl_model.keras")
+            scaler = joblib.load(out_dir / "scaler.joblib")
+            export_numpy_weights(model, scaler, out_dir / "dl_weights.npz")
+            print(f"Exported NumPy weights to: {out_dir / 'dl_weights.npz'}")
         print("DL model artifacts already exist — skipping training.")
         return
 
@@ -84,6 +107,7 @@ def main() -> None:
     (out_dir / "dl_model.tflite").write_bytes(tflite_model)
 
     joblib.dump(scaler, out_dir / "scaler.joblib")
+    export_numpy_weights(model, scaler, out_dir / "dl_weights.npz")
 
     with (out_dir / "label_map.json").open("w", encoding="utf-8") as f:
         json.dump(int_to_label_map(), f)
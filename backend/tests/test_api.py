@@ -1,6 +1,7 @@
+import pytest
 from fastapi.testclient import TestClient
 
-from app.main import app
+from app.main import RULES_FAST_PATH_CONFIDENCE, app
 
 
 client = TestClient(app)
@@ -18,16 +19,30 @@ def test_health():
     assert response.json()["status"] == "healthy"
 
 
+def test_ready_turns_200_once_models_are_warm():
+    import time
+
+    with TestClient(app) as c:
+        deadline = time.monotonic() + 120
+        response = c.get("/ready")
+        while response.status_code == 503 and response.json()["status"] == "starting":
+            assert time.monotonic() < deadline
+            time.sleep(0.1)
+            response = c.get("/ready")
+    assert response.status_code == 200
+    assert set(response.json()["models"]) <= {"ml", "dl"}
+
+
 def test_predict_valid_input_ml_missing_models():
-    response = client.post(
-        "/predict?model_type=ml",
-        json={
-            "name": "Alice",
-            "internal_marks": 75,
-            "previous_marks": 80,
-            "attendance": 85,
-        },
-    )
+    from app.auth import ADMIN_ID, create_access_token
+
+    token = create_access_token(role="admin", subject_id=ADMIN_ID)
+    with TestClient(app) as c:
+        response = c.post(
+            "/predict?model_type=ml",
+            json=_student("Alice", 200, 210, 85),
+            headers={"Authorization": f"Bearer {token}"},
+        )
     # If artifacts are missing, API returns 400 with a clear message
     assert response.status_code in (200, 400)
     if response.status_code == 200:
@@ -38,3 +53,607 @@ def test_predict_valid_input_ml_missing_models():
         assert "feature_contributions" in data
 
 
+
+
+def _student(name: str, internal: int, university: int, attendance: float) -> dict:
+    return {
+        "name": name,
+        "department": "CSE",
+        "semesters": [
+            {"semester": 1, "internal_marks": internal, "university_marks": university, "attendance": attendance},
+            {"semester": 2, "internal_marks": internal, "university_marks": university + 5, "attendance": attendance},
+        ],
+    }
+
+
+def test_predict_batch_returns_one_output_per_student():
+    from app.auth import ADMIN_ID, create_access_token
+
+    token = create_access_token(role="admin", subject_id=ADMIN_ID)
+    with TestClient(app) as c:
+        response = c.post(
+            "/predict/batch?model_type=ml",
+            json={"students": [_student("Alice", 200, 210, 85), _student("Bob", 150, 140, 70)]},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 2
+    assert len({d["record_id"] for d in data}) == 2
+    for d in data:
+        assert d["prediction"] in ["Good", "Average", "Needs Attention"]
+        assert 0 <= d["confidence"] <= 1
+
+
+def test_deferred_explanation_is_computed_once_and_persisted():
+    from app.auth import ADMIN_ID, create_access_token
+
+    headers = {"Authorization": f"Bearer {create_access_token(role='admin', subject_id=ADMIN_ID)}"}
+    with TestClient(app) as c:
+        response = c.post(
+            "/predict?model_type=ml&explain=deferred",
+            json=_student("Carol", 180, 190, 80),
+            headers=headers,
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["feature_contributions"] == []
+        assert data["explanation_url"] == f"/records/{data['record_id']}/explanation"
+
+        first = c.get(data["explanation_url"], headers=headers)
+        assert first.status_code == 200
+        assert len(first.json()["feature_contributions"]) == 24
+
+        second = c.get(data["explanation_url"], headers=headers)
+        assert second.json() == first.json()
+
+
+def test_auto_model_type_skips_the_model_for_clear_cut_students():
+    from app.auth import ADMIN_ID, create_access_token
+
+    headers = {"Authorization": f"Bearer {create_access_token(role='admin', subject_id=ADMIN_ID)}"}
+    with TestClient(app) as c:
+        response = c.post(
+            "/predict?model_type=auto&explain=deferred",
+            json=_student("Dana", 280, 285, 95),
+            headers=headers,
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["prediction"] == "Good"
+        assert data["model_used"] == "Rules (fast path)"
+        assert data["confidence"] == RULES_FAST_PATH_CONFIDENCE
+        assert data["explanation_url"] is None
+
+        explanation = c.get(f"/records/{data['record_id']}/explanation", headers=headers)
+        assert explanation.status_code == 200
+        assert explanation.json()["feature_contributions"] == []
+
+        response = c.post(
+            "/predict/batch?model_type=auto",
+            json={"students": [_student("Dana", 280, 285, 95), _student("Bob", 150, 140, 70)]},
+            headers=headers,
+        )
+    assert response.status_code == 200
+    used = [d["model_used"] for d in response.json()]
+    assert used[0] == "Rules (fast path)"
+    assert used[1].startswith("Random Forest")
+
+
+def test_admin_stats_reports_prediction_cache():
+    from app.auth import ADMIN_ID, create_access_token
+
+    headers = {"Authorization": f"Bearer {create_access_token(role='admin', subject_id=ADMIN_ID)}"}
+    assert client.get("/admin/stats").status_code == 401
+    response = client.get("/admin/stats", headers=headers)
+    assert response.status_code == 200
+    assert {"hits", "misses", "size"} <= set(response.json()["prediction_cache"])
+    assert set(response.json()["memory"]) == {"api_process", "inference_workers"}
+
+
+def test_activating_a_model_version_swaps_it_in_and_records_it(tmp_path, monkeypatch):
+    import app.main as main
+    from app.auth import ADMIN_ID, create_access_token
+    from app.services.model_registry import ModelRegistry
+
+    source = main.inference_pool.predictor.models_dir
+    if not (source / "rf_model.joblib").exists():
+        pytest.skip(f"No model artifacts in {source}")
+    registry = ModelRegistry(tmp_path / "versions")
+    registry.publish(source, "v2")
+    monkeypatch.setattr(main, "registry", registry)
+    previous = main.inference_pool.predictor
+
+    headers = {"Authorization": f"Bearer {create_access_token(role='admin', subject_id=ADMIN_ID)}"}
+    try:
+        with TestClient(app) as c:
+            assert c.post("/admin/models/missing/activate", headers=headers).status_code == 404
+            response = c.post(
+                "/predict?model_type=ml&explain=deferred", json=_student("Dan", 180, 190, 80), headers=headers
+            )
+            assert response.status_code == 200
+            explanation_url = response.json()["explanation_url"]
+
+            response = c.post("/admin/models/v2/activate", headers=headers)
+            assert response.status_code == 202
+            models = c.get("/admin/models", headers=headers).json()
+            assert models["active"] == "v2"
+            assert models["activation"]["status"] == "active"
+            assert registry.active_version() == "v2"
+
+            response = c.post("/predict?model_type=ml&explain=none", json=_student("Eve", 180, 190, 80), headers=headers)
+            assert response.status_code == 200
+            assert response.json()["model_version"] == "v2"
+            history = c.get("/history?limit=1", headers=headers).json()
+            assert history[0]["model_version"] == "v2"
+
+            # The model that made the earlier prediction is no longer loaded.
+            assert c.get(explanation_url, headers=headers).status_code == 409
+    finally:
+        main.inference_pool.swap(previous)
+
+
+def _teacher_headers() -> dict:
+    import uuid
+
+    from app.auth import create_access_token, hash_password
+    from app.database.db import SessionLocal, init_db
+    from app.database.models import Teacher
+
+    init_db()
+    with SessionLocal() as db:
+        teacher = Teacher(email=f"{uuid.uuid4().hex}@example.com", password_hash=hash_password("secret123"), name="T")
+        db.add(teacher)
+        db.commit()
+        teacher_id = teacher.id
+    return {"Authorization": f"Bearer {create_access_token(role='teacher', subject_id=teacher_id)}"}
+
+
+def test_streaming_csv_upload_commits_all_rows_or_none():
+    from app.services.csv_processor import EXPECTED_COLUMNS
+
+    headers = _teacher_headers()
+    header = ",".join(EXPECTED_COLUMNS)
+    good = "\n".join(f"Student {i},CSE,200,210,85" + "," * 21 for i in range(1200))
+
+    response = client.post(
+        "/csv/upload?mode=stream",
+        files={"file": ("students.csv", f"{header}\n{good}\n", "text/csv")},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["count"] == 1200
+
+    bad = good + "\nBroken,XYZ,1,2,3" + "," * 21
+    response = client.post(
+        "/csv/upload?mode=stream",
+        files={"file": ("students.csv", f"{header}\n{bad}\n", "text/csv")},
+        headers=headers,
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"]["errors"][0]["row"] == 1202
+
+    students = client.get("/csv/students", headers=headers).json()
+    assert len(students) == 1200
+
+
+def test_parallel_csv_upload_reports_file_row_numbers(monkeypatch):
+    import app.main as main
+    from app.services.csv_parallel import ParallelCsvValidator
+    from app.services.csv_processor import EXPECTED_COLUMNS
+
+    monkeypatch.setattr(main, "csv_validator", ParallelCsvValidator(workers=0, chunk_bytes=256))
+    headers = _teacher_headers()
+    header = ",".join(EXPECTED_COLUMNS)
+    rows = [f"Student {i},CSE,200,210,85" + "," * 21 for i in range(40)]
+
+    response = client.post(
+        "/csv/upload?mode=parallel",
+        files={"file": ("students.csv", "\n".join([header, *rows]) + "\n", "text/csv")},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["count"] == 40
+
+    rows[30] = "Broken,XYZ,200,210,85" + "," * 21
+    response = client.post(
+        "/csv/upload?mode=parallel",
+        files={"file": ("students.csv", "\n".join([header, *rows]) + "\n", "text/csv")},
+        headers=headers,
+    )
+    assert response.status_code == 422
+    assert [e["row"] for e in response.json()["detail"]["errors"]] == [32]
+
+
+def test_buffered_csv_upload_returns_the_created_students():
+    from app.services.csv_processor import generate_template_csv
+
+    headers = _teacher_headers()
+    response = client.post(
+        "/csv/upload",
+        files={"file": ("students.csv", generate_template_csv(), "text/csv")},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 3
+    assert [s["name"] for s in data["students"]] == ["Alice Johnson", "Bob Smith", "Charlie Lee"]
+    assert len({s["id"] for s in data["students"]}) == 3
+    assert all(s["created_at"] and s["upload_batch"] == data["upload_batch"] for s in data["students"])
+
+    listed = client.get("/csv/students", headers=headers).json()
+    assert {s["id"] for s in listed} == {s["id"] for s in data["students"]}
+
+
+def test_upload_and_score_predicts_the_class_in_one_model_call(monkeypatch):
+    import app.main as main
+    from app.services.csv_processor import generate_template_csv
+
+    calls = []
+    submit_matrix = main.inference_pool.submit_matrix
+    monkeypatch.setattr(
+        main.inference_pool, "submit_matrix", lambda x, **options: calls.append(len(x)) or submit_matrix(x, **options)
+    )
+    headers = _teacher_headers()
+
+    response = client.post(
+        "/csv/upload-and-score?model_type=ml",
+        files={"file": ("class.csv", generate_template_csv(), "text/csv")},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert calls == [3]
+    assert data["count"] == 3
+    assert [r["row"] for r in data["results"]] == [2, 3, 4]
+    assert [r["name"] for r in data["results"]] == ["Alice Johnson", "Bob Smith", "Charlie Lee"]
+    for r in data["results"]:
+        assert r["prediction"] in ["Good", "Average", "Needs Attention"]
+        assert 0 <= r["confidence"] <= 1
+
+    explanation = client.get(f"/records/{data['results'][0]['record_id']}/explanation", headers=headers)
+    assert explanation.status_code == 200
+    assert len(explanation.json()["feature_contributions"]) == 24
+
+    stored = {s["id"] for s in client.get("/csv/students", headers=headers).json()}
+    assert stored == {r["csv_student_id"] for r in data["results"]}
+
+
+def test_upload_and_score_rejects_students_the_predictor_would_reject():
+    from app.services.csv_processor import EXPECTED_COLUMNS
+
+    content = ",".join(EXPECTED_COLUMNS) + "\nZero,CSE,0,0,0" + "," * 21 + "\n"
+    response = client.post(
+        "/csv/upload-and-score",
+        files={"file": ("class.csv", content, "text/csv")},
+        headers=_teacher_headers(),
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"]["errors"][0]["row"] == 2
+
+
+def test_scoring_the_same_csv_again_stores_no_new_rows_or_records(tmp_path, monkeypatch):
+    import app.main as main
+    from app.database.db import SessionLocal
+    from app.database.models import PredictionRecord
+    from app.services.csv_processor import generate_template_csv
+    from app.services.jobs import JobRunner
+
+    headers = _teacher_headers()
+
+    def score():
+        response = client.post(
+            "/csv/upload-and-score?model_type=ml",
+            files={"file": ("class.csv", generate_template_csv(), "text/csv")},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    def counts(csv_ids):
+        with SessionLocal() as db:
+            records = db.query(PredictionRecord).filter(PredictionRecord.csv_student_id.in_(csv_ids)).count()
+        return len(client.get("/csv/students", headers=headers).json()), records
+
+    first = score()
+    csv_ids = [r["csv_student_id"] for r in first["results"]]
+    assert (first["inserted"], first["duplicate"]) == (3, False)
+    assert counts(csv_ids) == (3, 3)
+
+    again = score()
+    assert (again["inserted"], again["duplicate"]) == (0, True)
+    assert [r["csv_student_id"] for r in again["results"]] == csv_ids
+    assert [r["record_id"] for r in again["results"]] == [r["record_id"] for r in first["results"]]
+    assert counts(csv_ids) == (3, 3)
+
+    runner = JobRunner(
+        SessionLocal,
+        check_rows=main._check_job_rows,
+        score_rows=main._score_job_rows,
+        workers=0,
+        jobs_dir=str(tmp_path),
+    )
+    monkeypatch.setattr(main, "job_runner", runner)
+    response = client.post(
+        "/csv/jobs?score=true&model_type=ml",
+        files={"file": ("class.csv", generate_template_csv(), "text/csv")},
+        headers=headers,
+    )
+    job = client.get(f"/jobs/{response.json()['job_id']}", headers=headers).json()
+    assert job["status"] == "succeeded"
+    assert (job["rows_scored"], job["rows_inserted"], job["rows_skipped"]) == (3, 0, 3)
+    assert counts(csv_ids) == (3, 3)
+
+
+def test_upload_and_score_stores_nothing_when_the_predictions_cannot_be_stored(monkeypatch):
+    import pytest
+
+    import app.main as main
+    from app.services.csv_processor import generate_template_csv
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("insert failed")
+
+    monkeypatch.setattr(main, "create_prediction_records_batch", fail)
+    headers = _teacher_headers()
+    with pytest.raises(RuntimeError):
+        client.post(
+            "/csv/upload-and-score",
+            files={"file": ("class.csv", generate_template_csv(), "text/csv")},
+            headers=headers,
+        )
+    assert client.get("/csv/students", headers=headers).json() == []
+
+
+def test_csv_job_ingests_in_chunks_and_reports_progress(tmp_path, monkeypatch):
+    import os
+
+    import app.main as main
+    from app.database.db import SessionLocal
+    from app.services.csv_processor import EXPECTED_COLUMNS
+    from app.services.jobs import JobRunner
+
+    monkeypatch.setattr(main, "job_runner", JobRunner(SessionLocal, workers=0, chunk_bytes=256, jobs_dir=str(tmp_path)))
+    headers = _teacher_headers()
+    header = ",".join(EXPECTED_COLUMNS)
+    rows = [f"Student {i},CSE,200,210,85" + "," * 21 for i in range(40)]
+
+    response = client.post(
+        "/csv/jobs",
+        files={"file": ("students.csv", "\n".join([header, *rows]) + "\n", "text/csv")},
+        headers=headers,
+    )
+    assert response.status_code == 202
+    job_id, first_batch = response.json()["job_id"], response.json()["upload_batch"]
+    job = client.get(f"/jobs/{job_id}", headers=headers).json()
+    assert job["status"] == "succeeded"
+    assert (job["rows_validated"], job["rows_inserted"], job["error_count"]) == (40, 40, 0)
+    assert job["progress"] == 1.0 and job["processed_bytes"] == job["total_bytes"]
+    assert os.listdir(tmp_path) == []
+    assert len(client.get("/csv/students", headers=headers).json()) == 40
+    assert client.get(f"/jobs/{job_id}", headers=_teacher_headers()).status_code == 404
+
+    rows[30] = "Broken,XYZ,200,210,85" + "," * 21
+    response = client.post(
+        "/csv/jobs",
+        files={"file": ("students.csv", "\n".join([header, *rows]) + "\n", "text/csv")},
+        headers=headers,
+    )
+    job = client.get(f"/jobs/{response.json()['job_id']}", headers=headers).json()
+    assert job["status"] == "failed"
+    assert [e["row"] for e in job["errors"]] == [32]
+    assert job["rows_inserted"] == 0
+
+    rows[30] = "Student 30,CSE,200,210,85" + "," * 21
+    response = client.post(
+        "/csv/jobs",
+        files={"file": ("students.csv", "\n".join([header, *rows]) + "\n", "text/csv")},
+        headers=headers,
+    )
+    assert response.json()["status"] == "succeeded"
+    job = client.get(f"/jobs/{response.json()['job_id']}", headers=headers).json()
+    assert job["upload_batch"] == first_batch
+    assert (job["rows_inserted"], job["rows_skipped"]) == (0, 40)
+
+
+def test_csv_job_resumes_after_its_last_committed_chunk(tmp_path):
+    import uuid
+
+    from app.database.crud import create_job, get_job
+    from app.database.db import SessionLocal
+    from app.database.models import CsvStudent, Teacher
+    from app.services.csv_processor import EXPECTED_COLUMNS
+    from app.services.jobs import JobRunner
+
+    header = ",".join(EXPECTED_COLUMNS) + "\n"
+    row = "Student,CSE,200,210,85" + "," * 21 + "\n"
+    path = tmp_path / "upload.csv"
+    path.write_text(header + row * 30)
+    _teacher_headers()  # creates the tables
+
+    with SessionLocal() as db:
+        teacher = Teacher(email=f"{uuid.uuid4().hex}@example.com", password_hash="x", name="T")
+        db.add(teacher)
+        db.commit()
+        job = create_job(
+            db,
+            job_id=uuid.uuid4().hex,
+            teacher_id=teacher.id,
+            filename="upload.csv",
+            file_path=str(path),
+            upload_batch=str(uuid.uuid4()),
+            total_bytes=path.stat().st_size,
+        )
+        # As left by a process that stopped after committing the first 10 rows.
+        job.status, job.processed_bytes = "inserting", len(header) + 10 * len(row)
+        job.rows_validated, job.rows_inserted = 30, 10
+        db.commit()
+        job_id, batch = job.id, job.upload_batch
+
+    JobRunner(SessionLocal, workers=0, chunk_bytes=256).resume()
+
+    with SessionLocal() as db:
+        job = get_job(db, job_id=job_id)
+        assert job.status == "succeeded"
+        assert job.rows_inserted == 30
+        assert db.query(CsvStudent).filter(CsvStudent.upload_batch == batch).count() == 20
+
+
+def test_csv_job_is_run_by_one_runner_when_two_resume_it(tmp_path):
+    import threading
+    import uuid
+    from datetime import datetime, timedelta
+
+    from app.database.crud import claim_job, create_job, get_job
+    from app.database.db import SessionLocal
+    from app.database.models import CsvStudent, Teacher
+    from app.services.csv_processor import EXPECTED_COLUMNS
+    from app.services.jobs import JobRunner
+
+    header = ",".join(EXPECTED_COLUMNS) + "\n"
+    content = header + "".join(f"Student {i},CSE,200,210,85" + "," * 21 + "\n" for i in range(50))
+    path = tmp_path / "upload.csv"
+    path.write_text(content)
+    _teacher_headers()  # creates the tables
+
+    with SessionLocal() as db:
+        teacher = Teacher(email=f"{uuid.uuid4().hex}@example.com", password_hash="x", name="T")
+        db.add(teacher)
+        db.commit()
+        job = create_job(
+            db,
+            job_id=uuid.uuid4().hex,
+            teacher_id=teacher.id,
+            filename="upload.csv",
+            file_path=str(path),
+            upload_batch=str(uuid.uuid4()),
+            total_bytes=path.stat().st_size,
+        )
+        teacher_id, job_id, batch = teacher.id, job.id, job.upload_batch
+
+    # Two processes starting at once, as under uvicorn --workers 2.
+    runners = [JobRunner(SessionLocal, workers=0, chunk_bytes=256) for _ in range(2)]
+    barrier = threading.Barrier(2)
+
+    def start(runner):
+        barrier.wait()
+        runner.resume()
+
+    threads = [threading.Thread(target=start, args=(r,)) for r in runners]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    with SessionLocal() as db:
+        assert get_job(db, job_id=job_id).status == "succeeded"
+        assert db.query(CsvStudent).filter(CsvStudent.upload_batch == batch).count() == 50
+
+        # A held job is left alone until its claim goes stale.
+        path.write_text(content)
+        job = create_job(
+            db,
+            job_id=uuid.uuid4().hex,
+            teacher_id=teacher_id,
+            filename="upload.csv",
+            file_path=str(path),
+            upload_batch=str(uuid.uuid4()),
+            total_bytes=path.stat().st_size,
+        )
+        job_id = job.id
+        assert claim_job(db, job_id=job_id, owner="other", stale_before=datetime.utcnow() - timedelta(minutes=1))
+
+    JobRunner(SessionLocal, workers=0, chunk_bytes=256).resume()
+    with SessionLocal() as db:
+        assert get_job(db, job_id=job_id).status == "queued"
+    JobRunner(SessionLocal, workers=0, chunk_bytes=256, lease_seconds=0).resume()
+    with SessionLocal() as db:
+        assert get_job(db, job_id=job_id).status == "succeeded"
+
+
+def test_repeated_csv_upload_reuses_the_batch_and_skips_known_rows():
+    from app.services.csv_processor import EXPECTED_COLUMNS
+
+    headers = _teacher_headers()
+    header = ",".join(EXPECTED_COLUMNS)
+    rows = [f"Student {i},CSE,200,210,85" + "," * 21 for i in range(5)]
+
+    def upload(lines, mode="buffered"):
+        return client.post(
+            f"/csv/upload?mode={mode}",
+            files={"file": ("students.csv", "\n".join([header, *lines]) + "\n", "text/csv")},
+            headers=headers,
+        ).json()
+
+    first = upload(rows)
+    assert (first["count"], first["inserted"], first["duplicate"]) == (5, 5, False)
+
+    again = upload(rows)
+    assert again["duplicate"] is True and again["upload_batch"] == first["upload_batch"]
+    assert [s["id"] for s in again["students"]] == [s["id"] for s in first["students"]]
+    assert upload(rows, mode="stream")["upload_batch"] == first["upload_batch"]
+
+    # Same students with one changed and one added: only those two are stored.
+    changed = rows[:4] + ["Student 4,CSE,250,260,90" + "," * 21, "Student 5,IT,200,210,85" + "," * 21]
+    overlap = upload(changed)
+    assert (overlap["count"], overlap["inserted"], overlap["duplicate"]) == (6, 2, False)
+    assert [s["id"] for s in overlap["students"][:4]] == [s["id"] for s in first["students"][:4]]
+
+    streamed = upload(changed + ["Student 6,ME,200,210,85" + "," * 21], mode="stream")
+    assert (streamed["count"], streamed["inserted"]) == (7, 1)
+    assert len(client.get("/csv/students", headers=headers).json()) == 8
+
+
+def test_reuploading_a_partly_overlapping_csv_lists_every_student():
+    from app.services.csv_processor import EXPECTED_COLUMNS
+
+    headers = _teacher_headers()
+    header = ",".join(EXPECTED_COLUMNS)
+    rows = [f"Student {i},CSE,200,210,85" + "," * 21 for i in range(5)]
+
+    def upload(lines):
+        response = client.post(
+            "/csv/upload",
+            files={"file": ("students.csv", "\n".join([header, *lines]) + "\n", "text/csv")},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    upload(rows[:3])
+    first = upload(rows)
+    assert (first["count"], first["inserted"], len(first["students"])) == (5, 2, 5)
+
+    again = upload(rows)
+    assert (again["count"], again["inserted"], again["duplicate"]) == (5, 0, True)
+    assert again["upload_batch"] == first["upload_batch"]
+    assert [s["id"] for s in again["students"]] == [s["id"] for s in first["students"]]
+
+
+def test_parquet_upload_feeds_the_same_storage():
+    import io
+
+    import pandas as pd
+    import pytest
+
+    pytest.importorskip("pyarrow")
+    from app.services.csv_processor import generate_template_csv
+
+    buffer = io.BytesIO()
+    pd.read_csv(io.StringIO(generate_template_csv())).to_parquet(buffer, index=False)
+    headers = _teacher_headers()
+
+    response = client.post(
+        "/csv/upload",
+        files={"file": ("class.parquet", buffer.getvalue(), "application/octet-stream")},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert [s["name"] for s in response.json()["students"]] == ["Alice Johnson", "Bob Smith", "Charlie Lee"]
+
+    response = client.post(
+        "/csv/upload?mode=stream",
+        files={"file": ("class.parquet", buffer.getvalue(), "application/octet-stream")},
+        headers=headers,
+    )
+    assert response.status_code == 400
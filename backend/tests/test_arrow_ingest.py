@@ -0,0 +1,99 @@
+import io
+
+import pytest
+
+from app.services.arrow_ingest import arrow_format, validate_and_parse_arrow
+from app.services.csv_processor import EXPECTED_COLUMNS, generate_template_csv, validate_and_parse_csv
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+pcsv = pytest.importorskip("pyarrow.csv")
+
+
+def _parquet(table) -> bytes:
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer)
+    return buffer.getvalue()
+
+
+def _ipc(table, *, stream: bool = False) -> bytes:
+    sink = io.BytesIO()
+    with (pa.ipc.new_stream if stream else pa.ipc.new_file)(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def _shifted(errors):
+    # CSV rows count the header; Arrow rows start at 1.
+    return [{**e, "row": e["row"] - 1} if e["row"] else e for e in errors]
+
+
+def test_typed_columns_match_the_csv_validator():
+    import pandas as pd
+
+    content = generate_template_csv().encode()
+    # Short rows read as NaN, so later semesters come out as float columns.
+    table = pa.Table.from_pandas(pd.read_csv(io.BytesIO(content)), preserve_index=False)
+    assert pa.types.is_integer(table.column("sem1_internal").type)
+    assert pa.types.is_floating(table.column("sem8_internal").type)
+    expected = validate_and_parse_csv(content)
+
+    assert validate_and_parse_arrow(_parquet(table), "parquet") == expected
+    assert validate_and_parse_arrow(_ipc(table), "arrow") == expected
+    assert validate_and_parse_arrow(_ipc(table, stream=True), "arrow") == expected
+
+
+def test_typed_errors_use_the_csv_messages_and_row_numbers():
+    n = 6
+    columns = {c: pa.array([None] * n, type=pa.float64()) for c in EXPECTED_COLUMNS[2:]}
+    columns["name"] = pa.array(["Alice", "", "Bob", "Carol", "Dan", None])
+    columns["department"] = pa.array(["cse", "XYZ", "IT", "ECE", "ME", "CSE"])
+    columns["sem1_internal"] = pa.array([200, 350, 200.5, 250, None, 100], type=pa.float64())
+    columns["sem1_university"] = pa.array([210.0, 100, 100, 360, None, 100])
+    columns["sem1_attendance"] = pa.array([85, 90, 80, 101, None, float("nan")], type=pa.float64())
+    table = pa.table({c: columns[c] for c in EXPECTED_COLUMNS})
+
+    tail = "," * 21
+    csv_text = "\n".join(
+        [
+            ",".join(EXPECTED_COLUMNS),
+            "Alice,cse,200,210,85.0" + tail,
+            ",XYZ,350,100,90.0" + tail,
+            "Bob,IT,200.5,100,80.0" + tail,
+            "Carol,ECE,250,360,101.0" + tail,
+            "Dan,ME,,," + tail,
+            ",CSE,100,100," + tail,
+        ]
+    )
+    rows, errors = validate_and_parse_csv(csv_text.encode())
+
+    assert validate_and_parse_arrow(_parquet(table), "parquet") == (rows, _shifted(errors))
+    assert {e["row"] for e in _shifted(errors)} == {2, 3, 4, 5, 6}
+
+
+def test_text_columns_are_parsed_like_csv_cells():
+    content = (
+        ",".join(EXPECTED_COLUMNS) + "\n"
+        "Alice,CSE, 200 ,210,85.5" + "," * 21 + "\n"
+        "Bob,IT,abc,210,85" + "," * 21 + "\n"
+    ).encode()
+    table = pcsv.read_csv(
+        io.BytesIO(content),
+        convert_options=pcsv.ConvertOptions(column_types={c: pa.string() for c in EXPECTED_COLUMNS}),
+    )
+    rows, errors = validate_and_parse_csv(content)
+    assert validate_and_parse_arrow(_parquet(table), "parquet") == (rows, _shifted(errors))
+
+
+def test_missing_columns_and_unreadable_files_are_reported():
+    table = pa.table({"name": ["Alice"], "department": ["CSE"]})
+    _, errors = validate_and_parse_arrow(_parquet(table), "parquet")
+    assert errors[0]["field"] == "header" and "sem1_internal" in errors[0]["message"]
+
+    assert validate_and_parse_arrow(b"not parquet", "parquet") == (
+        [],
+        [{"row": 0, "field": "file", "message": "File is not a valid Parquet file"}],
+    )
+    assert arrow_format("Class.PARQUET") == "parquet"
+    assert arrow_format("class.feather") == "arrow"
+    assert arrow_format("class.csv") is None
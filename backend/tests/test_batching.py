@@ -0,0 +1,85 @@
+import threading
+
+import pytest
+
+from app.services.batching import MicroBatcher
+from app.services.inference_pool import InferencePool
+from app.services.predictor import PredictionResult
+
+
+class RecordingPredictor:
+    def __init__(self):
+        self.calls = []
+
+    def predict_batch(self, payloads, *, model_type="ml", explain=True, early_exit="off"):
+        if model_type not in ("ml", "dl"):
+            raise ValueError(f"Unsupported model_type: {model_type}")
+        self.calls.append((len(payloads), model_type))
+        return [
+            PredictionResult(prediction=str(p["id"]), confidence=1.0, model_used=model_type, contributions={})
+            for p in payloads
+        ]
+
+
+def _run_concurrently(batcher, requests):
+    results = [None] * len(requests)
+    barrier = threading.Barrier(len(requests))
+
+    def call(i, payload, model_type):
+        barrier.wait()
+        results[i] = batcher.predict_batch([payload], model_type=model_type)[0]
+
+    threads = [threading.Thread(target=call, args=(i, *r)) for i, r in enumerate(requests)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_concurrent_requests_are_coalesced_and_fanned_back():
+    predictor = RecordingPredictor()
+    batcher = MicroBatcher(InferencePool(predictor, workers=0), window_ms=200, max_batch=64)
+    requests = [({"id": i}, "ml" if i % 2 else "dl") for i in range(16)]
+
+    results = _run_concurrently(batcher, requests)
+
+    assert [r.prediction for r in results] == [str(i) for i in range(16)]
+    assert [r.model_used for r in results] == [m for _, m in requests]
+    assert len(predictor.calls) < len(requests)
+    stats = batcher.stats()
+    assert stats["requests"] == 16
+    assert sum(stats["batch_size_histogram"].values()) == stats["batches"]
+
+
+def test_errors_reach_every_caller_in_the_group():
+    batcher = MicroBatcher(InferencePool(RecordingPredictor(), workers=0), window_ms=1)
+    with pytest.raises(ValueError):
+        batcher.predict_batch([{"id": 1}], model_type="xgb")
+
+
+def test_zero_window_calls_the_predictor_directly():
+    predictor = RecordingPredictor()
+    batcher = MicroBatcher(InferencePool(predictor, workers=0), window_ms=0)
+    assert batcher.predict_batch([{"id": 7}])[0].prediction == "7"
+    assert batcher.stats()["batches"] == 0
+
+
+class FailingOncePool(InferencePool):
+    def __init__(self, predictor):
+        super().__init__(predictor, workers=0)
+        self.failed = False
+
+    def submit_batch(self, payloads, **options):
+        if not self.failed:
+            self.failed = True
+            raise RuntimeError("cannot schedule new futures after shutdown")
+        return super().submit_batch(payloads, **options)
+
+
+def test_a_failed_submit_fails_its_group_and_keeps_the_worker():
+    batcher = MicroBatcher(FailingOncePool(RecordingPredictor()), window_ms=1)
+    with pytest.raises(RuntimeError):
+        batcher.submit({"id": 1}).result(timeout=5)
+    assert batcher.submit({"id": 2}).result(timeout=5).prediction == "2"
+    assert batcher._worker.is_alive()
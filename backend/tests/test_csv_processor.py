@@ -0,0 +1,148 @@
+import csv
+import io
+import random
+
+import pytest
+
+from app.services.csv_columnar import validate_and_parse_csv_columnar
+from app.services.csv_parallel import ParallelCsvValidator, split_records
+from app.services.csv_processor import (
+    EXPECTED_COLUMNS,
+    generate_template_csv,
+    validate_and_parse_csv,
+    validate_and_parse_csv_stream,
+)
+
+
+def _csv(*rows: str) -> bytes:
+    return (",".join(EXPECTED_COLUMNS) + "\n" + "".join(r + "\n" for r in rows)).encode()
+
+
+BAD_ROWS = _csv(
+    "Alice,CSE,200,210,85" + "," * 21,
+    ",XYZ,350,abc,85" + "," * 21,
+    "Bob,IT,200,,85" + "," * 21,
+    "Carol,ece,250,300,101" + "," * 21,
+    "Dan,ME" + "," * 24,
+)
+
+
+def _stream(content: bytes, **kwargs):
+    batches = []
+    result = validate_and_parse_csv_stream(io.BytesIO(content), on_batch=lambda rows: batches.append(list(rows)), **kwargs)
+    return result, batches
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        generate_template_csv().encode(),
+        b"\xef\xbb\xbf" + generate_template_csv().encode(),
+        BAD_ROWS,
+        b"",
+        b"name,department\nAlice,CSE\n",
+        _csv(),
+        b"name,department\n\xff\xfe\n",
+    ],
+)
+def test_stream_mode_reports_the_same_errors_as_buffered(content):
+    rows, errors = validate_and_parse_csv(content)
+    result, batches = _stream(content, batch_size=2)
+    assert result.errors == errors
+    assert result.error_count == len(errors)
+    if not errors:
+        assert [row for batch in batches for row in batch] == rows
+        assert result.row_count == len(rows)
+
+
+def test_stream_mode_writes_fixed_size_batches_and_stops_after_an_error():
+    good = "Alice,CSE,200,210,85" + "," * 21
+    result, batches = _stream(_csv(*[good] * 7), batch_size=3)
+    assert [len(b) for b in batches] == [3, 3, 1]
+    assert result.row_count == 7 and not result.errors
+
+    result, batches = _stream(_csv(*[good] * 4, "Dan,ME" + "," * 24, *[good] * 4), batch_size=3)
+    assert [len(b) for b in batches] == [3]
+    assert result.row_count == 9
+    assert result.errors == [{"row": 6, "field": "semesters", "message": "At least one complete semester is required"}]
+
+
+def test_stream_mode_caps_reported_errors():
+    result, _ = _stream(_csv(*["Dan,ME" + "," * 24] * 50), max_errors=10)
+    assert len(result.errors) == 10
+    assert result.error_count == 50
+    assert [e["row"] for e in result.errors] == list(range(2, 12))
+
+
+INT_CELLS = ["200", "0", "300", "301", "007", " 12", "+5", "-3", "1_000", "abc", "1.0", "٣", "99999999999999999999", "  ", "1e2"]
+FLOAT_CELLS = ["85", "85.5", "100", "100.5", ".5", "85.", ".", "-1", "nan", "inf", " 9", "0.1", "1..2", "4.35", "1234567890.12345"]
+
+
+def _random_csv(rnd: random.Random) -> bytes:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    header = list(EXPECTED_COLUMNS)
+    if rnd.random() < 0.2:
+        header = [h.upper() for h in header] + ["extra"]
+    writer.writerow(header)
+    for _ in range(rnd.randint(0, 40)):
+        if rnd.random() < 0.05:
+            buf.write("\n")
+            continue
+        row = [rnd.choice(["Alice", "", "  ", "Zoë", "x" * 121, " Bob "]), rnd.choice(["CSE", "cse", "", "XYZ", " it "])]
+        for _ in range(8):
+            roll = rnd.random()
+            if roll < 0.4:
+                row += ["", "", ""]
+            elif roll < 0.8:
+                row += ["200", "210", "85"]
+            else:
+                row += [rnd.choice(INT_CELLS + [""]), rnd.choice(INT_CELLS + [""]), rnd.choice(FLOAT_CELLS + [""])]
+        if rnd.random() < 0.05:
+            row = row[: rnd.randint(1, 25)]
+        writer.writerow(row)
+    return buf.getvalue().encode()
+
+
+@pytest.mark.parametrize(
+    "content",
+    [generate_template_csv().encode(), BAD_ROWS, b"", b"name,department\nAlice,CSE\n", _csv(), b"\xff"],
+)
+def test_columnar_validator_matches_row_validator(content):
+    assert validate_and_parse_csv_columnar(content) == validate_and_parse_csv(content)
+
+
+def test_columnar_validator_matches_row_validator_on_random_files():
+    rnd = random.Random(1234)
+    for _ in range(100):
+        content = _random_csv(rnd)
+        assert validate_and_parse_csv_columnar(content) == validate_and_parse_csv(content)
+
+
+def test_split_records_never_cuts_inside_a_quoted_field():
+    content = _csv('"Lee, ""Al""\nJr",CSE,200,210,85' + "," * 21, *["Alice,CSE,200,210,85" + "," * 21] * 5)
+    header_end = content.index(b"\n") + 1
+    ranges = list(split_records(content, header_end, 8))
+    assert ranges[0][0] == header_end and ranges[-1][1] == len(content)
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    assert all(content[end - 1 : end] == b"\n" for _, end in ranges)
+    assert content[ranges[0][0] : ranges[0][1]].count(b"\n") == 2
+
+
+@pytest.mark.parametrize("chunk_bytes", [1, 50, 1 << 20])
+def test_chunked_validation_matches_row_validator(chunk_bytes):
+    validator = ParallelCsvValidator(workers=0, chunk_bytes=chunk_bytes)
+    rnd = random.Random(chunk_bytes)
+    contents = [_random_csv(rnd) for _ in range(30)]
+    contents += [generate_template_csv().encode(), b"\xef\xbb\xbf" + BAD_ROWS, b"", _csv(), b"name\n\xff\n"]
+    for content in contents:
+        assert validator.validate(content) == validate_and_parse_csv(content)
+
+
+def test_chunks_are_validated_in_worker_processes():
+    validator = ParallelCsvValidator(workers=2, chunk_bytes=200)
+    try:
+        content = BAD_ROWS + b"".join(_csv("Eve,IT,100,100,70" + "," * 21).split(b"\n", 1)[1:] * 20)
+        assert validator.validate(content) == validate_and_parse_csv(content)
+    finally:
+        validator.shutdown()
@@ -0,0 +1,36 @@
+import pytest
+from sqlalchemy import text
+
+from app.database.db import create_db_engine, engine_options
+
+
+def _pragma(engine, name):
+    with engine.connect() as conn:
+        return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_production_profile_sets_sqlite_pragmas_on_every_connection(tmp_path, monkeypatch):
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT_MS", "7000")
+    engine = create_db_engine(f"sqlite:///{tmp_path}/prod.db", "production")
+
+    assert _pragma(engine, "journal_mode") == "wal"
+    assert _pragma(engine, "synchronous") == 1  # NORMAL
+    assert _pragma(engine, "busy_timeout") == 7000
+    assert _pragma(engine, "cache_size") == -65536
+    assert engine.pool.size() == 10
+    engine.dispose()
+
+
+def test_default_profile_keeps_sqlite_defaults(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path}/dev.db", "default")
+    assert _pragma(engine, "journal_mode") == "delete"
+    assert create_db_engine("sqlite://", "production").dialect.name == "sqlite"  # no WAL for :memory:
+    engine.dispose()
+
+
+def test_engine_options_per_backend():
+    assert engine_options("sqlite:///x.db", "default") == {"connect_args": {"check_same_thread": False}}
+    server = engine_options("postgresql://db/app", "production")
+    assert server["pool_pre_ping"] and "connect_args" not in server
+    with pytest.raises(ValueError):
+        create_db_engine("sqlite://", "fast")
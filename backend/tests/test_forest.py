@@ -0,0 +1,77 @@
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.forest import CompiledForest
+from app.services.predictor import FEATURES
+
+BACKEND = Path(__file__).resolve().parents[1]
+MODELS = BACKEND / "ml" / "models"
+
+
+@pytest.fixture(scope="module")
+def artifacts():
+    if not (MODELS / "rf_model.joblib").exists():
+        pytest.skip("ML artifacts not found")
+    model = joblib.load(MODELS / "rf_model.joblib")
+    scaler = joblib.load(MODELS / "scaler.joblib")
+    return model, scaler, CompiledForest.from_sklearn(model, scaler)
+
+
+def test_probabilities_match_sklearn(artifacts):
+    model, scaler, forest = artifacts
+    X = pd.read_csv(BACKEND / "data" / "student_data.csv")[FEATURES].to_numpy(dtype=np.float32)[:500]
+
+    np.testing.assert_allclose(forest.predict_proba(X), model.predict_proba(scaler.transform(X)), rtol=0, atol=1e-12)
+    np.testing.assert_allclose(forest.predict_proba(X[:1]), model.predict_proba(scaler.transform(X[:1])), rtol=0, atol=1e-12)
+
+
+def test_saved_forest_loads_memory_mapped(artifacts, tmp_path):
+    _, _, forest = artifacts
+    X = pd.read_csv(BACKEND / "data" / "student_data.csv")[FEATURES].to_numpy(dtype=np.float32)[:100]
+
+    forest.save(tmp_path / "forest")
+    loaded = CompiledForest.load(tmp_path / "forest")
+
+    assert isinstance(loaded.threshold, np.memmap)
+    assert loaded.max_depth == forest.max_depth
+    np.testing.assert_array_equal(loaded.predict_proba(X), forest.predict_proba(X))
+
+
+def test_folded_thresholds_are_exact_at_the_split_points(artifacts):
+    model, scaler, forest = artifacts
+    rng = np.random.default_rng(0)
+    splits = np.flatnonzero(np.isfinite(forest.threshold))
+    nodes = rng.choice(splits, 300)
+    rows = np.arange(len(nodes))
+    base = rng.uniform(0, 300, size=(len(nodes), len(FEATURES))).astype(np.float32)
+
+    on_split = base.copy()
+    on_split[rows, forest.feature[nodes]] = forest.threshold[nodes].astype(np.float32)
+    above_split = base.copy()
+    above_split[rows, forest.feature[nodes]] = np.nextafter(
+        forest.threshold[nodes].astype(np.float32), np.float32(np.inf)
+    )
+
+    for X in (on_split, above_split):
+        np.testing.assert_allclose(forest.predict_proba(X), model.predict_proba(scaler.transform(X)), rtol=0, atol=1e-12)
+
+
+def test_safe_early_exit_never_changes_the_predicted_class(artifacts):
+    _, _, forest = artifacts
+    X = pd.read_csv(BACKEND / "data" / "student_data.csv")[FEATURES].to_numpy(dtype=np.float32)[:500]
+
+    full = forest.predict_proba(X)
+    proba, trees_used = forest.predict_proba_early(X, chunk=10)
+
+    np.testing.assert_array_equal(proba.argmax(axis=1), full.argmax(axis=1))
+    assert trees_used.max() <= forest.n_trees
+    assert trees_used.mean() < forest.n_trees
+    exact = trees_used == forest.n_trees
+    np.testing.assert_allclose(proba[exact], full[exact], rtol=0, atol=1e-12)
+
+    _, bounded = forest.predict_proba_early(X, chunk=10, min_confidence=0.8)
+    assert (bounded <= trees_used).all()
@@ -0,0 +1,157 @@
+import time
+
+import pytest
+
+from app.services.inference_pool import InferencePool, _predict_in_worker
+from app.services.predictor import ModelArtifactsNotFound, PredictorService
+
+from tests.test_predictor import PAYLOADS
+
+
+def _hang_or_predict(x, model_type, explain, early_exit):
+    # Runs in a worker: a first feature of -1 hangs, -2 is slow but finishes.
+    if x[0, 0] == -1:
+        time.sleep(600)
+    if x[0, 0] == -2:
+        time.sleep(3)
+        x = x[1:]
+    return _predict_in_worker(x, model_type, explain, early_exit)
+
+
+class HangingPool(InferencePool):
+    _task = staticmethod(_hang_or_predict)
+
+
+@pytest.fixture(scope="module")
+def predictor():
+    predictor = PredictorService()
+    try:
+        predictor.predict(PAYLOADS[0], model_type="ml")
+    except ModelArtifactsNotFound as e:
+        pytest.skip(str(e))
+    return predictor
+
+
+def test_worker_processes_match_in_process_predictions(predictor):
+    pool = InferencePool(predictor, workers=1, timeout=120, max_tasks_per_child=2)
+    try:
+        for _ in range(3):  # the third call runs on a recycled worker
+            remote = pool.predict_batch(PAYLOADS, model_type="ml")
+        local = predictor.predict_batch(PAYLOADS, model_type="ml")
+        for r, l in zip(remote, local):
+            assert r.prediction == l.prediction
+            assert r.confidence == pytest.approx(l.confidence)
+            assert r.contributions == pytest.approx(l.contributions)
+        assert pool.stats()["submitted"] == 3
+        # Counted in the workers, including the recycled one; only the live cache has entries.
+        cache = pool.cache_stats()
+        assert cache["workers_reporting"] == 2
+        assert (cache["hits"], cache["misses"], cache["size"]) == (len(PAYLOADS), 2 * len(PAYLOADS), len(PAYLOADS))
+    finally:
+        pool.shutdown()
+
+
+def test_memory_stats_cover_each_worker_process(predictor):
+    pool = InferencePool(predictor, workers=1, timeout=120)
+    try:
+        assert pool.memory_stats() == {"workers": {}, "pss_kb": 0}
+        pool.predict_batch(PAYLOADS[:1], model_type="ml", explain=False)
+        memory = pool.memory_stats()
+        if not memory["workers"]:
+            pytest.skip("/proc/<pid>/smaps_rollup is not available")
+        assert list(memory["workers"]) == [str(p) for p in pool._executor.pids()]
+        assert memory["pss_kb"] == sum(r["pss_kb"] for r in memory["workers"].values()) > 0
+    finally:
+        pool.shutdown()
+
+
+def test_slow_workers_time_out(predictor):
+    pool = InferencePool(predictor, workers=1, timeout=1e-6)
+    try:
+        with pytest.raises(TimeoutError):
+            pool.predict_batch(PAYLOADS, model_type="ml")
+        assert pool.stats()["timeouts"] == 1
+        # The timed-out executor is retired; the next call gets a fresh worker.
+        assert pool.stats()["restarts"] == 1 and pool._executor is None
+        pool.timeout = 120
+        assert len(pool.predict_batch(PAYLOADS, model_type="ml")) == len(PAYLOADS)
+    finally:
+        pool.shutdown()
+
+
+def test_a_closed_executor_is_replaced_on_submit(predictor):
+    pool = InferencePool(predictor, workers=1, timeout=120)
+    try:
+        pool.predict_batch(PAYLOADS[:1], model_type="ml")
+        # As when swap() closes the executor between _get_executor and submit.
+        pool._executor.shutdown(wait=True)
+        assert len(pool.predict_batch(PAYLOADS[:1], model_type="ml")) == 1
+        assert pool.stats()["restarts"] == 1
+    finally:
+        pool.shutdown()
+
+
+def test_every_worker_warms_before_taking_work(predictor):
+    pool = InferencePool(predictor, workers=2, timeout=120, max_tasks_per_child=1)
+    try:
+        assert pool.warm_up(("ml",)) == ["ml"]
+        reports = pool._executor.reports()
+        assert len(reports) == 2
+        assert all(report == (["ml"], None) for report in reports.values())
+        # A worker recycled by max_tasks_per_child warms in its initializer too.
+        pool.predict_batch(PAYLOADS[:1], model_type="ml", explain=False)
+        deadline = time.monotonic() + 120
+        while len(reports) < 3 and time.monotonic() < deadline:
+            time.sleep(0.1)
+            reports = pool._executor.reports()
+        assert len(reports) >= 3
+        assert all(report == (["ml"], None) for report in reports.values())
+    finally:
+        pool.shutdown()
+
+
+def test_swap_warms_new_workers_before_serving_them(predictor, tmp_path):
+    pool = InferencePool(predictor, workers=1, timeout=120)
+    try:
+        with pytest.raises(ModelArtifactsNotFound):
+            pool.swap(PredictorService(tmp_path), warm=("ml",))
+        assert pool.predictor is predictor and pool._executor is None
+
+        candidate = PredictorService(predictor.models_dir, version="v2")
+        assert pool.swap(candidate, warm=("ml",)) is predictor
+        # The warmed workers are the ones now serving.
+        assert pool._executor is not None
+        assert pool.predict_batch(PAYLOADS[:1], model_type="ml", explain=False)[0].model_version == "v2"
+    finally:
+        pool.shutdown()
+
+
+def test_a_hung_task_does_not_fail_other_calls_on_its_workers(predictor):
+    import numpy as np
+
+    from app.services.predictor import vectorize
+
+    x = vectorize(PAYLOADS[:1])
+    slow = np.vstack([np.full_like(x, -2), x])
+    hung = np.full_like(x, -1)
+    pool = HangingPool(predictor, workers=2, timeout=1)
+    try:
+        slow_future = pool.submit_matrix(slow, model_type="ml", explain=False)
+        hung_future = pool.submit_matrix(hung, model_type="ml", explain=False)
+        old = pool._executor
+        with pytest.raises(TimeoutError):
+            pool.wait(hung_future)
+        assert pool._executor is None
+
+        # The other call keeps its worker and finishes.
+        assert slow_future.result(timeout=60)[0].prediction in ("Good", "Average", "Needs Attention")
+        # Then the retired workers, hung one included, are terminated.
+        deadline = time.monotonic() + 30
+        while old.live_processes() and time.monotonic() < deadline:
+            time.sleep(0.1)
+        assert old.live_processes() == []
+
+        pool.timeout = 120
+        assert len(pool.predict_batch(PAYLOADS[:1], model_type="ml", explain=False)) == 1
+    finally:
+        pool.shutdown()
@@ -0,0 +1,42 @@
+import numpy as np
+
+from app.services.mlp import DenseLayer, DenseNetwork
+
+
+def _network(seed: int = 0) -> DenseNetwork:
+    rng = np.random.default_rng(seed)
+    return DenseNetwork(
+        [
+            DenseLayer(rng.normal(size=(24, 32)) * 0.3, rng.normal(size=32) * 0.1, "relu"),
+            DenseLayer(rng.normal(size=(32, 16)) * 0.3, rng.normal(size=16) * 0.1, "relu"),
+            DenseLayer(rng.normal(size=(16, 3)) * 0.3, rng.normal(size=3) * 0.1, "softmax"),
+        ]
+    )
+
+
+def test_input_gradients_match_finite_differences():
+    net = _network()
+    x = np.random.default_rng(1).normal(size=(2, 24))
+    class_idx = np.array([0, 2])
+    grads = net.input_gradients(x, class_idx)
+
+    eps = 1e-6
+    for row in range(len(x)):
+        for j in range(24):
+            bump = np.zeros_like(x[row])
+            bump[j] = eps
+            up = net.predict((x[row] + bump)[None, :])[0, class_idx[row]]
+            down = net.predict((x[row] - bump)[None, :])[0, class_idx[row]]
+            assert abs((up - down) / (2 * eps) - grads[row, j]) < 1e-5
+
+
+def test_integrated_gradients_are_complete():
+    net = _network()
+    x = np.random.default_rng(2).normal(size=(4, 24))
+    baseline = np.zeros(24)
+    class_idx = net.predict(x).argmax(axis=1)
+
+    attributions = net.integrated_gradients(x, baseline, class_idx, steps=512)
+    rows = np.arange(len(x))
+    expected = net.predict(x)[rows, class_idx] - net.predict(np.zeros((len(x), 24)))[rows, class_idx]
+    np.testing.assert_allclose(attributions.sum(axis=1), expected, atol=1e-3)
@@ -0,0 +1,41 @@
+import pytest
+
+from app.services.model_registry import ModelRegistry, ModelVersionError
+from app.services.predictor import PredictorService
+
+
+@pytest.fixture()
+def registry(tmp_path):
+    return ModelRegistry(tmp_path / "versions")
+
+
+def test_publish_writes_a_verifiable_manifest(registry):
+    source = PredictorService().models_dir
+    manifest = registry.publish(source, "2024-06-01")
+
+    assert manifest["version"] == "2024-06-01"
+    assert "rf_model.joblib" in manifest["files"]
+    assert registry.verify("2024-06-01")["content_hash"] == manifest["content_hash"]
+    assert [m["version"] for m in registry.list_versions()] == ["2024-06-01"]
+
+    with pytest.raises(ModelVersionError):
+        registry.publish(source, "2024-06-01")
+
+
+def test_tampered_versions_fail_verification(registry):
+    registry.publish(PredictorService().models_dir, "v1")
+    with (registry.version_dir("v1") / "label_map.json").open("a") as f:
+        f.write(" ")
+
+    with pytest.raises(ModelVersionError):
+        registry.verify("v1")
+
+
+def test_active_version_round_trip_and_name_checks(registry):
+    assert registry.active_version() is None
+    registry.set_active("v2")
+    assert registry.active_version() == "v2"
+
+    for bad in ("../models", ".hidden", "a/b", ""):
+        with pytest.raises(ModelVersionError):
+            registry.version_dir(bad)
@@ -0,0 +1,212 @@
+import numpy as np
+import pytest
+
+from app.services.predictor import FEATURES, ModelArtifactsNotFound, PredictorService
+
+
+def _payload(internal: int, university: int, attendance: float) -> dict:
+    payload = {}
+    for sem in range(1, 9):
+        payload[f"sem{sem}_internal"] = internal
+        payload[f"sem{sem}_university"] = university
+        payload[f"sem{sem}_attendance"] = attendance
+    return payload
+
+
+PAYLOADS = [_payload(120, 110, 60.0), _payload(200, 210, 85.0), _payload(270, 280, 97.5)]
+
+
+@pytest.fixture(scope="module")
+def predictor():
+    return PredictorService()
+
+
+def _load_or_skip(predictor: PredictorService, model_type: str) -> None:
+    try:
+        predictor.predict(PAYLOADS[0], model_type=model_type)
+    except ModelArtifactsNotFound as e:
+        pytest.skip(str(e))
+
+
+@pytest.mark.parametrize("model_type", ["ml", "dl"])
+def test_predict_batch_matches_single_predictions(predictor, model_type):
+    _load_or_skip(predictor, model_type)
+
+    batch = predictor.predict_batch(PAYLOADS, model_type=model_type)
+    assert len(batch) == len(PAYLOADS)
+    for payload, result in zip(PAYLOADS, batch):
+        single = predictor.predict(payload, model_type=model_type)
+        assert result.prediction == single.prediction
+        assert result.confidence == pytest.approx(single.confidence, abs=1e-6)
+        assert set(result.contributions) == set(FEATURES)
+
+
+def test_safe_early_exit_keeps_predictions_and_reports_trees_used(predictor):
+    _load_or_skip(predictor, "ml")
+
+    exact = predictor.predict_batch(PAYLOADS, model_type="ml", explain=False)
+    early = predictor.predict_batch(PAYLOADS, model_type="ml", explain=False, early_exit="safe")
+    n_trees = predictor._ml_forest.n_trees
+    for full, fast in zip(exact, early):
+        assert full.trees_used == n_trees
+        assert fast.prediction == full.prediction
+        assert 0 < fast.trees_used <= n_trees
+
+
+def test_repeated_predictions_are_served_from_the_cache():
+    predictor = PredictorService()
+    _load_or_skip(predictor, "ml")
+    predictor.cache.clear()
+    hits = predictor.cache.hits
+
+    first = predictor.predict_batch(PAYLOADS, model_type="ml")
+    assert predictor.cache.hits == hits
+    again = predictor.predict_batch(PAYLOADS, model_type="ml")
+    assert predictor.cache.hits == hits + len(PAYLOADS)
+    assert [r.contributions for r in again] == [r.contributions for r in first]
+
+    # Different options or different artifacts never share entries.
+    predictor.predict_batch(PAYLOADS, model_type="ml", explain=False)
+    predictor._ml_fingerprint = "retrained"
+    predictor.predict_batch(PAYLOADS, model_type="ml")
+    assert predictor.cache.hits == hits + len(PAYLOADS)
+
+
+def test_predict_batch_empty(predictor):
+    assert predictor.predict_batch([], model_type="ml") == []
+
+
+def test_predict_batch_rejects_unknown_model(predictor):
+    with pytest.raises(ValueError):
+        predictor.predict_batch(PAYLOADS, model_type="xgb")
+
+
+def test_explainer_is_built_once_and_reset_on_reload():
+    predictor = PredictorService()
+    _load_or_skip(predictor, "ml")
+    explainer = predictor._ml_explainer
+    if explainer is None:
+        pytest.skip("shap not installed")
+
+    result = predictor.predict(PAYLOADS[1], model_type="ml")
+    assert predictor._ml_explainer is explainer
+    assert any(v != 0.0 for v in result.contributions.values())
+
+    predictor.reload("ml")
+    assert predictor._ml_explainer is None
+    predictor.predict(PAYLOADS[1], model_type="ml")
+    assert predictor._ml_explainer is not None
+    assert predictor._ml_explainer is not explainer
+
+
+def test_dl_gradient_explanations_track_the_prediction():
+    predictor = PredictorService(dl_explainer="gradient")
+    _load_or_skip(predictor, "dl")
+    if predictor._dl_network is None:
+        pytest.skip("DL backend could not be mirrored in NumPy")
+
+    result = predictor.predict(PAYLOADS[1], model_type="dl")
+    baseline_proba = predictor._dl_network.predict(predictor._dl_baseline[None, :])[0]
+    class_idx = {v: k for k, v in predictor._dl_label_map.items()}[result.prediction]
+    total = sum(result.contributions.values())
+    assert total == pytest.approx(result.confidence - baseline_proba[class_idx], abs=1e-2)
+
+
+def test_numpy_dl_backend_matches_keras(tmp_path):
+    import shutil
+
+    from app.services import predictor as predictor_module
+
+    models_dir = PredictorService().models_dir
+    if predictor_module.keras is None or not (models_dir / "dl_weights.npz").exists():
+        pytest.skip("needs TensorFlow and dl_weights.npz")
+
+    for name in ("dl_model.keras", "scaler.joblib", "label_map.json", "background.npy"):
+        shutil.copy(models_dir / name, tmp_path / name)
+    keras_predictor = PredictorService(tmp_path)
+    numpy_predictor = PredictorService(models_dir)
+
+    try:
+        keras_results = keras_predictor.predict_batch(PAYLOADS, model_type="dl")
+    except Exception as e:
+        pytest.skip(f"Keras model could not be loaded: {e}")
+    numpy_results = numpy_predictor.predict_batch(PAYLOADS, model_type="dl")
+
+    assert numpy_predictor._dl_backend == "numpy"
+    for k, n in zip(keras_results, numpy_results):
+        assert n.prediction == k.prediction
+        assert n.confidence == pytest.approx(k.confidence, abs=1e-5)
+        for f in FEATURES:
+            assert n.contributions[f] == pytest.approx(k.contributions[f], abs=1e-4)
+
+
+def test_ml_artifacts_are_memory_mapped_and_model_loads_lazily(tmp_path):
+    import shutil
+
+    models_dir = PredictorService().models_dir
+    if not (models_dir / "rf_model.joblib").exists():
+        pytest.skip("ML artifacts not found")
+    for name in ("rf_model.joblib", "scaler.joblib", "label_map.json", "background.npy", "ml_metrics.json"):
+        shutil.copy2(models_dir / name, tmp_path / name)
+
+    first = PredictorService(tmp_path)
+    expected = first.predict_batch(PAYLOADS, model_type="ml")
+    assert list((tmp_path / "rf_compiled").iterdir()) == [tmp_path / "rf_compiled" / first._ml_fingerprint]
+
+    # A second process-like load only maps the compiled arrays.
+    second = PredictorService(tmp_path)
+    results = second.predict_batch(PAYLOADS, model_type="ml", explain=False)
+    assert second._ml_model is None
+    assert isinstance(second._ml_forest.packed, np.memmap)
+    assert isinstance(second._ml_background, np.memmap)
+    assert [r.confidence for r in results] == [r.confidence for r in expected]
+
+    second.predict_batch(PAYLOADS, model_type="ml")
+    assert second._ml_model is not None
+
+
+def test_warm_up_leaves_the_forest_mapped_unless_explainers_are_preloaded(monkeypatch):
+    monkeypatch.delenv("PRELOAD_EXPLAINERS", raising=False)
+    predictor = PredictorService()
+    _load_or_skip(PredictorService(), "ml")
+
+    assert predictor.warm_up(("ml",)) == ["ml"]
+    assert predictor._ml_model is None and predictor._ml_explainer is None
+
+    monkeypatch.setenv("PRELOAD_EXPLAINERS", "1")
+    predictor = PredictorService()
+    predictor.warm_up(("ml",))
+    assert predictor._ml_model is not None and predictor._ml_explainer is not None
+
+
+def test_importing_app_does_not_load_heavy_dependencies():
+    import subprocess
+    import sys
+
+    code = (
+        "import sys, app.main; "
+        "print(','.join(m for m in ('shap', 'tensorflow', 'tflite_runtime', 'fastapi_mail', 'pyarrow') if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == ""
+
+
+def test_vectorize_semesters_fills_gaps_like_payload_from_student():
+    import random
+
+    from app.main import _feature_matrix, _payload_from_student
+    from app.schemas import StudentInput
+    from app.services.predictor import vectorize
+
+    rnd = random.Random(7)
+    students = []
+    for i in range(50):
+        taken = sorted(rnd.sample(range(1, 9), rnd.randint(1, 8)))
+        semesters = [
+            {"semester": s, "internal_marks": rnd.randint(50, 300), "university_marks": rnd.randint(50, 300), "attendance": rnd.uniform(40, 100)}
+            for s in taken
+        ]
+        students.append(StudentInput(name=f"S{i}", department="CSE", semesters=semesters))
+
+    expected = vectorize([_payload_from_student(s) for s in students])
+    np.testing.assert_array_equal(_feature_matrix(students), expected)
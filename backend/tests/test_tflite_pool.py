@@ -0,0 +1,50 @@
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.services.tflite_pool import InterpreterPool
+
+MODEL = Path(__file__).resolve().parents[1] / "ml" / "models" / "dl_model.tflite"
+
+
+@pytest.fixture(scope="module")
+def interpreter_cls():
+    try:
+        import tflite_runtime.interpreter as tflite
+
+        return tflite.Interpreter
+    except Exception:
+        pass
+    try:
+        import tensorflow as tf
+
+        return tf.lite.Interpreter
+    except Exception:
+        pytest.skip("no TFLite interpreter available")
+
+
+def test_concurrent_batches_match_sequential_results(interpreter_cls):
+    if not MODEL.exists():
+        pytest.skip("dl_model.tflite not found")
+    pool = InterpreterPool(lambda: interpreter_cls(model_path=str(MODEL)), size=2)
+    rng = np.random.default_rng(0)
+    batches = [rng.normal(size=(n, 24)).astype(np.float32) for n in (1, 7, 1, 32, 3, 1, 16, 5)]
+    expected = [pool.predict(x) for x in batches]
+
+    results = [None] * len(batches)
+
+    def run(i):
+        for _ in range(20):
+            results[i] = pool.predict(batches[i])
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(batches))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for got, want, x in zip(results, expected, batches):
+        assert got.shape == (len(x), 3)
+        np.testing.assert_allclose(got, want, rtol=0, atol=1e-6)